@@ -6,4 +6,8 @@ app.conf.beat_schedule = {
         'task': 'apps.contacts.tasks.sync_all_schools_invoice_stats',
         'schedule': crontab(minute=0),  # A cada hora
     },
+    'sync-siga-mirror-every-hour': {
+        'task': 'apps.contacts.tasks.sync_all_schools_siga_mirror',
+        'schedule': crontab(minute=30),  # A cada hora, fora do crawl de boletos
+    },
 }
\ No newline at end of file
@@ -1,4 +1,12 @@
 # apps/contacts/integrations/__init__.py
+from .siga_client import SigaClient, get_siga_client
 from .siga_cache_manager import SigaCacheManager
+from .siga_circuit_breaker import CircuitOpenError, get_breaker
 
-__all__ = ['SigaCacheManager']
\ No newline at end of file
+__all__ = [
+    'CircuitOpenError',
+    'SigaCacheManager',
+    'SigaClient',
+    'get_breaker',
+    'get_siga_client',
+]
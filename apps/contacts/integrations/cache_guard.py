@@ -0,0 +1,221 @@
+# apps/contacts/integrations/cache_guard.py
+"""
+Fail fast do cache (Redis) quando ele está fora do ar.
+
+O modo "funciona sem Redis" do SigaCacheManager captura as exceções do
+cache, mas cada chamada ainda espera o SOCKET_CONNECT_TIMEOUT (5s). Uma
+requisição que faz dezenas de chamadas (ex: boletos de 50 alunos)
+ficaria minutos parada.
+
+GuardedCache envolve o cache Django com um breaker do próprio Redis:
+depois de failure_threshold falhas seguidas, ABRE — as chamadas falham
+na hora com CacheUnavailable (microssegundos) durante o cooldown. Uma
+sonda em BACKGROUND testa o Redis; se responder, o circuito fecha.
+
+Estado é por processo, como o breaker do SIGA (ver siga_circuit_breaker).
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .local_cache import redis_fallback
+
+logger = logging.getLogger(__name__)
+
+
+class CacheUnavailable(Exception):
+    """Redis com circuito aberto — chamada ao cache não realizada."""
+    pass
+
+
+class GuardedCache:
+    """Proxy do cache Django com circuit breaker (thread-safe)."""
+
+    DEFAULT_FAILURE_THRESHOLD = 3
+    DEFAULT_COOLDOWN = 30  # segundos até a sonda
+    PROBE_KEY = "siga:cache:probe"
+
+    def __init__(
+        self,
+        backend=None,
+        failure_threshold: Optional[int] = None,
+        cooldown: Optional[float] = None,
+    ):
+        self._backend = backend or cache
+        self.failure_threshold = failure_threshold or getattr(
+            settings, 'SIGA_CACHE_FAILURE_THRESHOLD', self.DEFAULT_FAILURE_THRESHOLD
+        )
+        self.cooldown = cooldown or getattr(
+            settings, 'SIGA_CACHE_COOLDOWN', self.DEFAULT_COOLDOWN
+        )
+
+        self._lock = threading.Lock()
+        self._open = False
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._skipped = 0
+        self._probe_timer: Optional[threading.Timer] = None
+
+    # -----------------------------------------------------------------
+    # API DO CACHE (mesma assinatura do django.core.cache)
+    # -----------------------------------------------------------------
+
+    def get(self, key, default=None):
+        return self._call('get', key, default)
+
+    def set(self, key, value, timeout=None):
+        return self._call('set', key, value, timeout=timeout)
+
+    def add(self, key, value, timeout=None):
+        return self._call('add', key, value, timeout=timeout)
+
+    def delete(self, key):
+        return self._call('delete', key)
+
+    def incr(self, key, delta=1):
+        return self._call('incr', key, delta)
+
+    def get_many(self, keys):
+        return self._call('get_many', keys)
+
+    def set_many(self, mapping, timeout=None):
+        return self._call('set_many', mapping, timeout=timeout)
+
+    def delete_many(self, keys):
+        return self._call('delete_many', keys)
+
+    def set_many_timeouts(self, mapping: Dict[str, tuple]):
+        """
+        SET de várias chaves, cada uma com seu TTL: {chave: (valor, timeout)}.
+
+        django-redis: um único pipeline (uma ida ao Redis). Outros
+        backends: um set_many por TTL.
+        """
+        return self._call(self._set_many_timeouts, mapping)
+
+    def _set_many_timeouts(self, mapping: Dict[str, tuple]) -> None:
+        client = getattr(self._backend, 'client', None)
+        if not hasattr(client, 'get_client'):
+            by_timeout: Dict[Any, Dict] = {}
+            for key, (value, timeout) in mapping.items():
+                by_timeout.setdefault(timeout, {})[key] = value
+            for timeout, values in by_timeout.items():
+                self._backend.set_many(values, timeout=timeout)
+            return
+
+        pipeline = client.get_client(write=True).pipeline()
+        for key, (value, timeout) in mapping.items():
+            client.set(key, value, timeout, client=pipeline)
+        pipeline.execute()
+
+    # -----------------------------------------------------------------
+    # ESTADO
+    # -----------------------------------------------------------------
+
+    @property
+    def available(self) -> bool:
+        return not self._open
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'state': 'open' if self._open else 'closed',
+                'consecutive_failures': self._failures,
+                'opened_at': self._opened_at,
+                'skipped_calls': self._skipped,
+            }
+
+    def reset(self) -> None:
+        """Fecha o circuito (testes / intervenção manual)."""
+        with self._lock:
+            self._close()
+
+    # -----------------------------------------------------------------
+    # BREAKER
+    # -----------------------------------------------------------------
+
+    def _call(self, op, *args, **kwargs) -> Any:
+        """op: nome do método do backend, ou função que o usa."""
+        if self._open:
+            self._skipped += 1
+            raise CacheUnavailable(
+                f"Cache unavailable (circuit open), skipped {getattr(op, '__name__', op)}"
+            )
+
+        try:
+            method = op if callable(op) else getattr(self._backend, op)
+            result = method(*args, **kwargs)
+        except ValueError:
+            # incr de chave inexistente: o Redis respondeu
+            self._record_success()
+            raise
+        except Exception as e:
+            self._record_failure(e)
+            raise
+
+        self._record_success()
+        return result
+
+    def _record_success(self) -> None:
+        if self._failures:
+            with self._lock:
+                self._failures = 0
+
+    def _record_failure(self, error: Exception) -> None:
+        with self._lock:
+            self._failures += 1
+            if not self._open and self._failures >= self.failure_threshold:
+                self._open = True
+                self._opened_at = time.time()
+                logger.error(
+                    f"Cache circuit OPEN after {self._failures} failures: {error}"
+                )
+                self._schedule_probe()
+
+    def _close(self) -> None:
+        if self._open:
+            logger.info("Cache circuit CLOSED")
+        self._open = False
+        self._failures = 0
+        self._opened_at = None
+        if self._probe_timer is not None:
+            self._probe_timer.cancel()
+            self._probe_timer = None
+
+    def _schedule_probe(self) -> None:
+        timer = threading.Timer(self.cooldown, self._probe)
+        timer.daemon = True
+        self._probe_timer = timer
+        timer.start()
+
+    def _probe(self) -> None:
+        try:
+            self._backend.get(self.PROBE_KEY)
+        except Exception as e:
+            logger.warning(f"Cache probe failed: {e}")
+            with self._lock:
+                if self._open:
+                    self._schedule_probe()
+            return
+
+        with self._lock:
+            self._close()
+
+
+# Instância do processo usada pelo SigaCacheManager e views de boletos
+guarded_cache = GuardedCache()
+
+
+@receiver(setting_changed)
+def _reset_on_caches_change(setting, **kwargs):
+    """Novo backend de cache (override_settings): estado do Redis antigo não vale."""
+    if setting == 'CACHES':
+        guarded_cache.reset()
+        redis_fallback.clear()
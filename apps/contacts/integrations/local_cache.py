@@ -0,0 +1,187 @@
+# apps/contacts/integrations/local_cache.py
+"""
+Cache em memória do processo, limitado por número de entradas, bytes e TTL.
+
+Dois usos:
+- L1 na frente do Redis para valores grandes e muito lidos (ex: lista
+  processada de guardians): um hit devolve o MESMO objeto Python, sem ida
+  ao Redis nem unpickle. Quem lê deve tratar o valor como somente leitura.
+- Fallback quando o Redis está fora do ar (redis_fallback): guarda os
+  valores JÁ codificados (bytes), então o tamanho contabilizado é o real.
+
+Entradas vencidas saem por varredura periódica feita nas escritas (não
+só quando a mesma chave é lida de novo) — sem thread extra no worker.
+
+Não substitui o Redis: cada worker tem o seu, a invalidação entre
+workers é feita pela versão da chave (ver SigaCacheManager).
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from django.conf import settings
+
+# Caches nomeados do processo (ver local_caches_stats)
+_registry: Dict[str, 'LocalLRUCache'] = {}
+
+
+def _default_sizeof(value: Any) -> int:
+    """Bytes de valores codificados; tamanho raso para o resto."""
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    return sys.getsizeof(value)
+
+
+class LocalLRUCache:
+    """LRU thread-safe com TTL por entrada e orçamento de memória."""
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        ttl: Optional[float] = 60,
+        max_bytes: Optional[int] = None,
+        name: Optional[str] = None,
+        sweep_interval: float = 60,
+        sizeof: Callable[[Any], int] = _default_sizeof,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.name = name
+        self.sweep_interval = sweep_interval
+        self._sizeof = sizeof
+
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._next_sweep = time.monotonic() + sweep_interval
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expired = 0
+
+        if name:
+            _registry[name] = self
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._misses += 1
+                return default
+
+            expires_at, value, _ = entry
+            if expires_at is not None and now >= expires_at:
+                self._remove(key)
+                self._expired += 1
+                self._misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        now = time.monotonic()
+        expires_at = now + ttl if ttl else None
+        size = self._sizeof(value)
+
+        with self._lock:
+            self._remove(key)
+            if now >= self._next_sweep:
+                self._sweep(now)
+
+            # Maior que o orçamento inteiro: não guarda (nem expulsa os outros)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+
+            self._data[key] = (expires_at, value, size)
+            self._bytes += size
+
+            while len(self._data) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._data))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def delete_matching(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Remove as entradas cuja chave satisfaz o predicado. Retorna quantas saíram."""
+        with self._lock:
+            keys = [key for key in self._data if predicate(key)]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def purge_expired(self) -> int:
+        """Remove já todas as entradas vencidas. Retorna quantas saíram."""
+        with self._lock:
+            return self._sweep(time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                'entries': len(self._data),
+                'max_entries': self.max_entries,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'expired': self._expired,
+                'hit_ratio': self._hits / total if total else 0.0,
+            }
+
+    # -----------------------------------------------------------------
+    # HELPERS (chamados com _lock)
+    # -----------------------------------------------------------------
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def _sweep(self, now: float) -> int:
+        expired = [
+            key for key, (expires_at, _, _) in self._data.items()
+            if expires_at is not None and now >= expires_at
+        ]
+        for key in expired:
+            self._remove(key)
+        self._expired += len(expired)
+        self._next_sweep = now + self.sweep_interval
+        return len(expired)
+
+
+def local_caches_stats() -> Dict[str, Dict]:
+    """Métricas (entradas, bytes, hits...) de todos os caches nomeados do processo."""
+    return {name: local.stats() for name, local in list(_registry.items())}
+
+
+# Fallback compartilhado pelos caminhos "Redis fora do ar" (valores
+# codificados). Limitado em entradas E bytes: o RSS do worker não cresce
+# com o número de escolas atendidas ao longo do --max-requests.
+redis_fallback = LocalLRUCache(
+    max_entries=getattr(settings, 'REDIS_FALLBACK_CACHE_MAX_ENTRIES', 64),
+    ttl=3600,
+    max_bytes=getattr(settings, 'REDIS_FALLBACK_CACHE_MAX_MB', 64) * 1024 * 1024,
+    name='redis_fallback',
+)
@@ -4,18 +4,114 @@ Gerenciador centralizado de cache para integração SIGA - VERSÃO RESILIENTE
 
 Esta versão funciona COM ou SEM Redis disponível:
 - Se Redis está disponível: usa cache normalmente
-- Se Redis está offline: funciona sem cache (direto do SIGA)
+- Se Redis está offline: funciona sem cache (direto do SIGA); após
+  poucas falhas o GuardedCache passa a pular o Redis na hora, sem
+  esperar o timeout de conexão a cada chamada (ver cache_guard)
 
 IMPORTANTE: Sempre busca dados do SIGA quando cache falha.
+
+Se o SIGA falhar (ou o circuit breaker estiver aberto), serve a cópia
+"stale" — último dado bom, mantido muito além do TTL normal — e marca
+o dataset como desatualizado no contexto da requisição.
+
+Cache miss é SINGLE-FLIGHT: um lock no Redis (cache.add) garante que só
+um worker reconstrói a chave; os demais esperam o resultado (com limite)
+ou recebem a cópia stale, em vez de todos baixarem o SIGA ao mesmo tempo.
+
+STALE-WHILE-REVALIDATE: cada entrada guarda um TTL "soft" (o TTL normal
+da chave) dentro de um envelope salvo com TTL "hard" (24h). Depois do
+soft, o valor ainda é servido na hora e uma task Celery (deduplicada por
+chave) recarrega em background — o usuário não espera o rebuild.
+
+L1 POR PROCESSO: valores grandes e quentes (lista processada) também
+ficam num LRU em memória, indexado pela VERSÃO da escola no Redis. Um hit
+custa só o GET da versão (um inteiro) — sem transferir nem desserializar
+a lista. Invalidar ou reconstruir incrementa a versão, e todos os workers
+passam a ignorar a entrada antiga na próxima leitura.
+
+SHARDS POR GUARDIAN: a lista processada também é gravada uma chave por
+guardian (com a versão da escola no nome), e cada processo mantém no L1
+um índice id → guardian. Detalhe e boletos de um responsável leem só o
+registro dele, sem transferir a lista da escola inteira.
+
+NAMESPACE POR GERAÇÃO: toda chave de uma escola (datasets, lista,
+shards, detalhes, buscas, boletos) leva a GERAÇÃO da escola no prefixo
+(school_key). Invalidar a escola é um único INCR — nada de SCAN/DEL; as
+chaves da geração anterior deixam de ser lidas e expiram pelo próprio
+TTL. As cópias stale ficam fora do namespace (stale_key): sobrevivem ao
+refresh para cobrir uma queda do SIGA logo em seguida.
+
+Listas/dicts passam pelo codec de cache (ver cache_codec) — por padrão
+pickle comprimido com zlib.
 """
 
+import contextvars
 import logging
-from typing import List, Dict, Optional
-from django.core.cache import cache
-from ..services.siga_integration_service import SigaIntegrationService
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+from django.conf import settings
+
+from .cache_codec import decode_cache_value, encode_cache_value
+from .cache_guard import CacheUnavailable, guarded_cache
+from .local_cache import LocalLRUCache, redis_fallback
 
 logger = logging.getLogger(__name__)
 
+# Datasets servidos da cópia stale na requisição atual (None = sem rastreio)
+_stale_datasets: contextvars.ContextVar = contextvars.ContextVar(
+    'siga_stale_datasets', default=None
+)
+
+# Geração de cada escola já lida na requisição atual (None = sem memo):
+# o namespace é resolvido uma vez por requisição, não a cada leitura
+_school_generations: contextvars.ContextVar = contextvars.ContextVar(
+    'siga_school_generations', default=None
+)
+
+# Escolas cujas versões (ETag) mudaram na requisição atual (None = sem rastreio)
+_bumped_schools: contextvars.ContextVar = contextvars.ContextVar(
+    'siga_bumped_schools', default=None
+)
+
+# Métricas de single-flight do processo (ver single_flight_stats)
+_flight_stats_lock = threading.Lock()
+_flight_stats = {
+    'leaders': 0,
+    'lock_hold_seconds_total': 0.0,
+    'lock_hold_seconds_max': 0.0,
+    'waiters': 0,
+    'waiter_hits': 0,
+    'waiter_stale': 0,
+    'waiter_timeouts': 0,
+}
+
+
+# L1 do processo: {chave@versão: (valor, fresh_until)}
+_local_cache = LocalLRUCache(
+    max_entries=getattr(settings, 'SIGA_LOCAL_CACHE_MAX_ENTRIES', 32),
+    ttl=getattr(settings, 'SIGA_LOCAL_CACHE_TTL', 300),
+    name='siga_l1',
+)
+
+
+# Prefixo de geração (ver school_key) — removido nas cópias stale
+_NAMESPACE_PATTERN = re.compile(r'^siga:school:\d+:g\d+:')
+
+
+def _record_flight(**increments) -> None:
+    with _flight_stats_lock:
+        for name, value in increments.items():
+            if name == 'lock_hold_seconds_max':
+                _flight_stats[name] = max(_flight_stats[name], value)
+            else:
+                _flight_stats[name] += value
+
 
 class SigaCacheManager:
     """
@@ -30,6 +126,9 @@ class SigaCacheManager:
     TTL_GUARDIAN_DETAIL = 21600  # 6 horas
     TTL_INVOICES = 1800  # 30 minutos
     TTL_SEARCH = 900  # 15 minutos
+    TTL_STALE = 604800  # 7 dias — último dado bom para quedas do SIGA
+    TTL_HARD = 86400  # 24 horas — validade máxima das entradas revalidáveis
+    REFRESH_DEDUP_TTL = 300  # segundos — uma revalidação por chave
 
     # Padrões de chaves
     KEY_GUARDIANS_ALL = "guardians:school:{school_id}:all"
@@ -38,13 +137,44 @@ class SigaCacheManager:
     KEY_GUARDIAN_DETAIL = "guardian:detail:{guardian_id}:school:{school_id}"
     KEY_STUDENT_INVOICES = "student:invoices:{student_id}"
     KEY_SEARCH = "guardians:search:{query}:school:{school_id}"
+    KEY_STALE_SUFFIX = ":stale"
+    KEY_LOCK_SUFFIX = ":lock"
+    KEY_WAITERS_SUFFIX = ":lock:waiters"
+    KEY_REFRESHING_SUFFIX = ":refreshing"
+    KEY_SCHOOL_VERSION = "siga:school:{school_id}:version"
+    KEY_SCHOOL_GENERATION = "siga:school:{school_id}:generation"
+    KEY_SCHOOL_DATA_VERSION = "siga:school:{school_id}:data_version"
+    KEY_SCHOOL_NAMESPACE = "siga:school:{school_id}:g{generation}:"
+    KEY_GUARDIAN_SHARD = "guardians:school:{school_id}:e{epoch}:guardian:{guardian_id}"
+    KEY_GUARDIAN_SHARDS_EPOCH = "siga:school:{school_id}:shards_epoch"
+    KEY_GUARDIANS_AGGREGATION = "guardians:school:{school_id}:aggregation"
+    KEY_GUARDIAN_SEARCH_INDEX = "guardians:school:{school_id}:v{version}:search_index"
+    KEY_GUARDIAN_CARDS = "guardians:school:{school_id}:v{version}:cards"
+    KEY_GUARDIAN_INDEX = "guardians:school:{school_id}:index@v{version}"  # só L1
+
+    # Datasets SIGA: nome → (chave, método do SigaIntegrationService, TTL soft)
+    DATASETS = {
+        'guardians': (KEY_GUARDIANS_ALL, 'fetch_all_guardians', TTL_GUARDIANS_GLOBAL),
+        'students_relations': (
+            KEY_STUDENTS_RELATIONS, 'fetch_students_relations', TTL_STUDENTS_GLOBAL
+        ),
+        'students_academic': (
+            KEY_STUDENTS_ACADEMIC, 'fetch_students_academic', TTL_STUDENTS_GLOBAL
+        ),
+    }
+
+    # Single-flight
+    LOCK_TTL = 120  # segundos — libera o lock se o worker líder morrer
+    FLIGHT_WAIT_TIMEOUT = 20  # espera máxima de quem não é líder
+    FLIGHT_POLL_INTERVAL = 0.1
 
     @classmethod
     def _safe_cache_get(cls, cache_key: str) -> Optional[any]:
         """
         Busca do cache com tratamento de erro.
 
-        Se Redis estiver offline, retorna None silenciosamente.
+        Se Redis estiver offline, lê do fallback em memória do processo
+        (redis_fallback) — None se não estiver lá.
 
         Args:
             cache_key: Chave do cache
@@ -53,28 +183,96 @@ class SigaCacheManager:
             Valor do cache ou None
         """
         try:
-            return cache.get(cache_key)
+            return decode_cache_value(guarded_cache.get(cache_key))
+        except CacheUnavailable:
+            pass
         except Exception as e:
             logger.warning(f"Cache GET failed for {cache_key}: {e}")
-            return None
+        return decode_cache_value(redis_fallback.get(cache_key))
 
     @classmethod
     def _safe_cache_set(cls, cache_key: str, value: any, timeout: int) -> None:
         """
         Salva no cache com tratamento de erro.
 
-        Se Redis estiver offline, apenas loga warning.
+        Se Redis estiver offline, guarda no fallback em memória do
+        processo (limitado em entradas, bytes e TTL).
 
         Args:
             cache_key: Chave do cache
             value: Valor a cachear
             timeout: TTL em segundos
         """
+        encoded = encode_cache_value(value)
         try:
-            cache.set(cache_key, value, timeout=timeout)
+            guarded_cache.set(cache_key, encoded, timeout=timeout)
             logger.debug(f"Cache SET: {cache_key} (TTL: {timeout}s)")
+            return
+        except CacheUnavailable:
+            pass
         except Exception as e:
             logger.warning(f"Cache SET failed for {cache_key}: {e}")
+        redis_fallback.set(
+            cache_key, encoded, ttl=min(timeout or redis_fallback.ttl, redis_fallback.ttl)
+        )
+
+    @classmethod
+    def _safe_cache_get_many(cls, cache_keys: List[str]) -> Dict[str, any]:
+        """
+        Busca várias chaves num único MGET. Chaves ausentes não aparecem.
+
+        Se Redis estiver offline, lê do fallback em memória do processo.
+        """
+        try:
+            found = guarded_cache.get_many(cache_keys)
+            return {key: decode_cache_value(value) for key, value in found.items()}
+        except CacheUnavailable:
+            pass
+        except Exception as e:
+            logger.warning(f"Cache GET_MANY failed for {len(cache_keys)} keys: {e}")
+
+        found = {}
+        for key in cache_keys:
+            value = redis_fallback.get(key)
+            if value is not None:
+                found[key] = decode_cache_value(value)
+        return found
+
+    @classmethod
+    def _safe_cache_set_many(cls, mapping: Dict[str, any], timeout: int) -> None:
+        """
+        Salva várias chaves de uma vez (pipeline no django-redis).
+
+        Se Redis estiver offline, apenas loga warning (chaves pequenas e
+        numerosas — não vão para o fallback em memória).
+        """
+        try:
+            guarded_cache.set_many(
+                {key: encode_cache_value(value) for key, value in mapping.items()},
+                timeout=timeout,
+            )
+            logger.debug(f"Cache SET_MANY: {len(mapping)} keys (TTL: {timeout}s)")
+        except CacheUnavailable:
+            pass
+        except Exception as e:
+            logger.warning(f"Cache SET_MANY failed for {len(mapping)} keys: {e}")
+
+    @classmethod
+    def _safe_cache_set_many_timeouts(cls, mapping: Dict[str, Tuple[any, int]]) -> None:
+        """
+        Como _safe_cache_set_many, com um TTL por chave
+        ({chave: (valor, timeout)}) — ainda um único pipeline.
+        """
+        try:
+            guarded_cache.set_many_timeouts({
+                key: (encode_cache_value(value), timeout)
+                for key, (value, timeout) in mapping.items()
+            })
+            logger.debug(f"Cache SET_MANY: {len(mapping)} keys")
+        except CacheUnavailable:
+            pass
+        except Exception as e:
+            logger.warning(f"Cache SET_MANY failed for {len(mapping)} keys: {e}")
 
     @classmethod
     def _safe_cache_delete(cls, cache_key: str) -> None:
@@ -84,12 +282,768 @@ class SigaCacheManager:
         Args:
             cache_key: Chave do cache
         """
+        redis_fallback.delete(cache_key)
         try:
-            cache.delete(cache_key)
+            guarded_cache.delete(cache_key)
             logger.debug(f"Cache DELETE: {cache_key}")
+        except CacheUnavailable:
+            pass
         except Exception as e:
             logger.warning(f"Cache DELETE failed for {cache_key}: {e}")
 
+    # -----------------------------------------------------------------
+    # CÓPIA STALE (fallback para quedas do SIGA)
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def start_staleness_tracking(cls) -> None:
+        """
+        Inicia o rastreio de dados stale para a requisição atual.
+
+        Chamado no início da requisição: workers síncronos reutilizam a
+        thread (e o contexto), então o conjunto precisa ser recriado.
+        Os fan-outs copiam o contexto e compartilham o mesmo conjunto.
+        """
+        _stale_datasets.set(set())
+        _school_generations.set({})
+        _bumped_schools.set(set())
+
+    @classmethod
+    def mark_stale(cls, dataset: str) -> None:
+        """Registra que o dataset foi servido da cópia stale."""
+        datasets = _stale_datasets.get()
+        if datasets is None:
+            datasets = set()
+            _stale_datasets.set(datasets)
+        datasets.add(dataset)
+
+    @classmethod
+    def get_stale_datasets(cls) -> List[str]:
+        """Datasets servidos da cópia stale nesta requisição (ordenados)."""
+        return sorted(_stale_datasets.get() or ())
+
+    @classmethod
+    def versions_bumped(cls, school_id: int) -> bool:
+        """Se esta requisição mudou as versões (ETag) da escola."""
+        return school_id in (_bumped_schools.get() or ())
+
+    @classmethod
+    def _record_bump(cls, school_id: int) -> None:
+        bumped = _bumped_schools.get()
+        if bumped is not None:
+            bumped.add(school_id)
+
+    # -----------------------------------------------------------------
+    # STALE-WHILE-REVALIDATE (TTL soft + TTL hard)
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def _swr_set(cls, cache_key: str, value: any, soft_ttl: int) -> None:
+        """
+        Cacheia value num envelope: fresco por soft_ttl, mantido por TTL_HARD.
+        """
+        envelope = {
+            '__swr__': True,
+            'value': value,
+            'fresh_until': time.time() + soft_ttl,
+        }
+        cls._safe_cache_set(cache_key, envelope, timeout=max(soft_ttl, cls.TTL_HARD))
+
+    @classmethod
+    def _swr_get(cls, cache_key: str) -> Tuple[Optional[any], bool]:
+        """
+        Lê uma entrada revalidável.
+
+        Returns:
+            (valor ou None, está dentro do TTL soft)
+            Valores gravados sem envelope são considerados frescos.
+        """
+        value, fresh_until = cls._swr_get_entry(cache_key)
+        return value, value is not None and time.time() < fresh_until
+
+    @classmethod
+    def _swr_get_entry(cls, cache_key: str) -> Tuple[Optional[any], float]:
+        """(valor ou None, instante em que deixa de ser fresco)."""
+        cached = cls._safe_cache_get(cache_key)
+        if isinstance(cached, dict) and cached.get('__swr__'):
+            return cached['value'], cached['fresh_until']
+        return cached, float('inf')
+
+    @classmethod
+    def get_or_revalidate(
+            cls,
+            cache_key: str,
+            kind: str,
+            token: str,
+            local: bool = False,
+            **ids,
+    ) -> Optional[any]:
+        """
+        Valor cacheado (fresco OU vencido no TTL soft) ou None se ausente.
+
+        Vencido no soft: agenda a revalidação em background (ver
+        schedule_refresh) e devolve o valor atual sem esperar.
+
+        local=True (requer school_id): passa antes pelo L1 do processo,
+        indexado pela versão da escola. O valor devolvido é compartilhado
+        entre requisições — somente leitura.
+        """
+        l1_key = None
+        if local:
+            version = cls.get_school_version(ids['school_id'])
+            l1_key = f"{cache_key}@v{version}"
+            entry = _local_cache.get(l1_key)
+            if entry is not None:
+                value, fresh_until = entry
+                if time.time() >= fresh_until:
+                    cls.schedule_refresh(cache_key, kind, token, **ids)
+                return value
+
+        value, fresh_until = cls._swr_get_entry(cache_key)
+        if value is None:
+            return None
+
+        if l1_key is not None:
+            _local_cache.set(l1_key, (value, fresh_until))
+        if time.time() >= fresh_until:
+            cls.schedule_refresh(cache_key, kind, token, **ids)
+        return value
+
+    # -----------------------------------------------------------------
+    # VERSÃO POR ESCOLA (invalidação do L1 entre workers)
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def get_school_version(cls, school_id: int) -> int:
+        """Versão atual dos dados da escola (0 se nunca incrementada)."""
+        return cls._safe_cache_get(
+            cls.KEY_SCHOOL_VERSION.format(school_id=school_id)
+        ) or 0
+
+    @classmethod
+    def bump_school_version(cls, school_id: int) -> None:
+        """
+        Incrementa a versão da escola: entradas L1 de todos os workers
+        deixam de ser usadas (a chave L1 inclui a versão).
+        """
+        cls._bump_counter(cls.KEY_SCHOOL_VERSION.format(school_id=school_id))
+        cls._record_bump(school_id)
+        # Este processo descarta já, mesmo que o Redis tenha falhado
+        _local_cache.clear()
+
+    @classmethod
+    def _bump_counter(cls, key: str) -> None:
+        """INCR atômico de um contador sem expiração (cria com 1)."""
+        try:
+            if not guarded_cache.add(key, 1, timeout=None):
+                guarded_cache.incr(key)
+        except Exception as e:
+            logger.warning(f"Cache INCR failed for {key}: {e}")
+
+    # -----------------------------------------------------------------
+    # GERAÇÃO POR ESCOLA (namespace de todas as chaves da escola)
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def get_school_generation(cls, school_id: int) -> int:
+        """
+        Geração atual das chaves da escola (0 se nunca invalidada).
+
+        Numa requisição (start_staleness_tracking), lida do Redis só na
+        primeira vez — ou já vinda do MGET da ETag.
+        """
+        memo = _school_generations.get()
+        if memo is not None and school_id in memo:
+            return memo[school_id]
+
+        generation = cls._safe_cache_get(
+            cls.KEY_SCHOOL_GENERATION.format(school_id=school_id)
+        ) or 0
+        if memo is not None:
+            memo[school_id] = generation
+        return generation
+
+    @classmethod
+    def school_key(cls, school_id: int, key: str, generation: Optional[int] = None) -> str:
+        """Chave no namespace da geração da escola (atual, se não informada)."""
+        if generation is None:
+            generation = cls.get_school_generation(school_id)
+        return cls.KEY_SCHOOL_NAMESPACE.format(
+            school_id=school_id, generation=generation
+        ) + key
+
+    @classmethod
+    def stale_key(cls, cache_key: str) -> str:
+        """
+        Chave da cópia stale: fora do namespace de geração, para que o
+        último dado bom sobreviva à invalidação da escola.
+        """
+        return _NAMESPACE_PATTERN.sub('', cache_key, count=1) + cls.KEY_STALE_SUFFIX
+
+    @classmethod
+    def bump_school_generation(cls, school_id: int) -> None:
+        """
+        Invalida TODAS as chaves da escola com um INCR: as da geração
+        anterior deixam de ser lidas e expiram pelo próprio TTL.
+        """
+        cls._bump_counter(cls.KEY_SCHOOL_GENERATION.format(school_id=school_id))
+        cls._record_bump(school_id)
+        memo = _school_generations.get()
+        if memo is not None:
+            memo.pop(school_id, None)
+        # Sem Redis a geração não muda: descarta do fallback em memória só
+        # as chaves no namespace desta escola (cópias stale e outras escolas ficam)
+        namespace = re.compile(rf'^siga:school:{school_id}:g\d+:')
+        redis_fallback.delete_matching(
+            lambda key: isinstance(key, str) and namespace.match(key) is not None
+        )
+        logger.info(f"Cache generation bumped for school {school_id}")
+
+    # -----------------------------------------------------------------
+    # VERSÃO DOS DADOS (ETag das respostas derivadas do SIGA)
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def bump_data_version(cls, school_id: int) -> None:
+        """
+        Incrementa a versão dos dados da escola que não passam pela
+        lista processada: boletos (por aluno e crawl) e espelho local.
+        Não descarta o L1.
+        """
+        cls._bump_counter(cls.KEY_SCHOOL_DATA_VERSION.format(school_id=school_id))
+        cls._record_bump(school_id)
+
+    @classmethod
+    def get_etag_versions(cls, school_id: int) -> Optional[Tuple[int, int, int]]:
+        """
+        (geração, versão, versão dos dados) da escola num único MGET.
+
+        Qualquer invalidação, rebuild da lista, crawl ou gravação de
+        boletos muda a tupla. None se o Redis estiver fora: o fallback
+        em memória é por worker, então não há versão confiável.
+        """
+        keys = [
+            key.format(school_id=school_id)
+            for key in (
+                cls.KEY_SCHOOL_GENERATION,
+                cls.KEY_SCHOOL_VERSION,
+                cls.KEY_SCHOOL_DATA_VERSION,
+            )
+        ]
+        try:
+            found = guarded_cache.get_many(keys)
+        except CacheUnavailable:
+            return None
+        except Exception as e:
+            logger.warning(f"Cache GET_MANY failed for school {school_id} versions: {e}")
+            return None
+        versions = tuple(decode_cache_value(found.get(key)) or 0 for key in keys)
+        memo = _school_generations.get()
+        if memo is not None:
+            memo[school_id] = versions[0]
+        return versions
+
+    # -----------------------------------------------------------------
+    # SHARDS POR GUARDIAN (leitura O(1) de um responsável)
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def set_guardian_shards(
+            cls,
+            school_id: int,
+            guardians: List[Dict],
+            timeout: int,
+    ) -> None:
+        """
+        Grava cada guardian numa chave própria, numa época nova de
+        shards, e guarda o índice id → guardian no L1 deste processo.
+
+        Shards de épocas anteriores deixam de ser lidos e expiram
+        sozinhos. Rebuilds incrementais usam patch_guardian_shards.
+        """
+        cls._bump_counter(cls.KEY_GUARDIAN_SHARDS_EPOCH.format(school_id=school_id))
+        epoch = cls.get_shards_epoch(school_id)
+        cls._safe_cache_set_many(
+            {cls._guardian_shard_key(school_id, epoch, g['id']): g for g in guardians},
+            timeout=timeout,
+        )
+        cls.set_guardian_index(
+            school_id, cls.get_school_version(school_id), guardians
+        )
+
+    @classmethod
+    def patch_guardian_shards(
+            cls,
+            school_id: int,
+            guardians: List[Dict],
+            changed: List[Dict],
+            removed: Iterable,
+            timeout: int,
+    ) -> None:
+        """
+        Rebuild incremental: regrava na época atual só os guardians
+        alterados e apaga os removidos; os demais shards continuam
+        válidos. Sem época (nenhum set_guardian_shards nesta geração),
+        não há o que atualizar.
+
+        guardians: lista completa — índice id → guardian no L1.
+        """
+        epoch = cls.get_shards_epoch(school_id)
+        if epoch:
+            cls._safe_cache_set_many(
+                {cls._guardian_shard_key(school_id, epoch, g['id']): g for g in changed},
+                timeout=timeout,
+            )
+            for guardian_id in removed:
+                cls._safe_cache_delete(cls._guardian_shard_key(school_id, epoch, guardian_id))
+
+        cls.set_guardian_index(
+            school_id, cls.get_school_version(school_id), guardians
+        )
+
+    @classmethod
+    def get_shards_epoch(cls, school_id: int) -> int:
+        """Época atual dos shards da escola (0 se nunca gravados)."""
+        return cls._safe_cache_get(
+            cls.KEY_GUARDIAN_SHARDS_EPOCH.format(school_id=school_id)
+        ) or 0
+
+    @classmethod
+    def _guardian_shard_key(cls, school_id: int, epoch: int, guardian_id) -> str:
+        return cls.school_key(school_id, cls.KEY_GUARDIAN_SHARD.format(
+            school_id=school_id, epoch=epoch, guardian_id=guardian_id
+        ))
+
+    @classmethod
+    def get_guardian_index(cls, school_id: int, version: int) -> Optional[Dict]:
+        """Índice id → guardian do L1 (None se este processo não tem)."""
+        return _local_cache.get(
+            cls.KEY_GUARDIAN_INDEX.format(school_id=school_id, version=version)
+        )
+
+    @classmethod
+    def set_guardian_index(
+            cls,
+            school_id: int,
+            version: int,
+            guardians: List[Dict],
+    ) -> Dict:
+        """Monta e guarda no L1 o índice id → guardian da lista."""
+        index = {g['id']: g for g in guardians}
+        _local_cache.set(
+            cls.KEY_GUARDIAN_INDEX.format(school_id=school_id, version=version),
+            index,
+        )
+        return index
+
+    @classmethod
+    def get_guardian_shard(
+            cls,
+            school_id: int,
+            guardian_id: int,
+    ) -> Optional[Dict]:
+        """Um guardian pela chave própria (None se ausente/expirado)."""
+        epoch = cls.get_shards_epoch(school_id)
+        if not epoch:
+            return None
+        return cls._safe_cache_get(cls._guardian_shard_key(school_id, epoch, guardian_id))
+
+    # -----------------------------------------------------------------
+    # DERIVADOS DA LISTA (índice de busca, cards) — por versão da escola
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def set_guardian_search_index(cls, school_id: int, index, timeout: int) -> None:
+        """
+        Grava o índice de busca na versão atual da escola: os campos
+        normalizados (index.to_state()) no Redis, o índice montado no L1.
+
+        Chamar DEPOIS de bump_school_version, como set_guardian_shards.
+        """
+        cls._set_versioned(
+            school_id, cls.KEY_GUARDIAN_SEARCH_INDEX, index.to_state(), index, timeout
+        )
+
+    @classmethod
+    def set_guardian_search_state(cls, school_id: int, state: Dict, timeout: int) -> None:
+        """
+        Grava só os campos normalizados do índice (sem montá-lo): o L1
+        de cada worker remonta na primeira busca.
+        """
+        cls._set_versioned(
+            school_id, cls.KEY_GUARDIAN_SEARCH_INDEX, state, None, timeout
+        )
+
+    @classmethod
+    def get_guardian_search_state(cls, school_id: int, version: int) -> Optional[Dict]:
+        """Campos normalizados do índice de busca da versão (L1 → Redis)."""
+        key = cls.KEY_GUARDIAN_SEARCH_INDEX.format(school_id=school_id, version=version)
+        index = _local_cache.get(key)
+        if index is not None:
+            return index.to_state()
+        return cls._safe_cache_get(cls.school_key(school_id, key))
+
+    @classmethod
+    def get_guardian_search_index(
+            cls,
+            school_id: int,
+            version: int,
+            loader: Callable[[Dict], any],
+    ) -> Optional[any]:
+        """
+        Índice de busca do L1; senão, o estado gravado no Redis remontado
+        por loader (e guardado no L1). None se nenhum dos dois tem.
+        """
+        return cls._get_versioned(
+            school_id, version, cls.KEY_GUARDIAN_SEARCH_INDEX, loader
+        )
+
+    @classmethod
+    def set_guardian_cards(cls, school_id: int, cards: Dict, timeout: int) -> None:
+        """Cards pré-serializados {id: bytes JSON} na versão atual da escola."""
+        cls._set_versioned(school_id, cls.KEY_GUARDIAN_CARDS, cards, cards, timeout)
+
+    @classmethod
+    def get_guardian_cards(cls, school_id: int, version: int) -> Optional[Dict]:
+        """Cards pré-serializados (L1 → Redis), ou None se ausentes."""
+        return cls._get_versioned(school_id, version, cls.KEY_GUARDIAN_CARDS)
+
+    @classmethod
+    def _set_versioned(
+            cls,
+            school_id: int,
+            key_pattern: str,
+            state: any,
+            local_value: any,
+            timeout: int,
+    ) -> None:
+        key = key_pattern.format(
+            school_id=school_id, version=cls.get_school_version(school_id)
+        )
+        cls._safe_cache_set(cls.school_key(school_id, key), state, timeout)
+        if local_value is not None:
+            _local_cache.set(key, local_value)
+
+    @classmethod
+    def _get_versioned(
+            cls,
+            school_id: int,
+            version: int,
+            key_pattern: str,
+            loader: Optional[Callable[[any], any]] = None,
+    ) -> Optional[any]:
+        key = key_pattern.format(school_id=school_id, version=version)
+        value = _local_cache.get(key)
+        if value is not None:
+            return value
+
+        state = cls._safe_cache_get(cls.school_key(school_id, key))
+        if state is None:
+            return None
+
+        value = loader(state) if loader else state
+        _local_cache.set(key, value)
+        return value
+
+    # -----------------------------------------------------------------
+    # SNAPSHOT DA AGREGAÇÃO (rebuild incremental da lista)
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def get_guardians_aggregation(cls, school_id: int) -> Optional[Dict]:
+        """Hashes/índice reverso da última agregação (ver GuardianAggregatorService.snapshot)."""
+        return cls._safe_cache_get(cls.school_key(
+            school_id, cls.KEY_GUARDIANS_AGGREGATION.format(school_id=school_id)
+        ))
+
+    @classmethod
+    def set_guardians_aggregation(cls, school_id: int, state: Dict) -> None:
+        """Mesma validade máxima da lista processada (TTL hard)."""
+        cls._safe_cache_set(
+            cls.school_key(
+                school_id, cls.KEY_GUARDIANS_AGGREGATION.format(school_id=school_id)
+            ),
+            state,
+            timeout=cls.TTL_HARD,
+        )
+
+    @classmethod
+    def local_cache_stats(cls) -> Dict:
+        """Métricas do L1 deste processo."""
+        return _local_cache.stats()
+
+    @classmethod
+    def cache_health(cls) -> Dict:
+        """Estado do circuito do Redis neste processo."""
+        return guarded_cache.stats()
+
+    @classmethod
+    def schedule_refresh(cls, cache_key: str, kind: str, token: str, **ids) -> bool:
+        """
+        Enfileira refresh_siga_cache_task para a chave (uma por vez).
+
+        Returns:
+            True se a task foi enfileirada
+        """
+        refreshing_key = cache_key + cls.KEY_REFRESHING_SUFFIX
+        try:
+            if not guarded_cache.add(refreshing_key, True, timeout=cls.REFRESH_DEDUP_TTL):
+                return False
+        except Exception as e:
+            logger.warning(f"Cache ADD failed for {refreshing_key}: {e}")
+            return False
+
+        # Import tardio: tasks importa services, que importa este módulo
+        from ..tasks import refresh_siga_cache_task
+
+        try:
+            refresh_siga_cache_task.apply_async(
+                args=(cache_key, kind, token), kwargs=ids, retry=False
+            )
+        except Exception as e:
+            logger.warning(f"Could not enqueue refresh for {cache_key}: {e}")
+            cls._safe_cache_delete(refreshing_key)
+            return False
+
+        logger.info(f"Revalidation scheduled: {cache_key} ({kind})")
+        return True
+
+    @classmethod
+    def finish_refresh(cls, cache_key: str) -> None:
+        """Libera a deduplicação de revalidação da chave."""
+        cls._safe_cache_delete(cache_key + cls.KEY_REFRESHING_SUFFIX)
+
+    @classmethod
+    def refresh_dataset(cls, dataset: str, school_id: int, token: str) -> List[Dict]:
+        """
+        Recarrega um dataset SIGA ignorando o cache (usado pela revalidação).
+        """
+        key_pattern, method, ttl = cls.DATASETS[dataset]
+        cache_key = cls.school_key(school_id, key_pattern.format(school_id=school_id))
+        fetch = getattr(cls._siga_service(token), method)
+        return cls._fetch_or_stale(cache_key, dataset, fetch, ttl)
+
+    # -----------------------------------------------------------------
+    # SINGLE-FLIGHT (proteção contra dogpile em cache miss)
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def single_flight(
+            cls,
+            cache_key: str,
+            build: Callable[[], any],
+            stale_key: Optional[str] = None,
+            dataset: Optional[str] = None,
+            wait_timeout: Optional[float] = None,
+    ) -> any:
+        """
+        Reconstrói cache_key com no máximo UM worker por vez.
+
+        - Quem pega o lock (líder) executa build() — que deve cachear
+          o resultado em cache_key.
+        - Os demais consultam cache_key a cada FLIGHT_POLL_INTERVAL até
+          wait_timeout. Se o líder falhar, o lock é liberado e o próximo
+          vira líder.
+        - Estourado o limite: servem stale_key (marcando dataset como
+          stale) ou, sem cópia, reconstroem por conta própria.
+
+        Sem Redis, não há coordenação: cada chamada executa build().
+        """
+        lock_key = cache_key + cls.KEY_LOCK_SUFFIX
+        waiters_key = cache_key + cls.KEY_WAITERS_SUFFIX
+        wait_timeout = cls.FLIGHT_WAIT_TIMEOUT if wait_timeout is None else wait_timeout
+        deadline = time.monotonic() + wait_timeout
+        waiting = False
+
+        while True:
+            if waiting:
+                value = cls._swr_get(cache_key)[0]
+                if value is not None:
+                    _record_flight(waiter_hits=1)
+                    return value
+
+            lock_token = cls._acquire_lock(lock_key)
+            if lock_token is not None:
+                return cls._lead_flight(cache_key, build, lock_key, lock_token, waiters_key)
+
+            if not waiting:
+                waiting = True
+                _record_flight(waiters=1)
+                cls._safe_cache_incr(waiters_key)
+                logger.info(f"Single-flight: waiting for {cache_key}")
+
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(cls.FLIGHT_POLL_INTERVAL)
+
+        _record_flight(waiter_timeouts=1)
+
+        if stale_key:
+            stale = cls._safe_cache_get(stale_key)
+            if stale is not None:
+                logger.warning(f"Single-flight: serving stale {cache_key} after {wait_timeout}s")
+                _record_flight(waiter_stale=1)
+                if dataset:
+                    cls.mark_stale(dataset)
+                return stale
+
+        logger.warning(f"Single-flight: {cache_key} not ready after {wait_timeout}s, building")
+        return build()
+
+    @classmethod
+    @contextmanager
+    def exclusive(cls, cache_key: str, wait_timeout: Optional[float] = None):
+        """
+        Executa o bloco com o lock de single-flight de cache_key: exclui
+        o rebuild (single_flight) e outras escritas read-modify-write da
+        mesma entrada.
+
+        Espera até wait_timeout (default LOCK_TTL, quando o lock de um
+        worker morto expira); estourado, segue sem o lock.
+        """
+        lock_key = cache_key + cls.KEY_LOCK_SUFFIX
+        wait_timeout = cls.LOCK_TTL if wait_timeout is None else wait_timeout
+        deadline = time.monotonic() + wait_timeout
+
+        lock_token = cls._acquire_lock(lock_key)
+        while lock_token is None and time.monotonic() < deadline:
+            time.sleep(cls.FLIGHT_POLL_INTERVAL)
+            lock_token = cls._acquire_lock(lock_key)
+
+        if lock_token is None:
+            logger.warning(f"Lock {lock_key} not acquired after {wait_timeout}s, proceeding")
+        try:
+            yield
+        finally:
+            if lock_token is not None:
+                cls._release_lock(lock_key, lock_token)
+
+    @classmethod
+    def single_flight_stats(cls) -> Dict:
+        """Métricas de single-flight do processo (lock hold, waiters)."""
+        with _flight_stats_lock:
+            return dict(_flight_stats)
+
+    @classmethod
+    def _lead_flight(cls, cache_key, build, lock_key, lock_token, waiters_key) -> any:
+        # Outro líder pode ter terminado entre o cache miss e o lock
+        value = cls._swr_get(cache_key)[0]
+        if value is not None:
+            cls._release_lock(lock_key, lock_token)
+            return value
+
+        start = time.monotonic()
+        try:
+            return build()
+        finally:
+            held = time.monotonic() - start
+            waiters = cls._safe_cache_get(waiters_key) or 0
+            cls._release_lock(lock_key, lock_token)
+            cls._safe_cache_delete(waiters_key)
+
+            _record_flight(
+                leaders=1,
+                lock_hold_seconds_total=held,
+                lock_hold_seconds_max=held,
+            )
+            logger.info(
+                f"Single-flight: rebuilt {cache_key} in {held:.2f}s "
+                f"({waiters} waiters)"
+            )
+
+    @classmethod
+    def _acquire_lock(cls, lock_key: str) -> Optional[str]:
+        """
+        Tenta pegar o lock (SET NX). Retorna o token do dono ou None.
+
+        Se o cache estiver indisponível, considera o lock obtido.
+        """
+        lock_token = uuid.uuid4().hex
+        try:
+            if guarded_cache.add(lock_key, lock_token, timeout=cls.LOCK_TTL):
+                return lock_token
+            return None
+        except Exception as e:
+            logger.warning(f"Cache LOCK failed for {lock_key}: {e}")
+            return lock_token
+
+    @classmethod
+    def _release_lock(cls, lock_key: str, lock_token: str) -> None:
+        """Libera o lock só se ainda for nosso (pode ter expirado)."""
+        if cls._safe_cache_get(lock_key) == lock_token:
+            cls._safe_cache_delete(lock_key)
+
+    @classmethod
+    def _safe_cache_incr(cls, cache_key: str) -> None:
+        try:
+            guarded_cache.add(cache_key, 0, timeout=cls.LOCK_TTL)
+            guarded_cache.incr(cache_key)
+        except Exception as e:
+            logger.debug(f"Cache INCR failed for {cache_key}: {e}")
+
+    @classmethod
+    def _fetch_and_cache(
+            cls,
+            cache_key: str,
+            dataset: str,
+            fetch: Callable[[], any],
+            timeout: int,
+    ) -> any:
+        """
+        Busca no SIGA (single-flight) e cacheia.
+
+        Raises:
+            requests.exceptions.RequestException: SIGA falhou e não há cópia
+        """
+        return cls.single_flight(
+            cache_key,
+            lambda: cls._fetch_or_stale(cache_key, dataset, fetch, timeout),
+            stale_key=cls.stale_key(cache_key),
+            dataset=dataset,
+        )
+
+    @classmethod
+    def _fetch_or_stale(
+            cls,
+            cache_key: str,
+            dataset: str,
+            fetch: Callable[[], any],
+            timeout: int,
+    ) -> any:
+        """
+        Busca no SIGA e cacheia (TTL soft/hard + cópia stale de 7 dias).
+
+        Se o SIGA falhar, serve a cópia stale (sem recachear) e marca o
+        dataset como desatualizado.
+        """
+        stale_key = cls.stale_key(cache_key)
+
+        try:
+            data = fetch()
+        except requests.exceptions.RequestException as e:
+            stale = cls._safe_cache_get(stale_key)
+            if stale is None:
+                raise
+
+            logger.warning(f"SIGA unavailable, serving stale {cache_key}: {e}")
+            cls.mark_stale(dataset)
+            return stale
+
+        cls._swr_set(cache_key, data, soft_ttl=timeout)
+        cls._safe_cache_set(stale_key, data, timeout=cls.TTL_STALE)
+        return data
+
+    @classmethod
+    def _siga_service(cls, token: str):
+        """
+        Instancia SigaIntegrationService.
+
+        Import tardio: services importa integrations, e o serviço SIGA
+        importa o cliente HTTP deste pacote — evita import circular.
+        """
+        from ..services.siga_integration_service import SigaIntegrationService
+        return SigaIntegrationService(token)
+
     @classmethod
     def get_or_fetch_guardians(
             cls,
@@ -108,21 +1062,23 @@ class SigaCacheManager:
         Returns:
             Lista de guardians
         """
-        cache_key = cls.KEY_GUARDIANS_ALL.format(school_id=school_id)
+        cache_key = cls.school_key(
+            school_id, cls.KEY_GUARDIANS_ALL.format(school_id=school_id)
+        )
 
-        # Tenta cache (com proteção)
-        cached = cls._safe_cache_get(cache_key)
+        # Tenta cache (com proteção; vencido no soft TTL → revalida em background)
+        cached = cls.get_or_revalidate(cache_key, 'guardians', token, school_id=school_id)
         if cached:
             logger.info(f"Cache HIT: {cache_key}")
             return cached
 
         # Cache miss ou erro - busca SIGA
         logger.info(f"Cache MISS: {cache_key} - Fetching from SIGA")
-        siga_service = SigaIntegrationService(token)
-        data = siga_service.fetch_all_guardians()
-
-        # Tenta armazenar no cache (com proteção)
-        cls._safe_cache_set(cache_key, data, timeout=cls.TTL_GUARDIANS_GLOBAL)
+        siga_service = cls._siga_service(token)
+        data = cls._fetch_and_cache(
+            cache_key, 'guardians', siga_service.fetch_all_guardians,
+            timeout=cls.TTL_GUARDIANS_GLOBAL,
+        )
         logger.info(f"Fetched {len(data)} guardians from SIGA")
 
         return data
@@ -143,18 +1099,23 @@ class SigaCacheManager:
         Returns:
             Lista de students com vínculos
         """
-        cache_key = cls.KEY_STUDENTS_RELATIONS.format(school_id=school_id)
+        cache_key = cls.school_key(
+            school_id, cls.KEY_STUDENTS_RELATIONS.format(school_id=school_id)
+        )
 
-        cached = cls._safe_cache_get(cache_key)
+        cached = cls.get_or_revalidate(
+            cache_key, 'students_relations', token, school_id=school_id
+        )
         if cached:
             logger.info(f"Cache HIT: {cache_key}")
             return cached
 
         logger.info(f"Cache MISS: {cache_key} - Fetching from SIGA")
-        siga_service = SigaIntegrationService(token)
-        data = siga_service.fetch_students_relations()
-
-        cls._safe_cache_set(cache_key, data, timeout=cls.TTL_STUDENTS_GLOBAL)
+        siga_service = cls._siga_service(token)
+        data = cls._fetch_and_cache(
+            cache_key, 'students_relations', siga_service.fetch_students_relations,
+            timeout=cls.TTL_STUDENTS_GLOBAL,
+        )
         logger.info(f"Fetched {len(data)} students (relations) from SIGA")
 
         return data
@@ -175,18 +1136,23 @@ class SigaCacheManager:
         Returns:
             Lista de students com dados acadêmicos
         """
-        cache_key = cls.KEY_STUDENTS_ACADEMIC.format(school_id=school_id)
+        cache_key = cls.school_key(
+            school_id, cls.KEY_STUDENTS_ACADEMIC.format(school_id=school_id)
+        )
 
-        cached = cls._safe_cache_get(cache_key)
+        cached = cls.get_or_revalidate(
+            cache_key, 'students_academic', token, school_id=school_id
+        )
         if cached:
             logger.info(f"Cache HIT: {cache_key}")
             return cached
 
         logger.info(f"Cache MISS: {cache_key} - Fetching from SIGA")
-        siga_service = SigaIntegrationService(token)
-        data = siga_service.fetch_students_academic()
-
-        cls._safe_cache_set(cache_key, data, timeout=cls.TTL_STUDENTS_GLOBAL)
+        siga_service = cls._siga_service(token)
+        data = cls._fetch_and_cache(
+            cache_key, 'students_academic', siga_service.fetch_students_academic,
+            timeout=cls.TTL_STUDENTS_GLOBAL,
+        )
         logger.info(f"Fetched {len(data)} students (academic) from SIGA")
 
         return data
@@ -201,6 +1167,8 @@ class SigaCacheManager:
         Busca todos os dados necessários das 3 APIs com cache individual.
 
         Vantagem: Cada API tem seu próprio cache, reduzindo chamadas.
+        As 3 consultas (cache + SIGA) rodam em paralelo: num cache frio,
+        o tempo total é o do endpoint mais lento, não a soma dos três.
 
         Args:
             school_id: ID da escola
@@ -208,12 +1176,30 @@ class SigaCacheManager:
 
         Returns:
             Dict com 'guardians', 'students_relations', 'students_academic'
+
+        Raises:
+            requests.exceptions.RequestException: Se algum dataset falhar
+                (os que funcionaram continuam cacheados)
         """
-        return {
-            'guardians': cls.get_or_fetch_guardians(school_id, token),
-            'students_relations': cls.get_or_fetch_students_relations(school_id, token),
-            'students_academic': cls.get_or_fetch_students_academic(school_id, token),
-        }
+        from ..services.siga_integration_service import SigaIntegrationService
+
+        return SigaIntegrationService.run_concurrently({
+            'guardians': lambda: cls.get_or_fetch_guardians(school_id, token),
+            'students_relations': lambda: cls.get_or_fetch_students_relations(
+                school_id, token
+            ),
+            'students_academic': lambda: cls.get_or_fetch_students_academic(
+                school_id, token
+            ),
+        })
+
+    @classmethod
+    def guardian_detail_key(cls, guardian_id: int, school_id: int) -> str:
+        """Chave do detalhe do guardian (namespace da escola)."""
+        return cls.school_key(
+            school_id,
+            cls.KEY_GUARDIAN_DETAIL.format(guardian_id=guardian_id, school_id=school_id),
+        )
 
     @classmethod
     def get_or_fetch_guardian_detail(
@@ -233,10 +1219,7 @@ class SigaCacheManager:
         Returns:
             Guardian data (do cache ou fornecido)
         """
-        cache_key = cls.KEY_GUARDIAN_DETAIL.format(
-            guardian_id=guardian_id,
-            school_id=school_id
-        )
+        cache_key = cls.guardian_detail_key(guardian_id, school_id)
 
         cached = cls._safe_cache_get(cache_key)
         if cached:
@@ -252,32 +1235,224 @@ class SigaCacheManager:
     def get_or_set_student_invoices(
             cls,
             student_id: int,
-            invoices_data: Optional[List[Dict]] = None
+            invoices_data: Optional[List[Dict]] = None,
+            token: Optional[str] = None,
+            school_id: Optional[int] = None,
     ) -> Optional[List[Dict]]:
         """
-        Cacheia boletos de um aluno (30min TTL).
+        Cacheia boletos de um aluno (30min TTL soft, 24h hard).
 
         Args:
             student_id: ID do aluno
             invoices_data: Dados dos boletos (para SET) ou None (para GET)
+            token: Token SIGA — no GET, permite revalidar em background
+                boletos vencidos no TTL soft
+            school_id: Escola do aluno — põe a chave no namespace da
+                escola (invalidada pelo refresh)
 
         Returns:
             Boletos do cache ou None
         """
-        cache_key = cls.KEY_STUDENT_INVOICES.format(student_id=student_id)
+        cache_key = cls._student_invoices_key(student_id, school_id)
 
         # GET
         if invoices_data is None:
-            cached = cls._safe_cache_get(cache_key)
+            if token:
+                ids = {'student_id': student_id}
+                if school_id is not None:
+                    ids['school_id'] = school_id
+                cached = cls.get_or_revalidate(
+                    cache_key, 'student_invoices', token, **ids
+                )
+            else:
+                cached = cls._swr_get(cache_key)[0]
             if cached:
                 logger.debug(f"Cache HIT: {cache_key}")
             return cached
 
-        # SET
+        # SET (+ cópia stale para quedas do SIGA). A cópia stale é o
+        # último valor gravado: a versão dos dados só muda se o SIGA mudou
         logger.debug(f"Caching {len(invoices_data)} invoices for student {student_id}")
-        cls._safe_cache_set(cache_key, invoices_data, timeout=cls.TTL_INVOICES)
+        previous = cls._safe_cache_get(cls.stale_key(cache_key))
+        cls._swr_set(cache_key, invoices_data, soft_ttl=cls.TTL_INVOICES)
+        cls._safe_cache_set(
+            cls.stale_key(cache_key), invoices_data, timeout=cls.TTL_STALE
+        )
+        if school_id is not None and previous != invoices_data:
+            cls.bump_data_version(school_id)
         return invoices_data
 
+    @classmethod
+    def _student_invoices_key(cls, student_id: int, school_id: Optional[int]) -> str:
+        cache_key = cls.KEY_STUDENT_INVOICES.format(student_id=student_id)
+        if school_id is None:
+            return cache_key
+        return cls.school_key(school_id, cache_key)
+
+    @classmethod
+    def _student_invoices_keys(
+            cls,
+            student_ids: List,
+            school_id: Optional[int],
+            generation: Optional[int] = None,
+    ) -> Dict:
+        """{student_id: chave} — geração da escola lida uma vez só."""
+        prefix = cls.school_key(school_id, '', generation) if school_id is not None else ''
+        return {
+            sid: prefix + cls.KEY_STUDENT_INVOICES.format(student_id=sid)
+            for sid in student_ids
+        }
+
+    @classmethod
+    def get_many_student_invoices(
+            cls,
+            student_ids: List,
+            token: Optional[str] = None,
+            school_id: Optional[int] = None,
+            generation: Optional[int] = None,
+    ) -> Dict:
+        """
+        Boletos cacheados de vários alunos num único MGET.
+
+        Entradas vencidas no TTL soft são devolvidas e, com token,
+        revalidadas em background (como get_or_set_student_invoices).
+        generation: geração da escola já lida pelo chamador (evita o GET).
+
+        Returns:
+            {student_id: boletos} só dos alunos encontrados no cache
+        """
+        keys = cls._student_invoices_keys(student_ids, school_id, generation)
+        return cls._read_many_student_invoices(keys, token, school_id)[0]
+
+    @classmethod
+    def get_many_student_invoices_with_stale(
+            cls,
+            student_ids: List,
+            token: Optional[str] = None,
+            school_id: Optional[int] = None,
+            generation: Optional[int] = None,
+    ) -> Tuple[Dict, Dict]:
+        """
+        Como get_many_student_invoices, trazendo também as cópias stale
+        dos alunos ausentes (fallback se o SIGA falhar para eles).
+
+        Um MGET das entradas; um segundo, só das cópias stale dos
+        ausentes, e só se houver ausentes — no caminho comum (todos em
+        cache) nenhuma cópia stale é transferida.
+
+        Returns:
+            ({student_id: boletos} encontrados,
+             {student_id: cópia stale} dos ausentes que têm cópia)
+        """
+        keys = cls._student_invoices_keys(student_ids, school_id, generation)
+        result, misses = cls._read_many_student_invoices(keys, token, school_id)
+
+        stale = {}
+        if misses:
+            stale_keys = {sid: cls.stale_key(keys[sid]) for sid in misses}
+            found = cls._safe_cache_get_many(list(stale_keys.values()))
+            stale = {
+                sid: found[key] for sid, key in stale_keys.items()
+                if found.get(key) is not None
+            }
+
+        return result, stale
+
+    @classmethod
+    def _read_many_student_invoices(
+            cls, keys: Dict, token: Optional[str], school_id: Optional[int]
+    ) -> Tuple[Dict, List]:
+        """
+        MGET das entradas {student_id: chave}; agenda a revalidação das
+        vencidas no TTL soft. Retorna (encontrados, ids ausentes).
+        """
+        found = cls._safe_cache_get_many(list(keys.values()))
+
+        now = time.time()
+        result = {}
+        misses = []
+        for sid, cache_key in keys.items():
+            cached = found.get(cache_key)
+            fresh_until = float('inf')
+            if isinstance(cached, dict) and cached.get('__swr__'):
+                cached, fresh_until = cached['value'], cached['fresh_until']
+            if cached is None:
+                misses.append(sid)
+                continue
+
+            result[sid] = cached
+            if token and now >= fresh_until:
+                ids = {'student_id': sid}
+                if school_id is not None:
+                    ids['school_id'] = school_id
+                cls.schedule_refresh(cache_key, 'student_invoices', token, **ids)
+
+        logger.debug(f"Invoices cache: {len(result)}/{len(keys)} students hit")
+        return result, misses
+
+    @classmethod
+    def set_many_student_invoices(
+            cls,
+            invoices_by_student: Dict,
+            school_id: Optional[int] = None,
+            generation: Optional[int] = None,
+            previous: Optional[Dict] = None,
+    ) -> None:
+        """
+        Cacheia boletos de vários alunos: entradas (TTL soft/hard) e
+        cópias stale num único pipeline.
+
+        generation: grava na geração lida ANTES da busca no SIGA — se a
+        escola foi invalidada no meio, o resultado antigo não entra na
+        geração nova.
+
+        previous: {student_id: cópia stale} já lidas pelo chamador (ver
+        get_many_student_invoices_with_stale). A versão dos dados da
+        escola (ETag) só muda se algum aluno tem boletos diferentes do
+        último valor gravado; sem previous, as cópias são lidas aqui.
+        """
+        if not invoices_by_student:
+            return
+
+        keys = cls._student_invoices_keys(list(invoices_by_student), school_id, generation)
+        fresh_until = time.time() + cls.TTL_INVOICES
+        timeout = max(cls.TTL_INVOICES, cls.TTL_HARD)
+
+        mapping = {}
+        for sid, invoices in invoices_by_student.items():
+            envelope = {'__swr__': True, 'value': invoices, 'fresh_until': fresh_until}
+            mapping[keys[sid]] = (envelope, timeout)
+            mapping[cls.stale_key(keys[sid])] = (invoices, cls.TTL_STALE)
+        if school_id is not None and previous is None:
+            stale_keys = {sid: cls.stale_key(keys[sid]) for sid in invoices_by_student}
+            found = cls._safe_cache_get_many(list(stale_keys.values()))
+            previous = {sid: found.get(key) for sid, key in stale_keys.items()}
+
+        cls._safe_cache_set_many_timeouts(mapping)
+
+        if school_id is not None and any(
+            previous.get(sid) != invoices
+            for sid, invoices in invoices_by_student.items()
+        ):
+            cls.bump_data_version(school_id)
+
+    @classmethod
+    def get_stale_student_invoices(
+            cls,
+            student_id: int,
+            school_id: Optional[int] = None,
+    ) -> Optional[List[Dict]]:
+        """
+        Último conjunto de boletos conhecido do aluno (cópia stale).
+
+        Marca 'invoices' como desatualizado quando encontrado.
+        """
+        cache_key = cls._student_invoices_key(student_id, school_id)
+        stale = cls._safe_cache_get(cls.stale_key(cache_key))
+        if stale is not None:
+            cls.mark_stale('invoices')
+        return stale
+
     @classmethod
     def cache_search_results(
             cls,
@@ -295,10 +1470,10 @@ class SigaCacheManager:
         """
         query_normalized = query.lower().strip()
 
-        cache_key = cls.KEY_SEARCH.format(
+        cache_key = cls.school_key(school_id, cls.KEY_SEARCH.format(
             query=query_normalized,
             school_id=school_id
-        )
+        ))
 
         logger.debug(f"Caching search results: {cache_key} ({len(results)} items)")
         cls._safe_cache_set(cache_key, results, timeout=cls.TTL_SEARCH)
@@ -321,10 +1496,10 @@ class SigaCacheManager:
         """
         query_normalized = query.lower().strip()
 
-        cache_key = cls.KEY_SEARCH.format(
+        cache_key = cls.school_key(school_id, cls.KEY_SEARCH.format(
             query=query_normalized,
             school_id=school_id
-        )
+        ))
 
         cached = cls._safe_cache_get(cache_key)
         if cached:
@@ -336,18 +1511,15 @@ class SigaCacheManager:
         """
         Invalida todo o cache de uma escola.
 
+        Um INCR na geração tira do ar todas as famílias de chaves da
+        escola (datasets, lista, shards, detalhes, buscas, boletos); a
+        versão descarta o L1 dos workers. Cópias stale são mantidas.
+
         Args:
             school_id: ID da escola
         """
-        keys_to_delete = [
-            cls.KEY_GUARDIANS_ALL.format(school_id=school_id),
-            cls.KEY_STUDENTS_RELATIONS.format(school_id=school_id),
-            cls.KEY_STUDENTS_ACADEMIC.format(school_id=school_id),
-        ]
-
-        for key in keys_to_delete:
-            cls._safe_cache_delete(key)
-            logger.info(f"Cache invalidated: {key}")
+        cls.bump_school_generation(school_id)
+        cls.bump_school_version(school_id)
 
     @classmethod
     def invalidate_guardian_cache(cls, guardian_id: int, school_id: int) -> None:
@@ -358,10 +1530,7 @@ class SigaCacheManager:
             guardian_id: ID do guardian
             school_id: ID da escola
         """
-        cache_key = cls.KEY_GUARDIAN_DETAIL.format(
-            guardian_id=guardian_id,
-            school_id=school_id
-        )
+        cache_key = cls.guardian_detail_key(guardian_id, school_id)
 
         cls._safe_cache_delete(cache_key)
         logger.info(f"Guardian cache invalidated: {cache_key}")
\ No newline at end of file
@@ -0,0 +1,219 @@
+# apps/contacts/integrations/siga_circuit_breaker.py
+"""
+Circuit breaker por endpoint do SIGA.
+
+Quando o SIGA está lento ou fora do ar, cada requisição esperaria
+30s × 3 retries, prendendo um dos workers síncronos. O breaker conta
+falhas consecutivas por endpoint e, ao passar do limite, ABRE:
+chamadas falham imediatamente (CircuitOpenError) e o chamador serve
+a cópia "stale" do SigaCacheManager.
+
+Recuperação (half-open) é feita por uma sonda em BACKGROUND: depois de
+recovery_timeout, uma thread repete a última chamada do endpoint; se
+responder, o circuito fecha. Nenhum usuário paga o custo do teste.
+
+Estado é por processo — cada worker descobre a queda sozinho após
+poucas falhas, sem depender do Redis (que pode estar caído junto).
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Endpoint SIGA com circuito aberto — chamada não realizada."""
+    pass
+
+
+def is_siga_outage(error: Exception) -> bool:
+    """
+    Falhas que indicam SIGA indisponível (contam para o breaker).
+
+    Erros 4xx (ex: token inválido de UMA escola) não abrem o circuito
+    do endpoint para todas as escolas.
+    """
+    if isinstance(error, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+        return True
+    if isinstance(error, requests.exceptions.HTTPError):
+        response = error.response
+        return response is None or response.status_code >= 500
+    if isinstance(error, requests.exceptions.RetryError):
+        return True
+    return False
+
+
+class CircuitBreaker:
+    """Breaker de um endpoint (thread-safe)."""
+
+    DEFAULT_FAILURE_THRESHOLD = 5
+    DEFAULT_RECOVERY_TIMEOUT = 30  # segundos até a sonda
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        recovery_timeout: Optional[float] = None,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold or getattr(
+            settings, 'SIGA_BREAKER_FAILURE_THRESHOLD', self.DEFAULT_FAILURE_THRESHOLD
+        )
+        self.recovery_timeout = recovery_timeout or getattr(
+            settings, 'SIGA_BREAKER_RECOVERY_TIMEOUT', self.DEFAULT_RECOVERY_TIMEOUT
+        )
+
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._last_call: Optional[Callable] = None
+        self._probe_timer: Optional[threading.Timer] = None
+
+    # -----------------------------------------------------------------
+    # API PÚBLICA
+    # -----------------------------------------------------------------
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def call(self, fn: Callable, *args, **kwargs):
+        """
+        Executa fn protegido pelo breaker.
+
+        Raises:
+            CircuitOpenError: Circuito aberto (fail fast)
+            Exception: Erro original de fn
+        """
+        with self._lock:
+            if self._state != STATE_CLOSED:
+                raise CircuitOpenError(
+                    f"SIGA endpoint '{self.name}' unavailable (circuit {self._state})"
+                )
+            # Guardado para a sonda em background repetir
+            self._last_call = lambda: fn(*args, **kwargs)
+
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            if is_siga_outage(e):
+                self.record_failure(e)
+            raise
+
+        self.record_success()
+        return result
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+
+    def record_failure(self, error: Optional[Exception] = None) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == STATE_CLOSED and self._failures >= self.failure_threshold:
+                self._open(error)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'name': self.name,
+                'state': self._state,
+                'consecutive_failures': self._failures,
+                'opened_at': self._opened_at,
+            }
+
+    def reset(self) -> None:
+        """Fecha o circuito (testes / intervenção manual)."""
+        with self._lock:
+            self._close()
+
+    # -----------------------------------------------------------------
+    # TRANSIÇÕES (chamadas com _lock)
+    # -----------------------------------------------------------------
+
+    def _open(self, error: Optional[Exception]) -> None:
+        self._state = STATE_OPEN
+        self._opened_at = time.time()
+        logger.error(
+            f"SIGA circuit OPEN for '{self.name}' after {self._failures} failures: {error}"
+        )
+        self._schedule_probe()
+
+    def _close(self) -> None:
+        if self._state != STATE_CLOSED:
+            logger.info(f"SIGA circuit CLOSED for '{self.name}'")
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._opened_at = None
+        if self._probe_timer is not None:
+            self._probe_timer.cancel()
+            self._probe_timer = None
+
+    def _schedule_probe(self) -> None:
+        timer = threading.Timer(self.recovery_timeout, self._probe)
+        timer.daemon = True
+        self._probe_timer = timer
+        timer.start()
+
+    # -----------------------------------------------------------------
+    # SONDA HALF-OPEN (background)
+    # -----------------------------------------------------------------
+
+    def _probe(self) -> None:
+        with self._lock:
+            if self._state == STATE_CLOSED:
+                return
+            self._state = STATE_HALF_OPEN
+            probe = self._last_call
+
+        try:
+            if probe is not None:
+                probe()
+        except Exception as e:
+            with self._lock:
+                if is_siga_outage(e):
+                    logger.warning(f"SIGA probe failed for '{self.name}': {e}")
+                    self._state = STATE_OPEN
+                    self._opened_at = time.time()
+                    self._schedule_probe()
+                    return
+            # Erro não relacionado a indisponibilidade: endpoint responde
+
+        with self._lock:
+            self._close()
+
+
+# =====================================================================
+# REGISTRO POR ENDPOINT
+# =====================================================================
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    """Breaker do endpoint (um por processo)."""
+    breaker = _breakers.get(endpoint)
+    if breaker is not None:
+        return breaker
+
+    with _breakers_lock:
+        if endpoint not in _breakers:
+            _breakers[endpoint] = CircuitBreaker(endpoint)
+        return _breakers[endpoint]
+
+
+def breakers_stats() -> Dict[str, Dict]:
+    """Estado de todos os breakers do processo."""
+    return {name: breaker.stats() for name, breaker in list(_breakers.items())}
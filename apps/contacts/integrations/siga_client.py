@@ -0,0 +1,293 @@
+# apps/contacts/integrations/siga_client.py
+"""
+Cliente HTTP compartilhado para a API SIGA.
+
+Um único cliente por processo (gunicorn worker / Celery worker):
+- Session com pool de conexões keep-alive por host
+- Pool dimensionado para o fan-out de boletos (centenas de chamadas)
+- Retry automático para erros transitórios
+- Rate limit distribuído por escola (SigaRateLimiter), com prioridade
+  para requisições interativas sobre crawls em background
+- Estatísticas do pool (reuso de conexões, conexões abertas)
+
+Todos os pontos que falam com o SIGA devem usar get_siga_client()
+em vez de requests.get() ou requests.Session() próprios — assim o
+handshake TLS com siga.activesoft.com.br é feito uma vez por conexão
+do pool, e não uma vez por requisição.
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .siga_rate_limiter import SigaRateLimiter
+
+logger = logging.getLogger(__name__)
+
+SIGA_BASE_URL = "https://siga.activesoft.com.br/api/v0"
+
+
+class SigaClient:
+    """
+    Cliente HTTP thread-safe para o SIGA com pool de conexões.
+
+    requests.Session é seguro para uso concorrente em GETs simples;
+    o pool do urllib3 controla quantas conexões ficam abertas por host.
+    """
+
+    DEFAULT_TIMEOUT = 30  # segundos
+    DEFAULT_POOL_CONNECTIONS = 4  # hosts distintos mantidos no pool
+    DEFAULT_POOL_MAXSIZE = 32  # conexões keep-alive por host
+    MAX_429_RETRIES = 2
+
+    def __init__(
+        self,
+        base_url: str = SIGA_BASE_URL,
+        pool_connections: Optional[int] = None,
+        pool_maxsize: Optional[int] = None,
+        rate_limiter: Optional[SigaRateLimiter] = None,
+    ):
+        self.base_url = base_url.rstrip('/')
+        self.pool_connections = pool_connections or getattr(
+            settings, 'SIGA_HTTP_POOL_CONNECTIONS', self.DEFAULT_POOL_CONNECTIONS
+        )
+        self.pool_maxsize = pool_maxsize or getattr(
+            settings, 'SIGA_HTTP_POOL_MAXSIZE', self.DEFAULT_POOL_MAXSIZE
+        )
+        self._adapter = self._create_adapter()
+        self.session = self._create_session()
+        self.rate_limiter = rate_limiter or SigaRateLimiter()
+
+        self._stats_lock = threading.Lock()
+        self._requests_total = 0
+        self._errors_total = 0
+        self._throttled_total = 0
+        self._rate_limit_wait = 0.0
+
+    # -----------------------------------------------------------------
+    # SESSION
+    # -----------------------------------------------------------------
+
+    def _create_adapter(self) -> HTTPAdapter:
+        """
+        Adapter com retry e pool dimensionado para o fan-out.
+
+        pool_block=True: se todas as conexões estiverem em uso, a thread
+        espera uma conexão livre em vez de abrir (e descartar) conexões
+        extras — que seria um novo handshake TLS a cada vez.
+
+        429 NÃO entra no retry do urllib3: o backoff de 1s/2s/4s dentro
+        da thread não coordena com os outros processos. O 429 é tratado
+        em get(), esvaziando o bucket compartilhado do rate limiter.
+        """
+        retry_strategy = Retry(
+            total=3,
+            backoff_factor=1,  # 1s, 2s, 4s
+            status_forcelist=[500, 502, 503, 504],
+            allowed_methods=["GET"],
+        )
+
+        return HTTPAdapter(
+            max_retries=retry_strategy,
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=True,
+        )
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        session.mount("http://", self._adapter)
+        session.mount("https://", self._adapter)
+        return session
+
+    # -----------------------------------------------------------------
+    # REQUISIÇÕES
+    # -----------------------------------------------------------------
+
+    def build_url(self, path: str) -> str:
+        """
+        Monta URL absoluta. Aceita path relativo ('informacoes_boleto/')
+        ou URL completa (ex: link 'next' de paginação).
+        """
+        if path.startswith('http://') or path.startswith('https://'):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    @staticmethod
+    def get_headers(token: str) -> Dict[str, str]:
+        """Headers padrão de autenticação SIGA."""
+        return {
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json",
+        }
+
+    def get(
+        self,
+        path: str,
+        token: str,
+        params: Optional[Dict] = None,
+        timeout: Optional[float] = None,
+        stream: bool = False,
+    ) -> requests.Response:
+        """
+        GET autenticado no SIGA usando o pool compartilhado.
+
+        Args:
+            path: Path relativo à BASE_URL ou URL absoluta
+            token: Application token da escola
+            params: Query parameters
+            timeout: Timeout em segundos (default: 30)
+            stream: Não baixa o corpo imediatamente
+
+        Returns:
+            requests.Response (sem raise_for_status — o chamador decide)
+
+        Raises:
+            requests.exceptions.RequestException: Erros de rede
+            SigaRateLimited: Sem capacidade no rate limit a tempo
+        """
+        with self._stats_lock:
+            self._requests_total += 1
+
+        attempt = 0
+        while True:
+            waited = self.rate_limiter.acquire(token)
+            if waited:
+                with self._stats_lock:
+                    self._rate_limit_wait += waited
+
+            try:
+                response = self.session.get(
+                    self.build_url(path),
+                    headers=self.get_headers(token),
+                    params=params,
+                    timeout=timeout or self.DEFAULT_TIMEOUT,
+                    stream=stream,
+                )
+            except requests.exceptions.RequestException:
+                with self._stats_lock:
+                    self._errors_total += 1
+                raise
+
+            if response.status_code != 429 or attempt >= self.MAX_429_RETRIES:
+                return response
+
+            attempt += 1
+            with self._stats_lock:
+                self._throttled_total += 1
+            self.rate_limiter.penalize(token, self._retry_after(response))
+            response.close()
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        """Lê Retry-After (segundos) de uma resposta 429."""
+        value = response.headers.get('Retry-After')
+        try:
+            return float(value) if value else None
+        except ValueError:
+            return None
+
+    # -----------------------------------------------------------------
+    # ESTATÍSTICAS DO POOL
+    # -----------------------------------------------------------------
+
+    def pool_stats(self) -> Dict:
+        """
+        Estatísticas do pool de conexões.
+
+        - connections_opened: conexões TCP/TLS abertas desde o início
+        - http_requests: requisições HTTP feitas pelo urllib3 (inclui retries)
+        - reuse_ratio: fração de requisições que reaproveitaram conexão
+        - idle_connections: conexões keep-alive livres no pool agora
+        """
+        hosts = {}
+        total_connections = 0
+        total_http_requests = 0
+        total_idle = 0
+
+        pools = self._adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+
+            # A fila do pool é pré-preenchida com None; só conta conexões reais
+            idle = (
+                sum(1 for conn in list(pool.pool.queue) if conn is not None)
+                if pool.pool is not None else 0
+            )
+            hosts[f"{pool.scheme}://{pool.host}:{pool.port}"] = {
+                'connections_opened': pool.num_connections,
+                'http_requests': pool.num_requests,
+                'idle_connections': idle,
+            }
+            total_connections += pool.num_connections
+            total_http_requests += pool.num_requests
+            total_idle += idle
+
+        reuse_ratio = (
+            round(1 - total_connections / total_http_requests, 4)
+            if total_http_requests else 0.0
+        )
+
+        with self._stats_lock:
+            requests_total = self._requests_total
+            errors_total = self._errors_total
+            throttled_total = self._throttled_total
+            rate_limit_wait = self._rate_limit_wait
+
+        return {
+            'pid': os.getpid(),
+            'pool_maxsize': self.pool_maxsize,
+            'requests': requests_total,
+            'errors': errors_total,
+            'throttled_429': throttled_total,
+            'rate_limit_wait_seconds': round(rate_limit_wait, 3),
+            'connections_opened': total_connections,
+            'http_requests': total_http_requests,
+            'idle_connections': total_idle,
+            'reuse_ratio': reuse_ratio,
+            'hosts': hosts,
+        }
+
+    def close(self) -> None:
+        """Fecha todas as conexões do pool."""
+        self.session.close()
+
+
+# =====================================================================
+# SINGLETON POR PROCESSO
+# =====================================================================
+
+_client: Optional[SigaClient] = None
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+
+
+def get_siga_client() -> SigaClient:
+    """
+    Retorna o cliente SIGA do processo atual (criado sob demanda).
+
+    Recria o cliente após fork (gunicorn --preload, Celery prefork):
+    sockets herdados do processo pai não podem ser compartilhados.
+    """
+    global _client, _client_pid
+
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _client_lock:
+        if _client is None or _client_pid != pid:
+            _client = SigaClient()
+            _client_pid = pid
+            logger.info(
+                f"SIGA client created (pid={pid}, pool_maxsize={_client.pool_maxsize})"
+            )
+        return _client
@@ -0,0 +1,253 @@
+# apps/contacts/integrations/siga_fanout.py
+"""
+Motor de fan-out para chamadas SIGA por aluno (informacoes_boleto).
+
+Substitui os ThreadPoolExecutor(max_workers=10) espalhados pelas views
+e services por um único mecanismo:
+- Loop asyncio com semáforo limitando chamadas simultâneas por fan-out
+- Deadline por chamada, contado a partir do início da execução (e
+  deadline total opcional, que inclui a fila do executor)
+- Resultados ordenados (map) ou em streaming conforme completam
+  (iter_completed)
+
+As chamadas HTTP continuam síncronas (requests + pool do SigaClient);
+elas rodam num executor ÚNICO por processo, dimensionado para a
+concorrência configurada. Assim um crawl de 2.000 alunos não cria uma
+thread por requisição nem ondas sequenciais de 10.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class FanoutResult(NamedTuple):
+    """Resultado de uma chamada do fan-out."""
+    index: int
+    item: Any
+    value: Any = None
+    error: Optional[BaseException] = None
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class FanoutDeadlineExceeded(TimeoutError):
+    """Chamada não executada/concluída dentro do deadline."""
+    pass
+
+
+# =====================================================================
+# EXECUTOR COMPARTILHADO POR PROCESSO
+# =====================================================================
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_pid: Optional[int] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """
+    Executor de I/O bloqueante compartilhado por todos os fan-outs
+    do processo (recriado após fork).
+    """
+    global _executor, _executor_pid
+
+    pid = os.getpid()
+    if _executor is not None and _executor_pid == pid:
+        return _executor
+
+    with _executor_lock:
+        if _executor is None or _executor_pid != pid:
+            max_workers = getattr(
+                settings, 'SIGA_FANOUT_MAX_THREADS',
+                SigaFanout.DEFAULT_CONCURRENCY,
+            )
+            _executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix='siga-fanout'
+            )
+            _executor_pid = pid
+        return _executor
+
+
+# =====================================================================
+# FAN-OUT
+# =====================================================================
+
+class SigaFanout:
+    """
+    Executa fn(item) para cada item com concorrência limitada.
+
+    Uso:
+        fanout = SigaFanout()
+        results = fanout.map(fetch_invoices, student_ids)      # ordenado
+        for r in fanout.iter_completed(fetch_invoices, ids):    # streaming
+            ...
+    """
+
+    DEFAULT_CONCURRENCY = 32
+    DEFAULT_CALL_TIMEOUT = 15  # segundos
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        call_timeout: Optional[float] = None,
+        total_timeout: Optional[float] = None,
+    ):
+        """
+        Args:
+            concurrency: Máximo de chamadas simultâneas neste fan-out
+            call_timeout: Deadline de cada chamada (segundos)
+            total_timeout: Deadline do fan-out inteiro (None = sem limite)
+        """
+        self.concurrency = concurrency or getattr(
+            settings, 'SIGA_FANOUT_CONCURRENCY', self.DEFAULT_CONCURRENCY
+        )
+        self.call_timeout = call_timeout or getattr(
+            settings, 'SIGA_FANOUT_CALL_TIMEOUT', self.DEFAULT_CALL_TIMEOUT
+        )
+        self.total_timeout = total_timeout
+
+    # -----------------------------------------------------------------
+    # API PÚBLICA
+    # -----------------------------------------------------------------
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> List[FanoutResult]:
+        """
+        Executa fn em todos os itens e retorna resultados NA ORDEM de entrada.
+
+        Exceções de fn não interrompem o fan-out: ficam em result.error.
+        """
+        items = list(items)
+        results: List[Optional[FanoutResult]] = [None] * len(items)
+
+        for result in self.iter_completed(fn, items):
+            results[result.index] = result
+
+        return results
+
+    def iter_completed(
+        self, fn: Callable[[Any], Any], items: Iterable[Any]
+    ) -> Iterator[FanoutResult]:
+        """
+        Executa fn em todos os itens e entrega resultados CONFORME COMPLETAM.
+
+        O loop asyncio roda numa thread auxiliar, então funciona tanto em
+        views síncronas (WSGI) quanto quando já existe um loop rodando.
+        """
+        items = list(items)
+        if not items:
+            return
+
+        results: queue.Queue = queue.Queue()
+        done = object()
+        context = contextvars.copy_context()
+
+        def run_loop():
+            try:
+                asyncio.run(self._run(fn, items, results.put, context))
+            except Exception as e:  # pragma: no cover - falha do próprio loop
+                logger.exception(f"Fan-out loop failed: {e}")
+            finally:
+                results.put(done)
+
+        thread = threading.Thread(target=run_loop, name='siga-fanout-loop', daemon=True)
+        thread.start()
+
+        while True:
+            result = results.get()
+            if result is done:
+                break
+            yield result
+
+        thread.join()
+
+    # -----------------------------------------------------------------
+    # INTERNOS
+    # -----------------------------------------------------------------
+
+    async def _run(self, fn, items, emit, context: contextvars.Context) -> None:
+        loop = asyncio.get_running_loop()
+        executor = _get_executor()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        deadline = (
+            loop.time() + self.total_timeout if self.total_timeout else None
+        )
+
+        def remaining() -> Optional[float]:
+            return None if deadline is None else deadline - loop.time()
+
+        def mark_started(started: asyncio.Future) -> None:
+            if not started.done():
+                started.set_result(None)
+
+        async def call(index: int, item: Any) -> None:
+            async with semaphore:
+                start = time.monotonic()
+                if deadline is not None and remaining() <= 0:
+                    emit(FanoutResult(
+                        index, item,
+                        error=FanoutDeadlineExceeded('Fan-out deadline exceeded'),
+                    ))
+                    return
+
+                # Cada chamada roda numa cópia do contexto do chamador
+                # (contextvars como marcadores de request continuam visíveis)
+                started = loop.create_future()
+                run = functools.partial(context.copy().run, fn, item)
+
+                def run_in_thread():
+                    loop.call_soon_threadsafe(mark_started, started)
+                    return run()
+
+                task = loop.run_in_executor(executor, run_in_thread)
+
+                # O executor é compartilhado entre fan-outs: o tempo na fila
+                # dele conta só no deadline total, não no da chamada
+                try:
+                    await asyncio.wait_for(asyncio.shield(started), remaining())
+                except asyncio.TimeoutError:
+                    task.cancel()
+                    emit(FanoutResult(
+                        index, item,
+                        error=FanoutDeadlineExceeded('Fan-out deadline exceeded'),
+                        elapsed=time.monotonic() - start,
+                    ))
+                    return
+
+                timeout = self.call_timeout
+                if deadline is not None:
+                    timeout = min(timeout, remaining())
+
+                try:
+                    value = await asyncio.wait_for(task, timeout)
+                    emit(FanoutResult(
+                        index, item, value=value, elapsed=time.monotonic() - start
+                    ))
+                except asyncio.TimeoutError:
+                    emit(FanoutResult(
+                        index, item,
+                        error=FanoutDeadlineExceeded(
+                            f'Call exceeded {timeout:.1f}s deadline'
+                        ),
+                        elapsed=time.monotonic() - start,
+                    ))
+                except Exception as e:
+                    emit(FanoutResult(
+                        index, item, error=e, elapsed=time.monotonic() - start
+                    ))
+
+        await asyncio.gather(*(call(i, item) for i, item in enumerate(items)))
@@ -0,0 +1,277 @@
+# apps/contacts/integrations/siga_rate_limiter.py
+"""
+Rate limiter distribuído para o SIGA (token bucket por escola/token).
+
+Gunicorn workers, Celery e jobs do Ofelia usam o mesmo token de escola
+sem coordenação; quando o sync horário coincide com um usuário no
+dashboard, o SIGA responde 429. Este limiter guarda o bucket no Redis
+(script Lua atômico), então todos os processos dividem o mesmo limite.
+
+Duas faixas de prioridade:
+- interactive: requisições de usuário — usam o bucket inteiro
+- background: crawls/syncs — só consomem enquanto o bucket está acima
+  de uma reserva, deixando folga para as interativas passarem na frente
+
+Se o Redis estiver indisponível, cai para um bucket local ao processo
+(limita por worker em vez de globalmente, mas nunca bloqueia a API).
+"""
+
+import contextlib
+import contextvars
+import hashlib
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_BACKGROUND = 'background'
+
+_current_priority = contextvars.ContextVar(
+    'siga_request_priority', default=PRIORITY_INTERACTIVE
+)
+
+
+def get_current_priority() -> str:
+    """Faixa de prioridade das chamadas SIGA no contexto atual."""
+    return _current_priority.get()
+
+
+@contextlib.contextmanager
+def siga_priority(priority: str):
+    """
+    Define a faixa de prioridade das chamadas SIGA dentro do bloco.
+
+    Uso (commands / tasks Celery):
+        with siga_priority(PRIORITY_BACKGROUND):
+            crawl()
+
+    O SigaFanout propaga o contexto para as chamadas paralelas.
+    """
+    reset_token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(reset_token)
+
+
+class SigaRateLimited(requests.exceptions.RequestException):
+    """Não foi possível obter permissão para chamar o SIGA a tempo."""
+    pass
+
+
+# Token bucket atômico. Retorna o tempo de espera (s) — "0" = liberado.
+# floor: tokens que precisam SOBRAR após o consumo (reserva da faixa).
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local floor = tonumber(ARGV[4])
+
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1])
+local ts = tonumber(data[2])
+if tokens == nil then
+    tokens = burst
+    ts = now
+end
+if now > ts then
+    tokens = math.min(burst, tokens + (now - ts) * rate)
+    ts = now
+end
+
+local wait = 0
+if tokens - 1 >= floor then
+    tokens = tokens - 1
+else
+    wait = (floor + 1 - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', ts)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+return tostring(wait)
+"""
+
+_PENALIZE_LUA = """
+redis.call('HSET', KEYS[1], 'tokens', ARGV[1], 'ts', ARGV[2])
+redis.call('EXPIRE', KEYS[1], math.ceil(tonumber(ARGV[3])) + 60)
+return 1
+"""
+
+
+class SigaRateLimiter:
+    """
+    Token bucket por token de escola, compartilhado via Redis.
+    """
+
+    KEY_BUCKET = "siga:ratelimit:{token_hash}"
+    REDIS_RETRY_AFTER = 30  # segundos sem tentar Redis após falha
+
+    DEFAULT_RATE = 10.0  # requisições/segundo por escola
+    DEFAULT_BURST = 20
+    DEFAULT_BACKGROUND_RESERVE = 0.5  # fração do burst reservada p/ interativas
+    DEFAULT_MAX_WAIT = {
+        PRIORITY_INTERACTIVE: 30,
+        PRIORITY_BACKGROUND: 300,
+    }
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        background_reserve: Optional[float] = None,
+        use_redis: bool = True,
+    ):
+        self.rate = float(rate or getattr(settings, 'SIGA_RATE_LIMIT_PER_SECOND', self.DEFAULT_RATE))
+        self.burst = int(burst or getattr(settings, 'SIGA_RATE_LIMIT_BURST', self.DEFAULT_BURST))
+        reserve = background_reserve
+        if reserve is None:
+            reserve = getattr(
+                settings, 'SIGA_RATE_LIMIT_BACKGROUND_RESERVE', self.DEFAULT_BACKGROUND_RESERVE
+            )
+        self.background_floor = self.burst * float(reserve)
+        self.enabled = getattr(settings, 'SIGA_RATE_LIMIT_ENABLED', True)
+
+        self._use_redis = use_redis
+        self._redis_down_until = 0.0
+        self._scripts = None
+
+        self._local_lock = threading.Lock()
+        self._local_buckets: Dict[str, Tuple[float, float]] = {}
+
+    # -----------------------------------------------------------------
+    # API PÚBLICA
+    # -----------------------------------------------------------------
+
+    def acquire(
+        self,
+        token: str,
+        priority: Optional[str] = None,
+        max_wait: Optional[float] = None,
+    ) -> float:
+        """
+        Bloqueia até haver capacidade para UMA chamada ao SIGA.
+
+        Args:
+            token: Token da escola (o bucket é por token)
+            priority: 'interactive' ou 'background' (default: contexto)
+            max_wait: Espera máxima em segundos (default: por faixa)
+
+        Returns:
+            Tempo total esperado (segundos)
+
+        Raises:
+            SigaRateLimited: Se a espera passaria de max_wait
+        """
+        if not self.enabled:
+            return 0.0
+
+        priority = priority or get_current_priority()
+        if max_wait is None:
+            max_wait = self.DEFAULT_MAX_WAIT.get(priority, 30)
+
+        floor = self.background_floor if priority == PRIORITY_BACKGROUND else 0.0
+        key = self._bucket_key(token)
+        waited = 0.0
+
+        while True:
+            wait = self._take(key, floor)
+            if wait <= 0:
+                if waited:
+                    logger.debug(f"SIGA rate limit: waited {waited:.2f}s ({priority})")
+                return waited
+
+            if waited + wait > max_wait:
+                raise SigaRateLimited(
+                    f"SIGA rate limit: no capacity within {max_wait}s ({priority})"
+                )
+
+            time.sleep(wait)
+            waited += wait
+
+    def penalize(self, token: str, retry_after: Optional[float]) -> None:
+        """
+        Esvazia o bucket após um 429 do SIGA.
+
+        Todos os processos passam a esperar ~retry_after antes da próxima
+        chamada com este token (em vez de cada thread fazer backoff sozinha).
+        """
+        retry_after = max(float(retry_after or 1), 0.1)
+        tokens = -retry_after * self.rate
+        now = time.time()
+        key = self._bucket_key(token)
+
+        logger.warning(f"SIGA returned 429 — pausing token bucket for {retry_after:.1f}s")
+
+        if self._redis_available():
+            try:
+                self._get_scripts()[1](keys=[key], args=[tokens, now, retry_after])
+                return
+            except Exception as e:
+                self._mark_redis_down(e)
+
+        with self._local_lock:
+            self._local_buckets[key] = (tokens, now)
+
+    # -----------------------------------------------------------------
+    # BUCKET
+    # -----------------------------------------------------------------
+
+    def _bucket_key(self, token: str) -> str:
+        token_hash = hashlib.sha1((token or '').encode()).hexdigest()[:16]
+        return self.KEY_BUCKET.format(token_hash=token_hash)
+
+    def _take(self, key: str, floor: float) -> float:
+        """Tenta consumir 1 token. Retorna 0 ou segundos até haver capacidade."""
+        if self._redis_available():
+            try:
+                take = self._get_scripts()[0]
+                return float(take(keys=[key], args=[self.rate, self.burst, time.time(), floor]))
+            except Exception as e:
+                self._mark_redis_down(e)
+
+        return self._take_local(key, floor)
+
+    def _take_local(self, key: str, floor: float) -> float:
+        """Mesmo algoritmo do Lua, em memória (fallback sem Redis)."""
+        now = time.time()
+        with self._local_lock:
+            tokens, ts = self._local_buckets.get(key, (float(self.burst), now))
+            if now > ts:
+                tokens = min(self.burst, tokens + (now - ts) * self.rate)
+                ts = now
+
+            if tokens - 1 >= floor:
+                self._local_buckets[key] = (tokens - 1, ts)
+                return 0.0
+
+            self._local_buckets[key] = (tokens, ts)
+            return (floor + 1 - tokens) / self.rate
+
+    # -----------------------------------------------------------------
+    # REDIS
+    # -----------------------------------------------------------------
+
+    def _redis_available(self) -> bool:
+        return self._use_redis and time.monotonic() >= self._redis_down_until
+
+    def _mark_redis_down(self, error: Exception) -> None:
+        logger.warning(f"SIGA rate limiter: Redis unavailable, using local bucket: {error}")
+        self._redis_down_until = time.monotonic() + self.REDIS_RETRY_AFTER
+        self._scripts = None
+
+    def _get_scripts(self):
+        if self._scripts is None:
+            from django_redis import get_redis_connection
+
+            conn = get_redis_connection('default')
+            self._scripts = (
+                conn.register_script(_TOKEN_BUCKET_LUA),
+                conn.register_script(_PENALIZE_LUA),
+            )
+        return self._scripts
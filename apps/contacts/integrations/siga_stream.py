@@ -0,0 +1,248 @@
+# apps/contacts/integrations/siga_stream.py
+"""
+Ingestão incremental (streaming) dos datasets grandes do SIGA.
+
+response.json() sobre lista_responsaveis_dados_sensiveis /
+lista_alunos_dados_sensiveis materializa o corpo inteiro (bytes + str +
+objetos com TODOS os campos sensíveis de todas as pessoas) — o pico de
+memória do worker fica várias vezes maior que o payload.
+
+Aqui o corpo é lido em blocos (iter_content) e decodificado registro a
+registro com json.JSONDecoder.raw_decode; cada registro é projetado nos
+campos que o agregador/serializers usam antes do próximo ser lido.
+
+Formatos aceitos (por página):
+- Array no topo:             [ {...}, {...} ]
+- Envelope paginado (DRF):   {"count": N, "next": url, "results": [ ... ]}
+  → os links "next" são seguidos como em SchoolDashboardView._fetch_students
+"""
+
+import codecs
+import json
+import logging
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = ' \t\n\r'
+
+
+# =====================================================================
+# PROJEÇÃO: campos usados por GuardianAggregatorService / serializers
+# =====================================================================
+
+GUARDIAN_FIELDS = frozenset({
+    'id', 'nome', 'cpf_cnpj', 'cpf', 'email', 'celular', 'fone', 'sexo',
+    'data_nascimento', 'estado_civil', 'rg', 'rg_orgao_emissor',
+    'profissao_nome', 'local_trabalho',
+    'logradouro', 'complemento', 'bairro', 'cidade', 'uf', 'cep',
+})
+
+STUDENT_RELATION_FIELDS = frozenset({
+    'id', 'nome', 'matricula', 'url_foto',
+    'mae_id', 'pai_id', 'responsavel_id', 'responsavel_secundario_id',
+})
+
+STUDENT_ACADEMIC_FIELDS = frozenset({
+    'id_aluno', 'nome_curso', 'nome_serie', 'nome_turma',
+    'situacao_aluno_turma',
+})
+
+
+def project(record: Any, fields: Optional[Iterable[str]]) -> Any:
+    """Mantém só os campos pedidos (None = registro inteiro)."""
+    if fields is None or not isinstance(record, dict):
+        return record
+    return {k: record[k] for k in fields if k in record}
+
+
+# =====================================================================
+# PARSER INCREMENTAL
+# =====================================================================
+
+class _Reader:
+    """Buffer de texto alimentado por iter_content sob demanda."""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """Lê mais um bloco. Retorna False no fim do corpo."""
+        if self.eof:
+            return False
+
+        # Descarta o que já foi consumido (mantém o buffer pequeno)
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+
+        for chunk in self._chunks:
+            if chunk:
+                self.buf += self._decoder.decode(chunk)
+                return True
+
+        self.buf += self._decoder.decode(b'', final=True)
+        self.eof = True
+        return False
+
+    def peek(self) -> str:
+        """Próximo caractere não-branco ('' no fim do corpo)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"SIGA stream: expected {char!r}, got {found!r}")
+        self.pos += 1
+
+    def value(self, decoder: json.JSONDecoder) -> Any:
+        """
+        Decodifica UM valor JSON a partir da posição atual.
+
+        Se o valor ainda não chegou inteiro, lê mais blocos e tenta de
+        novo. Um valor que termina exatamente no fim do buffer também
+        força nova leitura (ex: número "12" que pode ser "123").
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+
+            if end == len(self.buf) and not self.eof:
+                self.fill()
+                continue
+
+            self.pos = end
+            return value
+
+
+def iter_json_array_records(
+    chunks: Iterator[bytes],
+    fields: Optional[Iterable[str]] = None,
+    meta: Optional[Dict] = None,
+) -> Iterator[Any]:
+    """
+    Percorre registros de um corpo JSON sem materializar o documento.
+
+    Args:
+        chunks: Blocos de bytes (ex: response.iter_content(...))
+        fields: Projeção aplicada a cada registro (None = tudo)
+        meta: Dict preenchido com as demais chaves de um envelope
+            paginado (ex: 'next', 'count')
+    """
+    reader = _Reader(iter(chunks))
+    decoder = json.JSONDecoder()
+    fields = tuple(fields) if fields is not None else None
+
+    first = reader.peek()
+    if first == '[':
+        yield from _iter_array(reader, decoder, fields)
+    elif first == '{':
+        yield from _iter_envelope(reader, decoder, fields, meta)
+    elif first:
+        raise ValueError(f"SIGA stream: unexpected payload start {first!r}")
+
+
+def _iter_array(reader: _Reader, decoder, fields) -> Iterator[Any]:
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.pos += 1
+        return
+
+    while True:
+        yield project(reader.value(decoder), fields)
+
+        sep = reader.peek()
+        reader.pos += 1
+        if sep == ']':
+            return
+        if sep != ',':
+            raise ValueError(f"SIGA stream: expected ',' or ']', got {sep!r}")
+
+
+def _iter_envelope(reader: _Reader, decoder, fields, meta) -> Iterator[Any]:
+    reader.expect('{')
+    if reader.peek() == '}':
+        reader.pos += 1
+        return
+
+    while True:
+        key = reader.value(decoder)
+        reader.expect(':')
+
+        if key == 'results' and reader.peek() == '[':
+            yield from _iter_array(reader, decoder, fields)
+        else:
+            value = reader.value(decoder)
+            if meta is not None:
+                meta[key] = value
+
+        sep = reader.peek()
+        reader.pos += 1
+        if sep == '}':
+            return
+        if sep != ',':
+            raise ValueError(f"SIGA stream: expected ',' or '}}', got {sep!r}")
+
+
+# =====================================================================
+# PAGINAÇÃO SIGA
+# =====================================================================
+
+def iter_siga_records(
+    client,
+    path: str,
+    token: str,
+    fields: Optional[Iterable[str]] = None,
+    timeout: Optional[float] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[Any]:
+    """
+    Registros de um endpoint SIGA, em streaming, seguindo links 'next'.
+
+    Args:
+        client: SigaClient (pool compartilhado + rate limit)
+        path: Endpoint relativo ou URL absoluta
+        token: Token da escola
+        fields: Projeção por registro (None = registro inteiro)
+
+    Raises:
+        requests.exceptions.RequestException: Erro HTTP/conexão
+        ValueError: Corpo não é JSON válido
+    """
+    next_url = path
+    pages = 0
+
+    while next_url:
+        response = client.get(next_url, token, timeout=timeout, stream=True)
+        try:
+            response.raise_for_status()
+
+            meta: Dict = {}
+            yield from iter_json_array_records(
+                response.iter_content(chunk_size=chunk_size), fields, meta
+            )
+        finally:
+            response.close()
+
+        pages += 1
+        next_url = meta.get('next')
+
+    if pages > 1:
+        logger.debug(f"SIGA stream: {path} read in {pages} pages")
@@ -0,0 +1,186 @@
+# apps/contacts/management/commands/_synthetic_school.py
+"""
+Dados sintéticos de uma escola para os benchmarks (benchmark_cache_codec,
+benchmark_json_renderer, benchmark_guardian_aggregation). Mesmo formato
+dos blobs/respostas reais.
+"""
+
+import time
+
+INVOICES_PER_STUDENT = 6
+
+
+def child(sid, rng):
+    return {
+        'id': sid,
+        'nome': f'Aluno {sid} da Silva',
+        'matricula': f'2025{sid:06d}',
+        'turma': f'{rng.randint(1, 9)}º Ano {rng.choice("ABC")}',
+        'serie': f'{rng.randint(1, 9)}º Ano',
+        'turma_nome': f'{rng.randint(1, 9)}º ANO {rng.choice("ABC")} - MATUTINO',
+        'periodo': rng.choice(['Matutino', 'Vespertino']),
+        'status': 'ativo',
+        'url_foto': None,
+    }
+
+
+def guardian(gid, total, rng):
+    return {
+        'id': gid,
+        'nome': f'Responsável {gid} Souza',
+        'cpf': f'{rng.randint(0, 99999999999):011d}',
+        'email': f'resp{gid}@email.com',
+        'telefone': f'119{rng.randint(0, 99999999):08d}',
+        'sexo': rng.choice('MF'),
+        'telefone_fixo': None,
+        'data_nascimento': '1985-04-12',
+        'estado_civil': 'Casado(a)',
+        'rg': f'{rng.randint(0, 999999999)}',
+        'rg_orgao': 'SSP',
+        'profissao': 'Professor(a)',
+        'local_trabalho': None,
+        'endereco': {
+            'logradouro': f'Rua {rng.randint(1, 500)}', 'complemento': '',
+            'bairro': 'Centro', 'cidade': 'São Paulo', 'uf': 'SP', 'cep': '01000000',
+        },
+        'parentesco': rng.choice(['mae', 'pai', 'responsavel_principal']),
+        'parentesco_display': 'Mãe',
+        'filhos': [child(rng.randint(1, total), rng) for _ in range(rng.randint(1, 2))],
+        'documentos': [
+            {'id': i, 'tipo': tipo, 'nome': tipo.upper(), 'status': 'entregue', 'data_entrega': None}
+            for i, tipo in enumerate(['cpf', 'rg', 'email', 'telefone', 'comprovante_residencia'], 1)
+        ],
+        'resumo_financeiro': {
+            'tem_pendencia': False, 'total_abertos': 0,
+            'valor_pendente': 0, 'proximo_vencimento': None,
+        },
+        'resumo_documentos': {'total': 5, 'entregues': 5, 'pendentes': 0, 'completo': True},
+    }
+
+
+def guardians_list(total, rng):
+    """Lista processada de guardians (GuardianService, envelope SWR)."""
+    guardians = [guardian(gid, total, rng) for gid in range(1, int(total * 1.3) + 1)]
+    return {'__swr__': True, 'value': guardians, 'fresh_until': time.time() + 7200}
+
+
+def students_dataset(total, rng, fields):
+    """Dataset lista_alunos_dados_sensiveis projetado (SigaCacheManager)."""
+    return [
+        {
+            field: (sid if field == 'id' else rng.randint(1, total) if field.endswith('_id')
+                    else f'{field}-{sid}')
+            for field in sorted(fields)
+        }
+        for sid in range(1, total + 1)
+    ]
+
+
+def siga_datasets(total, rng):
+    """
+    As 3 APIs SIGA projetadas (siga_stream): responsáveis, alunos com
+    vínculos (mae_id, pai_id, ...) e dados acadêmicos.
+    """
+    total_guardians = int(total * 1.3)
+    guardians = [
+        {
+            'id': gid,
+            'nome': f'Responsável {gid} Souza',
+            'cpf_cnpj': f'{rng.randint(0, 99999999999):011d}',
+            'email': f'resp{gid}@email.com' if rng.random() < 0.9 else None,
+            'celular': f'119{rng.randint(0, 99999999):08d}',
+            'fone': None,
+            'sexo': rng.choice('MF'),
+            'data_nascimento': '1985-04-12T00:00:00',
+            'estado_civil': rng.randint(0, 5),
+            'rg': f'{rng.randint(0, 999999999)}',
+            'rg_orgao_emissor': 'SSP',
+            'profissao_nome': 'Professor(a)',
+            'local_trabalho': None,
+            'logradouro': f'Rua {rng.randint(1, 500)}', 'complemento': '',
+            'bairro': 'Centro', 'cidade': 'São Paulo', 'uf': 'SP', 'cep': '01000000',
+        }
+        for gid in range(1, total_guardians + 1)
+    ]
+
+    relations = []
+    for sid in range(1, total + 1):
+        mae_id = rng.randint(1, total_guardians)
+        pai_id = rng.randint(1, total_guardians) if rng.random() < 0.7 else None
+        relations.append({
+            'id': sid,
+            'nome': f'Aluno {sid} da Silva',
+            'matricula': f'2025{sid:06d}',
+            'url_foto': None,
+            'mae_id': mae_id,
+            'pai_id': pai_id,
+            'responsavel_id': rng.choice([mae_id, pai_id, rng.randint(1, total_guardians)]),
+            'responsavel_secundario_id': (
+                rng.randint(1, total_guardians) if rng.random() < 0.1 else None
+            ),
+        })
+
+    academic = [
+        {
+            'id_aluno': sid,
+            'nome_curso': f'{rng.randint(1, 9)}º Ano {rng.choice("ABC")}',
+            'nome_serie': f'{rng.randint(1, 9)}º Ano',
+            'nome_turma': f'{rng.randint(1, 9)}º ANO {rng.choice("ABC")} - {rng.choice(["MANHÃ", "TARDE"])}',
+            'situacao_aluno_turma': rng.choice(['Cursando', 'Cursando', 'Transferido']),
+        }
+        for sid in range(1, total + 1)
+        if rng.random() < 0.97
+    ]
+    return guardians, relations, academic
+
+
+def boleto(sid, n, rng):
+    """Boleto no contrato BoletoSerializer (InvoiceService._format_invoice)."""
+    situacao = rng.choice(['ABE', 'LIQ'])
+    return {
+        'numero': sid * 100 + n,
+        'parcela': f'{n + 1}/12',
+        'vencimento': f'2025-{n % 12 + 1:02d}-10',
+        'valor': 850.0,
+        'valor_pago': 850.0 if situacao == 'LIQ' else 0.0,
+        'valor_multa': 0.0,
+        'valor_juros': 0.0,
+        'situacao': situacao,
+        'situacao_display': 'Pago' if situacao == 'LIQ' else 'Em aberto',
+        'banco': 'Banco do Brasil',
+        'linha_digitavel': f'00190.00009 {rng.randint(0, 10 ** 10):010d}',
+        'link_pagamento': f'https://pagamento.example.com/{sid}/{n}',
+        'servico': 'Mensalidade',
+    }
+
+
+def all_invoices(total, rng):
+    """all_invoices_school_{id} (sync_invoice_stats / StudentInvoiceView)."""
+    students = []
+    for sid in range(1, total + 1):
+        students.append({
+            'student_id': sid,
+            'student_name': f'Aluno {sid} da Silva',
+            'student_registration': f'2025{sid:06d}',
+            'student_class': f'{rng.randint(1, 9)}º Ano',
+            'invoices': [
+                {
+                    'invoice_number': sid * 100 + n,
+                    'bank': 'Banco do Brasil',
+                    'due_date': f'2025-{n + 1:02d}-10T00:00:00',
+                    'payment_date': None,
+                    'total_amount': 850.0,
+                    'received_amount': rng.choice([0.0, 850.0]),
+                    'status_code': rng.choice(['ABE', 'LIQ']),
+                    'installment': f'{n + 1}/12',
+                    'digitable_line': f'00190.00009 {rng.randint(0, 10 ** 10):010d}',
+                    'payment_url': f'https://pagamento.example.com/{sid}/{n}',
+                }
+                for n in range(INVOICES_PER_STUDENT)
+            ],
+        })
+    return {
+        'students': students,
+        'summary': {'total_students': total, 'total_invoices': total * INVOICES_PER_STUDENT},
+        'last_updated': '2025-01-01T00:00:00',
+    }
@@ -0,0 +1,85 @@
+# apps/contacts/management/commands/benchmark_cache_codec.py
+"""
+Compara os codecs de cache (tamanho, encode, decode) nos blobs SIGA.
+
+Uso:
+    python manage.py benchmark_cache_codec                       # 1k, 10k, 50k alunos
+    python manage.py benchmark_cache_codec --students 3000 --repeat 5
+
+Blobs sintéticos por escola:
+- lista processada de guardians (GuardianService, envelope SWR)
+- dataset lista_alunos_dados_sensiveis projetado (SigaCacheManager)
+- all_invoices_school_{id} (sync_invoice_stats)
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.contacts.integrations.cache_codec import get_codec
+from apps.contacts.integrations.siga_stream import STUDENT_RELATION_FIELDS
+
+from . import _synthetic_school as synthetic
+
+CODECS = ('pickle', 'pickle-zlib', 'compact')
+
+
+def _timed(fn, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best * 1000
+
+
+class Command(BaseCommand):
+    help = 'Compara codecs de cache (pickle × pickle-zlib × compact) em escolas sintéticas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--students', type=int, nargs='+', default=[1000, 10000, 50000],
+            help='Tamanhos de escola (número de alunos)',
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='Repetições (melhor tempo)')
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+        self.stdout.write(self.style.SUCCESS('🗜️  CODECS DE CACHE SIGA'))
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+
+        for total in options['students']:
+            rng = random.Random(total)
+            blobs = {
+                'lista processada': synthetic.guardians_list(total, rng),
+                'dataset alunos': synthetic.students_dataset(total, rng, STUDENT_RELATION_FIELDS),
+                'all_invoices': synthetic.all_invoices(total, rng),
+            }
+
+            self.stdout.write(f'\n🏫 Escola sintética: {total} alunos')
+            self.stdout.write(
+                f'{"blob":<18} {"codec":<12} {"tamanho":>12} {"× pickle":>9} '
+                f'{"encode":>10} {"decode":>10}'
+            )
+
+            for blob_name, value in blobs.items():
+                baseline = None
+                for codec_name in CODECS:
+                    codec = get_codec(codec_name)
+                    data, encode_ms = _timed(lambda: codec.encode(value), repeat)
+                    decoded, decode_ms = _timed(lambda: codec.decode(data), repeat)
+
+                    if decoded != value:
+                        self.stdout.write(self.style.ERROR(f'❌ {codec_name}: round-trip diferente'))
+
+                    size = len(data)
+                    baseline = baseline or size
+                    self.stdout.write(
+                        f'{blob_name:<18} {codec_name:<12} {size / 1024:>10.0f}KB '
+                        f'{size / baseline:>8.2f}x {encode_ms:>8.1f}ms {decode_ms:>8.1f}ms'
+                    )
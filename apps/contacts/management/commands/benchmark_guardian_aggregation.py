@@ -0,0 +1,69 @@
+# apps/contacts/management/commands/benchmark_guardian_aggregation.py
+"""
+Mede o JOIN das 3 APIs SIGA (GuardianAggregatorService) — o passo
+principal do rebuild da lista de guardians.
+
+Uso:
+    python manage.py benchmark_guardian_aggregation                 # 1k, 10k, 50k alunos
+    python manage.py benchmark_guardian_aggregation --students 20000 --repeat 5
+
+Métricas por tamanho de escola:
+- tempo (melhor de --repeat execuções)
+- heap pico (tracemalloc) durante a agregação, sem contar os datasets
+  de entrada (já carregados antes da medição)
+"""
+
+import random
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from apps.contacts.services.guardian_aggregator_service import GuardianAggregatorService
+
+from . import _synthetic_school as synthetic
+
+
+class Command(BaseCommand):
+    help = 'Mede tempo e pico de memória do JOIN das APIs SIGA (GuardianAggregatorService)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--students', type=int, nargs='+', default=[1000, 10000, 50000],
+            help='Tamanhos de escola (número de alunos)',
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='Repetições (melhor tempo)')
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+        self.stdout.write(self.style.SUCCESS('🔗 AGREGAÇÃO SIGA (responsáveis × alunos × acadêmico)'))
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+        self.stdout.write(
+            f'{"alunos":>8} {"responsáveis":>13} {"vínculos":>9} {"tempo":>10} {"heap pico":>10}'
+        )
+
+        for total in options['students']:
+            datasets = synthetic.siga_datasets(total, random.Random(total))
+            build = lambda: GuardianAggregatorService().build_guardians_response(*datasets)
+
+            best = None
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                guardians = build()
+                elapsed = time.perf_counter() - start
+                best = elapsed if best is None else min(best, elapsed)
+                del guardians
+
+            tracemalloc.start()
+            try:
+                guardians = build()
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            links = sum(len(g['filhos']) for g in guardians)
+            self.stdout.write(
+                f'{total:>8} {len(guardians):>13} {links:>9} '
+                f'{best * 1000:>8.0f}ms {peak / (1024 * 1024):>8.1f}MB'
+            )
+            del guardians
@@ -0,0 +1,111 @@
+# apps/contacts/management/commands/benchmark_json_renderer.py
+"""
+Compara JSONRenderer (DRF) × FastJSONRenderer (orjson) nas maiores
+respostas da API.
+
+Uso:
+    python manage.py benchmark_json_renderer                      # 1k, 10k alunos
+    python manage.py benchmark_json_renderer --students 3000 --repeat 5
+
+Respostas sintéticas (mesmo formato das reais):
+- StudentInvoiceView  → boletos de todos os alunos da escola
+- StudentGuardianView → todos os responsáveis com filhos (GuardianDetailSerializer)
+- detalhe do guardian → um responsável, filhos com boletos
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from apps.contacts.serializers.guardian_serializers import GuardianDetailSerializer
+from core.renderers import HAS_ORJSON, FastJSONRenderer
+
+from . import _synthetic_school as synthetic
+
+DETAIL_BOLETOS_PER_CHILD = 24
+
+
+def _timed(fn, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best * 1000
+
+
+class Command(BaseCommand):
+    help = 'Compara JSONRenderer × FastJSONRenderer nas maiores respostas da API'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--students', type=int, nargs='+', default=[1000, 10000],
+            help='Tamanhos de escola (número de alunos)',
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='Repetições (melhor tempo)')
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        stock, fast = JSONRenderer(), FastJSONRenderer()
+
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+        self.stdout.write(self.style.SUCCESS('⚡ RENDERER JSON DA API'))
+        self.stdout.write(self.style.SUCCESS('=' * 78))
+        if not HAS_ORJSON:
+            self.stdout.write(self.style.WARNING('⚠️  orjson não instalado: FastJSONRenderer = JSONRenderer'))
+
+        for total in options['students']:
+            rng = random.Random(total)
+            responses = {
+                'StudentInvoiceView': self._student_invoices(total, rng),
+                'StudentGuardianView': self._student_guardians(total, rng),
+                'detalhe guardian': self._guardian_detail(total, rng),
+            }
+
+            self.stdout.write(f'\n🏫 Escola sintética: {total} alunos')
+            self.stdout.write(
+                f'{"resposta":<20} {"tamanho":>10} {"DRF":>10} {"orjson":>10} '
+                f'{"ganho":>7}  bytes'
+            )
+
+            for name, data in responses.items():
+                expected, stock_ms = _timed(lambda: stock.render(data), repeat)
+                rendered, fast_ms = _timed(lambda: fast.render(data), repeat)
+
+                same = 'iguais' if rendered == expected else self.style.ERROR('DIFERENTES')
+                self.stdout.write(
+                    f'{name:<20} {len(expected) / 1024:>8.0f}KB {stock_ms:>8.1f}ms '
+                    f'{fast_ms:>8.1f}ms {stock_ms / max(fast_ms, 1e-6):>6.1f}x  {same}'
+                )
+
+    # -----------------------------------------------------------------
+    # RESPOSTAS SINTÉTICAS (dados já serializados, como chegam ao renderer)
+    # -----------------------------------------------------------------
+
+    def _student_invoices(self, total, rng):
+        return {
+            **synthetic.all_invoices(total, rng),
+            'cached': True,
+            'cache_info': 'Dados do cache (atualizados a cada 1 hora)',
+            'cache_key': 'siga:school:1:g0:all_invoices_school_1',
+        }
+
+    def _student_guardians(self, total, rng):
+        guardians = synthetic.guardians_list(total, rng)['value']
+        return {
+            'total_guardians': len(guardians),
+            'guardians': GuardianDetailSerializer(guardians, many=True).data,
+        }
+
+    def _guardian_detail(self, total, rng):
+        guardian = synthetic.guardian(1, total, rng)
+        for filho in guardian['filhos']:
+            filho['boletos'] = [
+                synthetic.boleto(filho['id'], n, rng) for n in range(DETAIL_BOLETOS_PER_CHILD)
+            ]
+            filho['resumo_boletos'] = {'total': DETAIL_BOLETOS_PER_CHILD, 'valor_total': 20400.0}
+        return GuardianDetailSerializer(guardian).data
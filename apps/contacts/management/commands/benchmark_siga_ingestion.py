@@ -0,0 +1,134 @@
+# apps/contacts/management/commands/benchmark_siga_ingestion.py
+"""
+Mede o pico de memória da ingestão dos datasets SIGA:
+response.json() (corpo inteiro) × streaming com projeção de campos.
+
+Uso:
+    python manage.py benchmark_siga_ingestion                 # payload sintético
+    python manage.py benchmark_siga_ingestion --records 20000
+    python manage.py benchmark_siga_ingestion --school-id 3   # SIGA real
+
+Métricas por caminho:
+- heap pico (tracemalloc) — memória Python alocada durante a ingestão
+- RSS máximo do processo (ru_maxrss) — o streaming roda PRIMEIRO, para
+  que o pico do json.loads não mascare o dele
+"""
+
+import json
+import resource
+import sys
+import time
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from apps.contacts.integrations.siga_client import get_siga_client
+from apps.contacts.integrations.siga_stream import (
+    GUARDIAN_FIELDS,
+    iter_json_array_records,
+    iter_siga_records,
+)
+
+GUARDIANS_PATH = "lista_responsaveis_dados_sensiveis/"
+
+
+def _max_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KB; macOS: bytes
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def _measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = fn()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak / (1024 * 1024), _max_rss_mb()
+
+
+class Command(BaseCommand):
+    help = 'Compara pico de memória: response.json() × ingestão em streaming'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--records', type=int, default=10000, help='Registros do payload sintético')
+        parser.add_argument('--school-id', type=int, help='Mede contra o SIGA real desta escola')
+
+    def handle(self, *args, **options):
+        school_id = options.get('school_id')
+
+        if school_id:
+            stream_fn, full_fn, label = self._live(school_id)
+        else:
+            stream_fn, full_fn, label = self._synthetic(options['records'])
+
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+        self.stdout.write(self.style.SUCCESS(f'📦 INGESTÃO SIGA — {label}'))
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+
+        rows = []
+        for name, fn in (('streaming + projeção', stream_fn), ('response.json()', full_fn)):
+            records, elapsed, peak_mb, rss_mb = _measure(fn)
+            rows.append((name, len(records), elapsed, peak_mb, rss_mb))
+            del records
+
+        for name, count, elapsed, peak_mb, rss_mb in rows:
+            self.stdout.write(
+                f'{name:<22} {count:>7} registros  {elapsed:6.2f}s  '
+                f'heap pico {peak_mb:8.1f} MB  RSS máx {rss_mb:8.1f} MB'
+            )
+
+        stream_peak, full_peak = rows[0][3], rows[1][3]
+        if stream_peak:
+            self.stdout.write(self.style.SUCCESS(
+                f'\n✅ Pico de heap {full_peak / stream_peak:.1f}x menor com streaming'
+            ))
+
+    # -----------------------------------------------------------------
+    # FONTES
+    # -----------------------------------------------------------------
+
+    def _synthetic(self, total):
+        """Payload no formato de lista_responsaveis_dados_sensiveis."""
+        record = {field: f'valor-{field}-' + 'x' * 24 for field in GUARDIAN_FIELDS}
+        # Campos sensíveis que o agregador não usa
+        record.update({f'campo_extra_{i}': 'y' * 40 for i in range(40)})
+
+        body = json.dumps(
+            [{**record, 'id': i} for i in range(total)]
+        ).encode()
+        chunk = 64 * 1024
+
+        def chunks():
+            view = memoryview(body)
+            for i in range(0, len(body), chunk):
+                yield bytes(view[i:i + chunk])
+
+        def stream():
+            return list(iter_json_array_records(chunks(), GUARDIAN_FIELDS))
+
+        def full():
+            # Equivalente a response.json(): texto decodificado + objetos
+            return json.loads(body.decode('utf-8'))
+
+        return stream, full, f'sintético ({total} registros, {len(body) / 1024 / 1024:.1f} MB)'
+
+    def _live(self, school_id):
+        from apps.schools.models import School
+
+        school = School.objects.get(id=school_id)
+        token = school.application_token
+        client = get_siga_client()
+
+        def stream():
+            return list(iter_siga_records(client, GUARDIANS_PATH, token, fields=GUARDIAN_FIELDS, timeout=60))
+
+        def full():
+            response = client.get(GUARDIANS_PATH, token, timeout=60)
+            response.raise_for_status()
+            return response.json()
+
+        return stream, full, f'SIGA real — {school.school_name}'
@@ -18,6 +18,8 @@ from django.contrib.auth.models import User
 from django.core.cache import cache
 from django.utils import timezone
 from apps.schools.models import School
+from apps.contacts.integrations.cache_codec import decode_cache_value
+from apps.contacts.integrations.siga_cache_manager import SigaCacheManager
 import requests
 
 try:
@@ -255,8 +257,10 @@ class Command(BaseCommand):
             self.stdout.write("   Cache desabilitado (--no-cache)")
         else:
             try:
-                cache_key = f"all_invoices_school_{school.id}"
-                cached_data = cache.get(cache_key)
+                cache_key = SigaCacheManager.school_key(
+                    school.id, f"all_invoices_school_{school.id}"
+                )
+                cached_data = decode_cache_value(cache.get(cache_key))
 
                 if cached_data:
                     self.stdout.write(Fore.GREEN + "   ✓ Dados em cache encontrados")
@@ -15,6 +15,8 @@ OU:
 import requests
 from django.contrib.auth.models import User
 from apps.schools.models import School
+from apps.contacts.integrations.cache_codec import decode_cache_value
+from apps.contacts.integrations.siga_cache_manager import SigaCacheManager
 from django.core.cache import cache
 from django.utils import timezone
 
@@ -250,8 +252,8 @@ print("\n" + "=" * 70)
 print("💾 CACHE")
 print("=" * 70 + "\n")
 
-cache_key = f"all_invoices_school_{school.id}"
-cached_data = cache.get(cache_key)
+cache_key = SigaCacheManager.school_key(school.id, f"all_invoices_school_{school.id}")
+cached_data = decode_cache_value(cache.get(cache_key))
 
 if cached_data:
     print(f"✓ Dados em cache encontrados")
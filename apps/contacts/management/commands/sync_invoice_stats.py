@@ -3,7 +3,13 @@ from django.core.management.base import BaseCommand
 from django.core.cache import cache
 from django.utils import timezone
 from apps.schools.models import School
-import requests
+from apps.contacts.integrations.cache_codec import encode_cache_value
+from apps.contacts.integrations.siga_cache_manager import SigaCacheManager
+from apps.contacts.integrations.siga_client import get_siga_client
+from apps.contacts.integrations.siga_fanout import SigaFanout
+from apps.contacts.integrations.siga_rate_limiter import PRIORITY_BACKGROUND, siga_priority
+from apps.contacts.services.guardian_service import GuardianService
+from apps.contacts.services.invoice_warehouse_service import InvoiceWarehouseService
 import sys
 
 
@@ -51,11 +57,15 @@ class Command(BaseCommand):
             self.stdout.write(f'[{idx}/{len(schools)}] 🏫 {school.school_name} (ID: {school.id})')
 
             try:
-                invoices_data = self._process_school(school)
+                # Crawl em background: cede o rate limit para usuários
+                with siga_priority(PRIORITY_BACKGROUND):
+                    invoices_data = self._process_school(school)
 
                 # 💾 SALVAR NO CACHE
-                cache_key = f"all_invoices_school_{school.id}"
-                cache.set(cache_key, invoices_data, timeout=3600)  # 1 hora
+                cache_key = SigaCacheManager.school_key(
+                    school.id, f"all_invoices_school_{school.id}"
+                )
+                cache.set(cache_key, encode_cache_value(invoices_data), timeout=3600)  # 1 hora
 
                 self.stdout.write(self.style.SUCCESS(
                     f'✅ {invoices_data["summary"]["total_students"]} alunos, '
@@ -80,6 +90,12 @@ class Command(BaseCommand):
         self.stdout.write(f'✅ Sucesso: {success_count}')
         self.stdout.write(f'❌ Erros: {error_count}')
         self.stdout.write(f'⏱️  Tempo: {duration:.2f}s')
+
+        pool = get_siga_client().pool_stats()
+        self.stdout.write(
+            f'🔌 Conexões SIGA: {pool["connections_opened"]} abertas para '
+            f'{pool["http_requests"]} requisições (reuso: {pool["reuse_ratio"]:.1%})'
+        )
         self.stdout.write('=' * 70 + '\n')
 
     def _process_school(self, school):
@@ -100,60 +116,77 @@ class Command(BaseCommand):
 
         all_invoices = []
         students_with_invoices = []
+        crawled = {}
 
-        headers = {
-            "Authorization": f"Bearer {school.application_token}",
-            "Content-Type": "application/json"
-        }
+        client = get_siga_client()
+        token = school.application_token
 
-        for idx, student in enumerate(students, 1):
-            student_id = student.get('id')
-            if not student_id:
-                continue
+        def fetch_invoices(student):
+            response = client.get(
+                "informacoes_boleto/", token,
+                params={'id_aluno': student['id']}, timeout=10,
+            )
+            # Erro ≠ "sem boletos": o aluno fica fora do armazém nesta rodada
+            response.raise_for_status()
+            return response.json().get('resultados', [])
+
+        # Fan-out concorrente; map() mantém a ordem dos alunos
+        students = [s for s in students if s.get('id')]
+        results = SigaFanout().map(fetch_invoices, students)
 
+        for idx, result in enumerate(results, 1):
             if self.verbose and idx % 50 == 0:
                 self.stdout.write(f'      {idx}/{len(students)} alunos...')
 
-            try:
-                url = "https://siga.activesoft.com.br/api/v0/informacoes_boleto/"
-                params = {'id_aluno': student_id}
-
-                response = requests.get(url, headers=headers, params=params, timeout=10)
-
-                if response.status_code == 200:
-                    data = response.json()
-                    invoices = data.get('resultados', [])
-
-                    if invoices:
-                        student_invoices = {
-                            'student_id': student_id,
-                            'student_name': student.get('nome'),
-                            'student_registration': student.get('matricula'),
-                            'student_class': invoices[0].get('turma') if invoices else None,
-                            'invoices': []
-                        }
-
-                        for invoice in invoices:
-                            invoice_data = {
-                                "invoice_number": invoice.get("titulo"),
-                                "bank": invoice.get("nome_banco"),
-                                "due_date": invoice.get("dt_vencimento"),
-                                "payment_date": invoice.get("dt_pagamento"),
-                                "total_amount": invoice.get("valor_documento"),
-                                "received_amount": invoice.get("valor_recebido_total"),
-                                "status_code": invoice.get("situacao_titulo"),
-                                "installment": invoice.get("parcela_cobranca"),
-                                "digitable_line": invoice.get("linha_digitavel"),
-                                "payment_url": invoice.get("link_pagamento"),
-                            }
-                            student_invoices['invoices'].append(invoice_data)
-                            all_invoices.append(invoice_data)
-
-                        students_with_invoices.append(student_invoices)
-
-            except requests.exceptions.RequestException:
+            if not result.ok:
                 continue
 
+            student = result.item
+            invoices = result.value
+            crawled[student['id']] = invoices
+
+            if invoices:
+                student_invoices = {
+                    'student_id': student['id'],
+                    'student_name': student.get('nome'),
+                    'student_registration': student.get('matricula'),
+                    'student_class': invoices[0].get('turma') if invoices else None,
+                    'invoices': []
+                }
+
+                for invoice in invoices:
+                    invoice_data = {
+                        "invoice_number": invoice.get("titulo"),
+                        "bank": invoice.get("nome_banco"),
+                        "due_date": invoice.get("dt_vencimento"),
+                        "payment_date": invoice.get("dt_pagamento"),
+                        "total_amount": invoice.get("valor_documento"),
+                        "received_amount": invoice.get("valor_recebido_total"),
+                        "status_code": invoice.get("situacao_titulo"),
+                        "installment": invoice.get("parcela_cobranca"),
+                        "digitable_line": invoice.get("linha_digitavel"),
+                        "payment_url": invoice.get("link_pagamento"),
+                    }
+                    student_invoices['invoices'].append(invoice_data)
+                    all_invoices.append(invoice_data)
+
+                students_with_invoices.append(student_invoices)
+
+        # 💾 Armazém local de boletos (stats/dashboard via SQL)
+        warehouse = InvoiceWarehouseService.upsert_student_invoices(
+            school.id, crawled, all_student_ids=[s['id'] for s in students],
+        )
+        if self.verbose:
+            self.stdout.write(
+                f'   ✓ Armazém: {warehouse["invoices"]} boletos gravados, '
+                f'{warehouse["removed"]} removidos'
+            )
+
+        # 📊 Resumos financeiros da lista de guardians (filtro sem boletos)
+        updated = GuardianService.apply_invoice_rollups(school.id)
+        if self.verbose and updated is not None:
+            self.stdout.write(f'   ✓ Resumos financeiros: {updated} responsáveis')
+
         # 3️⃣ Calcular estatísticas
         total_invoices = len(all_invoices)
         paid = sum(1 for inv in all_invoices if inv['status_code'] == 'LIQ')
@@ -173,17 +206,13 @@ class Command(BaseCommand):
 
     def _fetch_students(self, token):
         """Busca todos os alunos"""
-        url = "https://siga.activesoft.com.br/api/v0/lista_alunos_dados_sensiveis/"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
+        client = get_siga_client()
 
         all_students = []
-        next_url = url
+        next_url = "lista_alunos_dados_sensiveis/"
 
         while next_url:
-            response = requests.get(next_url, headers=headers, timeout=30)
+            response = client.get(next_url, token, timeout=30)
             response.raise_for_status()
             data = response.json()
 
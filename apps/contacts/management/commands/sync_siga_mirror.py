@@ -0,0 +1,59 @@
+# apps/contacts/management/commands/sync_siga_mirror.py
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from apps.schools.models import School
+from apps.contacts.integrations.siga_rate_limiter import PRIORITY_BACKGROUND, siga_priority
+from apps.contacts.services.siga_mirror_service import SigaMirrorService
+import sys
+
+
+class Command(BaseCommand):
+    help = 'Sincroniza o espelho local de responsáveis/alunos com o SIGA'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--school-id', type=int, help='ID de escola específica')
+
+    def handle(self, *args, **options):
+        start_time = timezone.now()
+        school_id = options.get('school_id')
+
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+        self.stdout.write(self.style.SUCCESS('🔄 SINCRONIZAÇÃO DO ESPELHO SIGA'))
+        self.stdout.write(self.style.SUCCESS('=' * 70))
+
+        if school_id:
+            try:
+                schools = [School.objects.get(id=school_id)]
+            except School.DoesNotExist:
+                self.stdout.write(self.style.ERROR(f'❌ Escola {school_id} não encontrada'))
+                sys.exit(1)
+        else:
+            schools = School.objects.filter(
+                application_token__isnull=False
+            ).exclude(application_token='')
+
+        if not schools:
+            self.stdout.write(self.style.WARNING('⚠️  Nenhuma escola com token'))
+            return
+
+        error_count = 0
+
+        for school in schools:
+            try:
+                with siga_priority(PRIORITY_BACKGROUND):
+                    result = SigaMirrorService.sync_school(school.id, school.application_token)
+            except Exception as e:
+                error_count += 1
+                self.stdout.write(self.style.ERROR(f'❌ {school.school_name}: {e}'))
+                continue
+
+            if result is None:
+                error_count += 1
+                self.stdout.write(self.style.WARNING(
+                    f'⚠️  {school.school_name}: SIGA indisponível, espelho mantido'
+                ))
+            else:
+                self.stdout.write(self.style.SUCCESS(f'✅ {school.school_name}: {result}'))
+
+        elapsed = (timezone.now() - start_time).total_seconds()
+        self.stdout.write(f'\n⏱️  {elapsed:.1f}s — {error_count} erro(s)')
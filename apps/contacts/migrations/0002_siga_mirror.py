@@ -0,0 +1,187 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:52
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0001_initial'),
+        ('schools', '0002_school_application_token'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Contato',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=100)),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('telefone', models.CharField(max_length=20)),
+                ('ativo', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'contatos',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['email'], name='contatos_email_e5d12a_idx'), models.Index(fields=['ativo', '-created_at'], name='contatos_ativo_33ac7e_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='Guardian',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome_completo', models.CharField(help_text='Nome completo do responsável', max_length=200, verbose_name='Nome Completo')),
+                ('cpf', models.CharField(blank=True, help_text='CPF sem pontuação', max_length=11, null=True, validators=[django.core.validators.RegexValidator(message='CPF deve conter exatamente 11 dígitos numéricos', regex='^\\d{11}$')], verbose_name='CPF')),
+                ('rg', models.CharField(blank=True, help_text='RG do responsável', max_length=20, null=True, verbose_name='RG')),
+                ('data_nascimento', models.DateField(blank=True, null=True, verbose_name='Data de Nascimento')),
+                ('email', models.EmailField(blank=True, help_text='E-mail para comunicação oficial', max_length=254, null=True, verbose_name='E-mail Principal')),
+                ('email_secundario', models.EmailField(blank=True, max_length=254, null=True, verbose_name='E-mail Secundário')),
+                ('telefone_principal', models.CharField(blank=True, help_text='Telefone celular com DDD (apenas números)', max_length=11, null=True, validators=[django.core.validators.RegexValidator(message='Telefone deve conter 10 ou 11 dígitos', regex='^\\d{10,11}$')], verbose_name='Telefone Principal')),
+                ('telefone_secundario', models.CharField(blank=True, max_length=11, null=True, validators=[django.core.validators.RegexValidator(message='Telefone deve conter 10 ou 11 dígitos', regex='^\\d{10,11}$')], verbose_name='Telefone Secundário')),
+                ('cep', models.CharField(blank=True, help_text='CEP sem pontuação', max_length=8, null=True, verbose_name='CEP')),
+                ('logradouro', models.CharField(blank=True, max_length=200, null=True, verbose_name='Logradouro')),
+                ('numero', models.CharField(blank=True, max_length=10, null=True, verbose_name='Número')),
+                ('complemento', models.CharField(blank=True, max_length=100, null=True, verbose_name='Complemento')),
+                ('bairro', models.CharField(blank=True, max_length=100, null=True, verbose_name='Bairro')),
+                ('cidade', models.CharField(blank=True, max_length=100, null=True, verbose_name='Cidade')),
+                ('estado', models.CharField(blank=True, help_text='Sigla do estado (ex: SP, RJ)', max_length=2, null=True, verbose_name='Estado')),
+                ('tipo_relacionamento', models.CharField(choices=[('PAI', 'Pai'), ('MAE', 'Mãe'), ('AVO', 'Avô/Avó'), ('TIO', 'Tio/Tia'), ('RESP', 'Responsável Legal'), ('OUTRO', 'Outro')], default='RESP', max_length=10, verbose_name='Tipo de Relacionamento')),
+                ('siga_id', models.CharField(blank=True, help_text='Identificador no sistema SIGA (único por escola)', max_length=50, null=True, verbose_name='ID no Sistema SIGA')),
+                ('siga_payload', models.JSONField(blank=True, default=dict, help_text='Responsável agregado (formato dos serializers de guardians)', verbose_name='Dados SIGA')),
+                ('docs_completos', models.BooleanField(default=False, verbose_name='Documentos Completos')),
+                ('siga_synced_at', models.DateTimeField(blank=True, null=True, verbose_name='Sincronizado com SIGA em')),
+                ('ativo', models.BooleanField(default=True, help_text='Indica se o responsável está ativo no sistema', verbose_name='Ativo')),
+                ('aceite_termos', models.BooleanField(default=False, verbose_name='Aceitou Termos de Uso')),
+                ('data_aceite_termos', models.DateTimeField(blank=True, null=True, verbose_name='Data de Aceite dos Termos')),
+                ('observacoes', models.TextField(blank=True, help_text='Observações internas sobre o responsável', null=True, verbose_name='Observações')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('contato', models.OneToOneField(blank=True, help_text='Contato geral vinculado a este guardian', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='guardian', to='contacts.contato', verbose_name='Contato Vinculado')),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='guardians_criados', to=settings.AUTH_USER_MODEL, verbose_name='Criado por')),
+                ('school', models.ForeignKey(blank=True, help_text='Escola de origem (espelho SIGA)', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='guardians', to='schools.school', verbose_name='Escola')),
+            ],
+            options={
+                'verbose_name': 'Responsável',
+                'verbose_name_plural': 'Responsáveis',
+                'db_table': 'guardians',
+                'ordering': ['nome_completo'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Student',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome_completo', models.CharField(max_length=200)),
+                ('data_nascimento', models.DateField(blank=True, null=True)),
+                ('matricula', models.CharField(blank=True, max_length=50, null=True)),
+                ('siga_id', models.CharField(blank=True, max_length=50, null=True)),
+                ('siga_payload', models.JSONField(blank=True, default=dict)),
+                ('ativo', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('school', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='students', to='schools.school', verbose_name='Escola')),
+            ],
+            options={
+                'verbose_name': 'Aluno',
+                'verbose_name_plural': 'Alunos',
+                'db_table': 'students',
+                'ordering': ['nome_completo'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentGuardian',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo_responsabilidade', models.CharField(choices=[('FIN', 'Responsável Financeiro'), ('PED', 'Responsável Pedagógico'), ('EMG', 'Contato de Emergência'), ('ALL', 'Todos os Tipos')], default='ALL', max_length=3, verbose_name='Tipo de Responsabilidade')),
+                ('parentesco', models.CharField(blank=True, default='', max_length=30, verbose_name='Parentesco')),
+                ('prioridade', models.PositiveSmallIntegerField(default=1, help_text='1 = Principal, 2 = Secundário, etc.', verbose_name='Prioridade de Contato')),
+                ('autorizado_buscar', models.BooleanField(default=True, verbose_name='Autorizado a Buscar Aluno')),
+                ('receber_notificacoes', models.BooleanField(default=True, verbose_name='Receber Notificações')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('guardian', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contacts.guardian', verbose_name='Responsável')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contacts.student', verbose_name='Aluno')),
+            ],
+            options={
+                'verbose_name': 'Vínculo Aluno-Responsável',
+                'verbose_name_plural': 'Vínculos Aluno-Responsável',
+                'db_table': 'student_guardians',
+                'ordering': ['student', 'prioridade'],
+            },
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='guardians',
+            field=models.ManyToManyField(related_name='students', through='contacts.StudentGuardian', to='contacts.guardian', verbose_name='Responsáveis'),
+        ),
+        migrations.AddIndex(
+            model_name='guardian',
+            index=models.Index(fields=['cpf'], name='idx_guardian_cpf'),
+        ),
+        migrations.AddIndex(
+            model_name='guardian',
+            index=models.Index(fields=['email'], name='idx_guardian_email'),
+        ),
+        migrations.AddIndex(
+            model_name='guardian',
+            index=models.Index(fields=['ativo', '-created_at'], name='idx_guardian_ativo_created'),
+        ),
+        migrations.AddIndex(
+            model_name='guardian',
+            index=models.Index(fields=['siga_id'], name='idx_guardian_siga'),
+        ),
+        migrations.AddIndex(
+            model_name='guardian',
+            index=models.Index(fields=['school', 'nome_completo'], name='idx_guardian_school_nome'),
+        ),
+        migrations.AddIndex(
+            model_name='guardian',
+            index=models.Index(fields=['school', 'cpf'], name='idx_guardian_school_cpf'),
+        ),
+        migrations.AddIndex(
+            model_name='guardian',
+            index=models.Index(fields=['school', 'docs_completos'], name='idx_guardian_school_docs'),
+        ),
+        migrations.AddConstraint(
+            model_name='guardian',
+            constraint=models.CheckConstraint(condition=models.Q(('cpf__isnull', True), ('cpf__regex', '^\\d{11}$'), _connector='OR'), name='guardian_cpf_valido'),
+        ),
+        migrations.AddConstraint(
+            model_name='guardian',
+            constraint=models.UniqueConstraint(fields=('school', 'siga_id'), name='uniq_guardian_school_siga'),
+        ),
+        migrations.AddIndex(
+            model_name='studentguardian',
+            index=models.Index(fields=['student', 'prioridade'], name='student_gua_student_0dc40e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studentguardian',
+            index=models.Index(fields=['guardian', 'receber_notificacoes'], name='student_gua_guardia_d56f7b_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='studentguardian',
+            unique_together={('student', 'guardian')},
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['matricula'], name='students_matricu_ee19cc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['ativo', '-created_at'], name='students_ativo_f4fc57_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['school', 'nome_completo'], name='idx_student_school_nome'),
+        ),
+        migrations.AddConstraint(
+            model_name='student',
+            constraint=models.UniqueConstraint(fields=('school', 'siga_id'), name='uniq_student_school_siga'),
+        ),
+    ]
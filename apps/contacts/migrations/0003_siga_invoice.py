@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0002_siga_mirror'),
+        ('schools', '0002_school_application_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SigaInvoice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('titulo', models.CharField(max_length=50)),
+                ('student_siga_id', models.CharField(max_length=50)),
+                ('parcela', models.CharField(blank=True, default='', max_length=50)),
+                ('vencimento', models.DateField(blank=True, null=True)),
+                ('valor', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('valor_pago', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('valor_multa', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('valor_juros', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('situacao', models.CharField(blank=True, default='', max_length=10)),
+                ('banco', models.CharField(blank=True, max_length=100, null=True)),
+                ('linha_digitavel', models.CharField(blank=True, max_length=100, null=True)),
+                ('link_pagamento', models.URLField(blank=True, max_length=500, null=True)),
+                ('servico', models.CharField(blank=True, max_length=200, null=True)),
+                ('pagador_cpf', models.CharField(blank=True, default='', max_length=14)),
+                ('synced_at', models.DateTimeField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('school', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='siga_invoices', to='schools.school', verbose_name='Escola')),
+            ],
+            options={
+                'verbose_name': 'Boleto SIGA',
+                'verbose_name_plural': 'Boletos SIGA',
+                'db_table': 'siga_invoices',
+                'ordering': ['vencimento', 'titulo'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='sigainvoice',
+            index=models.Index(fields=['school', 'situacao'], name='idx_invoice_school_situacao'),
+        ),
+        migrations.AddIndex(
+            model_name='sigainvoice',
+            index=models.Index(fields=['school', 'vencimento'], name='idx_invoice_school_venc'),
+        ),
+        migrations.AddIndex(
+            model_name='sigainvoice',
+            index=models.Index(fields=['school', 'student_siga_id'], name='idx_invoice_school_student'),
+        ),
+        migrations.AddIndex(
+            model_name='sigainvoice',
+            index=models.Index(fields=['school', '-synced_at'], name='idx_invoice_school_synced'),
+        ),
+        migrations.AddConstraint(
+            model_name='sigainvoice',
+            constraint=models.UniqueConstraint(fields=('school', 'titulo'), name='uniq_invoice_school_titulo'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0003_siga_invoice'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='guardian',
+            name='busca',
+            field=models.TextField(blank=True, default='', help_text='Campos de busca normalizados (sem acento, caixa baixa)', verbose_name='Texto de Busca'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:20
+
+from django.db import migrations
+
+from apps.contacts.selectors.guardian_search_index import fold
+
+BATCH_SIZE = 1000
+
+
+def backfill_busca(apps, schema_editor):
+    """Preenche busca das linhas já espelhadas (mesmo texto de SigaMirrorService._build_busca)."""
+    Guardian = apps.get_model('contacts', 'Guardian')
+
+    rows = []
+    queryset = Guardian.objects.filter(siga_synced_at__isnull=False).only('id', 'siga_payload')
+    for guardian in queryset.iterator(chunk_size=BATCH_SIZE):
+        data = guardian.siga_payload or {}
+        guardian.busca = '\n'.join(
+            fold(value or '') for value in (
+                data.get('nome'),
+                data.get('email'),
+                *(filho.get('nome') for filho in data.get('filhos', [])),
+            )
+        )
+        rows.append(guardian)
+        if len(rows) >= BATCH_SIZE:
+            Guardian.objects.bulk_update(rows, ['busca'])
+            rows = []
+
+    if rows:
+        Guardian.objects.bulk_update(rows, ['busca'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0004_guardian_busca'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_busca, migrations.RunPython.noop),
+    ]
@@ -2,11 +2,13 @@
 from .contact import Contato
 from .guardian import Guardian
 from .student import Student
+from .siga_invoice import SigaInvoice
 from .student_guardian import StudentGuardian
 
 __all__ = [
     'Contato',
     'Guardian',
     'Student',
+    'SigaInvoice',
     'StudentGuardian',
 ]
\ No newline at end of file
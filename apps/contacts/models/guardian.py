@@ -37,9 +37,12 @@ class Guardian(models.Model):
         help_text='Nome completo do responsável'
     )
 
+    # Opcional/não-único: o espelho SIGA tem responsáveis sem CPF e o mesmo
+    # responsável pode existir em mais de uma escola
     cpf = models.CharField(
         max_length=11,
-        unique=True,
+        blank=True,
+        null=True,
         validators=[cpf_validator],
         verbose_name='CPF',
         help_text='CPF sem pontuação'
@@ -61,7 +64,8 @@ class Guardian(models.Model):
 
     # Contato
     email = models.EmailField(
-        unique=True,
+        blank=True,
+        null=True,
         verbose_name='E-mail Principal',
         help_text='E-mail para comunicação oficial'
     )
@@ -74,6 +78,8 @@ class Guardian(models.Model):
 
     telefone_principal = models.CharField(
         max_length=11,
+        blank=True,
+        null=True,
         validators=[telefone_validator],
         verbose_name='Telefone Principal',
         help_text='Telefone celular com DDD (apenas números)'
@@ -159,13 +165,50 @@ class Guardian(models.Model):
     )
 
     # Integração Externa
+    school = models.ForeignKey(
+        'schools.School',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='guardians',
+        verbose_name='Escola',
+        help_text='Escola de origem (espelho SIGA)'
+    )
+
     siga_id = models.CharField(
         max_length=50,
-        unique=True,
         null=True,
         blank=True,
         verbose_name='ID no Sistema SIGA',
-        help_text='Identificador no sistema SIGA (se integrado)'
+        help_text='Identificador no sistema SIGA (único por escola)'
+    )
+
+    # Espelho SIGA (sincronizado por SigaMirrorService)
+    siga_payload = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Dados SIGA',
+        help_text='Responsável agregado (formato dos serializers de guardians)'
+    )
+
+    # Nome, email e nomes dos filhos sem acento e em caixa baixa, para a
+    # busca do espelho achar "João" digitando "joao"
+    busca = models.TextField(
+        blank=True,
+        default='',
+        verbose_name='Texto de Busca',
+        help_text='Campos de busca normalizados (sem acento, caixa baixa)'
+    )
+
+    docs_completos = models.BooleanField(
+        default=False,
+        verbose_name='Documentos Completos'
+    )
+
+    siga_synced_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Sincronizado com SIGA em'
     )
 
     # Controle
@@ -226,14 +269,22 @@ class Guardian(models.Model):
             models.Index(fields=['email'], name='idx_guardian_email'),
             models.Index(fields=['ativo', '-created_at'], name='idx_guardian_ativo_created'),
             models.Index(fields=['siga_id'], name='idx_guardian_siga'),
+            # Espelho SIGA: listagem, filtros e ordenação por escola
+            models.Index(fields=['school', 'nome_completo'], name='idx_guardian_school_nome'),
+            models.Index(fields=['school', 'cpf'], name='idx_guardian_school_cpf'),
+            models.Index(fields=['school', 'docs_completos'], name='idx_guardian_school_docs'),
         ]
 
         # Constraints
         constraints = [
             models.CheckConstraint(
-                check=models.Q(cpf__regex=r'^\d{11}$'),
+                check=models.Q(cpf__isnull=True) | models.Q(cpf__regex=r'^\d{11}$'),
                 name='guardian_cpf_valido'
             ),
+            models.UniqueConstraint(
+                fields=['school', 'siga_id'],
+                name='uniq_guardian_school_siga'
+            ),
         ]
 
     def __str__(self):
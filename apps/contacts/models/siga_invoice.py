@@ -0,0 +1,64 @@
+# apps/contacts/models/siga_invoice.py
+from django.db import models
+
+
+class SigaInvoice(models.Model):
+    """
+    Boleto do SIGA persistido localmente (armazém de boletos).
+
+    Preenchido em lote pelo crawl de boletos (sync_invoice_stats /
+    dashboard) via InvoiceWarehouseService. Estatísticas e dashboards
+    respondem com agregações SQL em vez de re-varrer o SIGA.
+    """
+
+    school = models.ForeignKey(
+        'schools.School',
+        on_delete=models.CASCADE,
+        related_name='siga_invoices',
+        verbose_name='Escola'
+    )
+    titulo = models.CharField(max_length=50)
+    student_siga_id = models.CharField(max_length=50)
+
+    parcela = models.CharField(max_length=50, blank=True, default='')
+    vencimento = models.DateField(null=True, blank=True)
+    valor = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    valor_pago = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    valor_multa = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    valor_juros = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # ABE (aberto), LIQ (liquidado), CAN (cancelado)
+    situacao = models.CharField(max_length=10, blank=True, default='')
+    banco = models.CharField(max_length=100, null=True, blank=True)
+    linha_digitavel = models.CharField(max_length=100, null=True, blank=True)
+    link_pagamento = models.URLField(max_length=500, null=True, blank=True)
+    servico = models.CharField(max_length=200, null=True, blank=True)
+    # CPF extraído do campo "pagador" (dashboard: completude cadastral)
+    pagador_cpf = models.CharField(max_length=14, blank=True, default='')
+
+    # Controle
+    synced_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'siga_invoices'
+        verbose_name = 'Boleto SIGA'
+        verbose_name_plural = 'Boletos SIGA'
+        ordering = ['vencimento', 'titulo']
+
+        indexes = [
+            models.Index(fields=['school', 'situacao'], name='idx_invoice_school_situacao'),
+            models.Index(fields=['school', 'vencimento'], name='idx_invoice_school_venc'),
+            models.Index(fields=['school', 'student_siga_id'], name='idx_invoice_school_student'),
+            models.Index(fields=['school', '-synced_at'], name='idx_invoice_school_synced'),
+        ]
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=['school', 'titulo'],
+                name='uniq_invoice_school_titulo'
+            ),
+        ]
+
+    def __str__(self):
+        return f"Boleto {self.titulo} ({self.situacao})"
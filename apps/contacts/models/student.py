@@ -9,8 +9,22 @@ class Student(models.Model):
 
     # Campos
     nome_completo = models.CharField(max_length=200)
-    data_nascimento = models.DateField()
-    matricula = models.CharField(max_length=50, unique=True)
+    data_nascimento = models.DateField(null=True, blank=True)
+    # Matrícula NÃO é única: o SIGA não garante (repetida ou trocada entre
+    # alunos); a identidade no espelho é (school, siga_id)
+    matricula = models.CharField(max_length=50, null=True, blank=True)
+
+    # Espelho SIGA (sincronizado por SigaMirrorService)
+    school = models.ForeignKey(
+        'schools.School',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='students',
+        verbose_name='Escola'
+    )
+    siga_id = models.CharField(max_length=50, null=True, blank=True)
+    siga_payload = models.JSONField(default=dict, blank=True)
 
     # Relacionamento Many-to-Many com Guardian
     guardians = models.ManyToManyField(
@@ -34,6 +48,14 @@ class Student(models.Model):
         indexes = [
             models.Index(fields=['matricula']),
             models.Index(fields=['ativo', '-created_at']),
+            models.Index(fields=['school', 'nome_completo'], name='idx_student_school_nome'),
+        ]
+
+        constraints = [
+            models.UniqueConstraint(
+                fields=['school', 'siga_id'],
+                name='uniq_student_school_siga'
+            ),
         ]
 
     def __str__(self):
@@ -42,6 +64,8 @@ class Student(models.Model):
     @property
     def idade(self):
         """Calcula idade do aluno."""
+        if not self.data_nascimento:
+            return None
         from datetime import date
         hoje = date.today()
         return hoje.year - self.data_nascimento.year - (
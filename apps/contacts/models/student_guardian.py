@@ -33,6 +33,14 @@ class StudentGuardian(models.Model):
         verbose_name='Tipo de Responsabilidade'
     )
 
+    # Vínculo no SIGA: mae, pai, responsavel_principal, responsavel_secundario
+    parentesco = models.CharField(
+        max_length=30,
+        blank=True,
+        default='',
+        verbose_name='Parentesco'
+    )
+
     prioridade = models.PositiveSmallIntegerField(
         default=1,
         verbose_name='Prioridade de Contato',
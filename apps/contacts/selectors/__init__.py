@@ -1,8 +1,12 @@
 # apps/contacts/selectors/__init__.py
 from .contact_selector import ContatoSelector
 from .guardian_selectors import GuardianSelector
+from .guardian_search_index import GuardianSearchIndex
+from .guardian_mirror_selectors import GuardianMirrorSelector
 
 __all__ = [
     'ContatoSelector',
     'GuardianSelector',
-]
\ No newline at end of file
+    'GuardianSearchIndex',
+    'GuardianMirrorSelector',
+]
@@ -0,0 +1,109 @@
+# apps/contacts/selectors/guardian_mirror_selectors.py
+
+"""
+Selectors para o espelho local de Guardians (tabelas guardians/students).
+
+Mesmos filtros e ordenação do GuardianSelector, mas em SQL indexado
+(QuerySets) em vez de varrer a lista inteira da escola em Python.
+As linhas carregam o dict agregado (siga_payload) no formato dos
+serializers de guardians.
+"""
+
+from typing import Dict, Optional
+
+from django.db.models import Q, QuerySet
+
+from ..models import Guardian
+from .guardian_search_index import fold
+
+
+class GuardianMirrorSelector:
+    """Filtros e ordenação sobre o espelho SIGA."""
+
+    @staticmethod
+    def for_school(school_id: int) -> QuerySet:
+        return Guardian.objects.filter(school_id=school_id)
+
+    @staticmethod
+    def get_payload(school_id: int, guardian_id: int) -> Optional[Dict]:
+        """Dict agregado de um guardian (ou None)."""
+        payload = Guardian.objects.filter(
+            school_id=school_id, siga_id=str(guardian_id)
+        ).values_list('siga_payload', flat=True).first()
+        return payload or None
+
+    # -----------------------------------------------------------------
+    # BUSCA TEXTUAL
+    # -----------------------------------------------------------------
+
+    @staticmethod
+    def filter_by_search(queryset: QuerySet, query: str) -> QuerySet:
+        """
+        Busca em nome, CPF, email, telefone e nome dos filhos.
+
+        Sem acento e case-insensitive ("joao" acha "João"), sobre a coluna
+        busca gravada pelo SigaMirrorService. Remove formatação de CPF e
+        telefone.
+        """
+        if not query:
+            return queryset
+
+        q = fold(query.strip())
+        q_digits = ''.join(c for c in q if c.isdigit())
+
+        condition = Q(busca__contains=q)
+        if q_digits:
+            condition |= Q(cpf__contains=q_digits) | Q(telefone_principal__contains=q_digits)
+
+        return queryset.filter(condition)
+
+    # -----------------------------------------------------------------
+    # FILTROS
+    # -----------------------------------------------------------------
+
+    @staticmethod
+    def filter_by_cpf(queryset: QuerySet, cpf: str) -> QuerySet:
+        """Filtra por CPF exato (ignora formatação)."""
+        if not cpf:
+            return queryset
+
+        return queryset.filter(cpf=cpf.replace('.', '').replace('-', '').strip())
+
+    @staticmethod
+    def filter_by_status_financeiro(queryset: QuerySet, status: str) -> QuerySet:
+        """Filtra por situação financeira ('em_dia' ou 'inadimplente')."""
+        pendente = Q(siga_payload__resumo_financeiro__tem_pendencia=True)
+
+        if status == 'inadimplente':
+            return queryset.filter(pendente)
+        elif status == 'em_dia':
+            return queryset.exclude(pendente)
+
+        return queryset
+
+    @staticmethod
+    def filter_by_docs_completos(queryset: QuerySet, completo: bool) -> QuerySet:
+        """Filtra por completude de documentos."""
+        return queryset.filter(docs_completos=completo)
+
+    # -----------------------------------------------------------------
+    # ORDENAÇÃO
+    # -----------------------------------------------------------------
+
+    @staticmethod
+    def order_by(queryset: QuerySet, field: str) -> QuerySet:
+        """
+        Ordena guardians por campo.
+
+        Suporta:
+        - 'nome' (A-Z)
+        - '-nome' (Z-A)
+        """
+        if not field:
+            field = 'nome'
+
+        if field.lstrip('-') == 'nome':
+            prefix = '-' if field.startswith('-') else ''
+            return queryset.order_by(f'{prefix}nome_completo', f'{prefix}id')
+
+        return queryset
@@ -0,0 +1,166 @@
+# apps/contacts/selectors/guardian_search_index.py
+
+"""
+Índice de busca textual da lista processada de guardians.
+
+Montado uma vez por lista (GuardianService, junto com os shards):
+- Campos normalizados por guardian: nome, email e nomes dos filhos sem
+  acento e em caixa baixa ("João" → "joao"); CPF e telefone só dígitos
+- Índice invertido token → guardians, e trigramas → tokens do
+  vocabulário, para achar por substring sem varrer a lista
+
+Consulta (search): para cada termo da busca, os tokens que o contêm
+(interseção dos trigramas, ou varredura do vocabulário para termos < 3
+letras) → guardians candidatos; a confirmação final é o mesmo "substring
+do campo" da busca linear, só que sobre os candidatos.
+"""
+
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set
+
+FIELD_SEPARATOR = '\x00'
+
+_EMPTY: frozenset = frozenset()
+
+
+def fold(text: str) -> str:
+    """Remove acentos e normaliza a caixa ("João" → "joao")."""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def _digits(value) -> str:
+    return ''.join(c for c in str(value or '') if c.isdigit())
+
+
+class _TokenIndex:
+    """Tokens → posições, com trigramas dos tokens (busca por substring)."""
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._trigrams: Dict[str, Set[str]] = {}
+
+    def add(self, token: str, position: int) -> None:
+        postings = self._postings.get(token)
+        if postings is None:
+            postings = self._postings[token] = set()
+            for i in range(len(token) - 2):
+                self._trigrams.setdefault(token[i:i + 3], set()).add(token)
+        postings.add(position)
+
+    def tokens_containing(self, fragment: str) -> Iterable[str]:
+        if len(fragment) < 3:
+            return [t for t in self._postings if fragment in t]
+
+        grams = sorted(
+            (self._trigrams.get(fragment[i:i + 3], _EMPTY) for i in range(len(fragment) - 2)),
+            key=len,
+        )
+        tokens = set(grams[0]).intersection(*grams[1:])
+        return [t for t in tokens if fragment in t]
+
+    def matching(self, fragments: List[str]) -> Set[int]:
+        """Posições com algum token contendo CADA fragmento."""
+        result = None
+        for fragment in fragments:
+            positions = set()
+            for token in self.tokens_containing(fragment):
+                positions |= self._postings[token]
+            result = positions if result is None else result & positions
+            if not result:
+                break
+        return result or set()
+
+
+class GuardianSearchIndex:
+    """Índice invertido dos campos de busca de uma lista de guardians."""
+
+    def __init__(self, ids: List, text: List[str], digits: List[str]):
+        self.ids = ids
+        self.text = text
+        self.digits = digits
+
+        self._text_index = _TokenIndex()
+        self._digits_index = _TokenIndex()
+        for position, (fields, numbers) in enumerate(zip(text, digits)):
+            for field in fields.split(FIELD_SEPARATOR):
+                for token in field.split():
+                    self._text_index.add(token, position)
+            for number in numbers.split(FIELD_SEPARATOR):
+                if number:
+                    self._digits_index.add(number, position)
+
+    @classmethod
+    def build(cls, guardians: List[Dict]) -> 'GuardianSearchIndex':
+        """Normaliza os campos de busca de cada guardian e indexa."""
+        return cls.from_state(cls.patch_state(None, guardians, ()))
+
+    @staticmethod
+    def patch_state(previous: Optional[Dict], guardians: List[Dict], changed: Iterable) -> Dict:
+        """
+        Campos normalizados (to_state) de guardians, reaproveitando os de
+        previous para quem não está em changed — rebuild incremental da
+        lista renormaliza só os guardians alterados.
+        """
+        changed = set(changed)
+        positions = {}
+        if previous is not None:
+            positions = {gid: i for i, gid in enumerate(previous['ids'])}
+
+        ids, text, digits = [], [], []
+        for g in guardians:
+            gid = g.get('id')
+            position = positions.get(gid)
+            if position is not None and gid not in changed:
+                ids.append(gid)
+                text.append(previous['text'][position])
+                digits.append(previous['digits'][position])
+                continue
+
+            ids.append(gid)
+            text.append(FIELD_SEPARATOR.join(
+                fold(value or '') for value in (
+                    g.get('nome'),
+                    g.get('email'),
+                    *(filho.get('nome') for filho in g.get('filhos', [])),
+                )
+            ))
+            digits.append(_digits(g.get('cpf')) + FIELD_SEPARATOR + _digits(g.get('telefone')))
+        return {'ids': ids, 'text': text, 'digits': digits}
+
+    # -----------------------------------------------------------------
+    # CONSULTA
+    # -----------------------------------------------------------------
+
+    def search(self, query: str) -> Set:
+        """
+        IDs dos guardians cujo nome, email ou nome de filho contém a busca
+        (sem acento/caixa), ou cujo CPF/telefone contém os dígitos dela.
+        """
+        q = fold(query.strip())
+        if not q:
+            return set(self.ids)
+        q_digits = _digits(q)
+
+        matched = {
+            position for position in self._text_index.matching(q.split())
+            if q in self.text[position]
+        }
+        if q_digits:
+            matched |= self._digits_index.matching([q_digits])
+
+        return {self.ids[position] for position in matched}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    # -----------------------------------------------------------------
+    # CACHE (Redis guarda só os campos; o índice é remontado no L1)
+    # -----------------------------------------------------------------
+
+    def to_state(self) -> Dict:
+        return {'ids': self.ids, 'text': self.text, 'digits': self.digits}
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'GuardianSearchIndex':
+        return cls(state['ids'], state['text'], state['digits'])
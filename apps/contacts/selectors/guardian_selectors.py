@@ -12,7 +12,9 @@ Responsabilidades:
 Trabalha com listas de dicts (dados do SIGA, não QuerySets).
 """
 
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from .guardian_search_index import GuardianSearchIndex
 
 
 class GuardianSelector:
@@ -23,51 +25,29 @@ class GuardianSelector:
     # -----------------------------------------------------------------
 
     @staticmethod
-    def filter_by_search(guardians: List[Dict], query: str) -> List[Dict]:
+    def filter_by_search(
+        guardians: List[Dict],
+        query: str,
+        index: Optional[GuardianSearchIndex] = None,
+    ) -> List[Dict]:
         """
         Busca em nome, CPF, email, telefone e nome dos filhos.
 
-        Case-insensitive. Remove formatação de CPF e telefone.
+        Case-insensitive e sem acentos ("joao" encontra "João"). Remove
+        formatação de CPF e telefone.
+
+        Args:
+            index: Índice da lista (GuardianService.get_search_index);
+                sem ele, o índice é montado para esta chamada
         """
-        if not query:
+        if not query or not query.strip():
             return guardians
 
-        q = query.lower().strip()
-        # Versão sem formatação para busca em CPF/telefone
-        q_digits = ''.join(c for c in q if c.isdigit())
-
-        filtered = []
-
-        for g in guardians:
-            # Nome do responsável
-            if q in (g.get('nome') or '').lower():
-                filtered.append(g)
-                continue
-
-            # CPF (sem formatação)
-            cpf = (g.get('cpf') or '').replace('.', '').replace('-', '')
-            if q_digits and q_digits in cpf:
-                filtered.append(g)
-                continue
-
-            # Email
-            if q in (g.get('email') or '').lower():
-                filtered.append(g)
-                continue
-
-            # Telefone (sem formatação)
-            tel = ''.join(c for c in (g.get('telefone') or '') if c.isdigit())
-            if q_digits and q_digits in tel:
-                filtered.append(g)
-                continue
-
-            # Nome dos filhos
-            for filho in g.get('filhos', []):
-                if q in (filho.get('nome') or '').lower():
-                    filtered.append(g)
-                    break
-
-        return filtered
+        if index is None:
+            index = GuardianSearchIndex.build(guardians)
+
+        ids = index.search(query)
+        return [g for g in guardians if g.get('id') in ids]
 
     # -----------------------------------------------------------------
     # FILTRO POR CPF EXATO
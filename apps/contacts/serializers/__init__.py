@@ -5,6 +5,7 @@ from .guardian_serializers import (
     GuardianListSerializer,
     GuardianDetailSerializer,
     BoletoSerializer,
+    render_guardian_cards,
 )
 from .invoice_serializers import (
     GuardianInvoicesResponseSerializer,
@@ -20,6 +21,7 @@ __all__ = [
     'GuardianListSerializer',
     'GuardianDetailSerializer',
     'BoletoSerializer',
+    'render_guardian_cards',
 
     # Invoices e Stats
     'GuardianInvoicesResponseSerializer',
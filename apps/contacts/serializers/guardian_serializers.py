@@ -13,8 +13,12 @@ Dois níveis:
 Compartilham sub-serializers para consistência.
 """
 
+from typing import Dict, List
+
 from rest_framework import serializers
 
+from core.renderers import FastJSONRenderer
+
 
 # =====================================================================
 # SUB-SERIALIZERS COMPARTILHADOS
@@ -264,4 +268,43 @@ class GuardianDetailSerializer(serializers.Serializer):
 
     # Resumos (expandidos)
     resumo_financeiro = ResumoFinanceiroCompletoSerializer()
-    resumo_documentos = ResumoDocumentosSerializer()
\ No newline at end of file
+    resumo_documentos = ResumoDocumentosSerializer()
+
+# =====================================================================
+# CARDS PRÉ-SERIALIZADOS (cache da lista)
+# =====================================================================
+
+def render_guardian_cards(guardians: List[Dict]) -> Dict:
+    """
+    JSON (bytes) de cada card — GuardianListSerializer — por id do guardian.
+
+    Montado junto com a lista processada: a página da listagem concatena
+    os cards em vez de serializar campo a campo (ver GuardianPagination).
+    Guardians que não serializam ficam de fora — a listagem serializa o
+    card ausente na hora (e o erro aparece na requisição, como antes),
+    sem derrubar a montagem da lista.
+    """
+    renderer = FastJSONRenderer()
+    errors = (AttributeError, KeyError, TypeError, ValueError)
+
+    # Um serializer many=True (instanciar um por card custa ~10x mais)
+    try:
+        data = GuardianListSerializer(guardians, many=True).data
+    except errors:
+        data = None
+
+    if data is not None:
+        return {
+            guardian.get('id'): renderer.render(card)
+            for guardian, card in zip(guardians, data)
+        }
+
+    cards = {}
+    for guardian in guardians:
+        try:
+            cards[guardian.get('id')] = renderer.render(
+                GuardianListSerializer(guardian).data
+            )
+        except errors:
+            continue
+    return cards
@@ -5,6 +5,8 @@ from .siga_integration_service import SigaIntegrationService, SigaIntegrationErr
 from .guardian_service import GuardianService
 from .guardian_aggregator_service import GuardianAggregatorService
 from .invoice_service import InvoiceService
+from .invoice_warehouse_service import InvoiceWarehouseService
+from .siga_mirror_service import SigaMirrorService
 
 __all__ = [
     'ContatoService',
@@ -13,4 +15,6 @@ __all__ = [
     'GuardianService',
     'GuardianAggregatorService',
     'InvoiceService',
+    'InvoiceWarehouseService',
+    'SigaMirrorService',
 ]
\ No newline at end of file
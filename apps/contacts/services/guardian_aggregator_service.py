@@ -9,11 +9,23 @@ Responsabilidade ÚNICA:
 - NÃO decide o que mostrar (serializers fazem isso)
 - NÃO busca boletos (InvoiceService faz isso)
 - NÃO calcula resumos (GuardianService faz isso)
+
+Rebuild incremental: snapshot() guarda hashes do conteúdo de cada
+responsável e aluno + índice reverso aluno → responsáveis; com o
+snapshot anterior, build_incremental() remonta só os responsáveis cuja
+linha, ou a linha de algum filho, mudou.
 """
 
+import hashlib
 import logging
-from typing import List, Dict
+import marshal
+from typing import List, Dict, NamedTuple, Optional, Set, Tuple
 from collections import defaultdict
+from ..integrations.siga_stream import (
+    GUARDIAN_FIELDS,
+    STUDENT_ACADEMIC_FIELDS,
+    STUDENT_RELATION_FIELDS,
+)
 from ..utils.siga_helpers import extrair_periodo, mapear_status
 
 logger = logging.getLogger(__name__)
@@ -28,6 +40,91 @@ ESTADO_CIVIL_MAP = {
     '5': 'União Estável',
 }
 
+# Documentos deduzidos do cadastro: (campo SIGA, tipo, nome)
+DOCUMENT_FIELDS = (
+    ('cpf_cnpj', 'cpf', 'CPF'),
+    ('rg', 'rg', 'RG'),
+    ('email', 'email', 'Email'),
+    ('celular', 'telefone', 'Telefone'),
+    ('cep', 'comprovante_residencia', 'Comprovante de Residência'),
+)
+
+# (parentesco, parentesco_display) por campo de vínculo do aluno
+PARENTESCO_MAE = ('mae', 'Mãe')
+PARENTESCO_PAI = ('pai', 'Pai')
+PARENTESCO_RESPONSAVEL = ('responsavel_principal', 'Responsável Principal')
+PARENTESCO_SECUNDARIO = ('responsavel_secundario', 'Responsável Secundário')
+
+
+class StudentRecord(NamedTuple):
+    """
+    Aluno já mesclado com os dados acadêmicos — tupla imutável, uma por
+    aluno, compartilhada por todos os responsáveis dele. Vira dict (um
+    por filho na saída) só em _build_guardian_dict.
+
+    A ordem dos campos é a ordem das chaves de cada filho na resposta.
+    """
+    id: Optional[int]
+    nome: Optional[str]
+    matricula: Optional[str]
+    turma: Optional[str]
+    serie: Optional[str]
+    turma_nome: Optional[str]
+    periodo: Optional[str]
+    status: str
+    url_foto: Optional[str]
+
+
+# Filho de um responsável: (aluno, (parentesco, parentesco_display))
+Child = Tuple[StudentRecord, Tuple[str, str]]
+
+# Campos que entram no hash de cada linha (os mesmos lidos no JOIN), em
+# ordem fixa — a ordem das chaves do dict varia entre processos
+_GUARDIAN_HASH_FIELDS = tuple(sorted(GUARDIAN_FIELDS))
+_RELATION_HASH_FIELDS = tuple(sorted(STUDENT_RELATION_FIELDS))
+_ACADEMIC_HASH_FIELDS = tuple(sorted(STUDENT_ACADEMIC_FIELDS))
+
+
+class IncrementalAggregation(NamedTuple):
+    """Resultado de build_incremental."""
+    guardians: List[Dict]   # lista completa, na ordem da API
+    state: Dict             # snapshot novo (ver snapshot)
+    changed: Set            # ids remontados (novos ou alterados)
+    removed: Set            # ids que saíram do SIGA
+
+
+def _is_filled(value) -> bool:
+    return bool(value and str(value).strip())
+
+
+def _row_hash(*values) -> bytes:
+    """
+    Hash estável (entre processos) do conteúdo de uma linha.
+
+    marshal versão 0: sem referências nem strings internadas — valores
+    iguais sempre geram os mesmos bytes.
+    """
+    return hashlib.blake2b(marshal.dumps(values, 0), digest_size=8).digest()
+
+
+def _linked_guardians(student: Dict) -> Tuple:
+    """IDs de responsáveis citados no aluno (mae, pai, responsáveis)."""
+    return tuple({
+        gid for gid in (
+            student.get('mae_id'),
+            student.get('pai_id'),
+            student.get('responsavel_id'),
+            student.get('responsavel_secundario_id'),
+        )
+        if gid
+    })
+
+
+def _child_order(child: Child) -> Tuple:
+    """Ordem estável dos filhos: id do aluno (sem id por último)."""
+    student_id = child[0].id
+    return (student_id is None, student_id or 0)
+
 
 class GuardianAggregatorService:
     """
@@ -37,6 +134,10 @@ class GuardianAggregatorService:
     1. Mescla dados acadêmicos nos alunos (students_relations + students_academic)
     2. Agrupa alunos por responsável (via mae_id, pai_id, etc.)
     3. Constrói dict completo de cada responsável com todos os campos
+
+    Os passos 1–2 trabalham sobre tuplas (StudentRecord + parentesco):
+    nenhum dict intermediário por aluno ou vínculo — os dicts da saída
+    são criados uma única vez, no passo 3.
     """
 
     def build_guardians_response(
@@ -58,11 +159,13 @@ class GuardianAggregatorService:
         """
         # 1. JOIN: alunos + dados acadêmicos
         students_full = self._merge_student_data(
-            students_relations, students_academic
+            students_relations, self._academic_index(students_academic)
         )
 
         # 2. Agrupar alunos por responsável
-        guardian_students_map = self._group_students_by_guardian(students_full)
+        guardian_students_map = self._group_students_by_guardian(
+            students_relations, students_full
+        )
 
         # 3. Construir resposta final
         result = []
@@ -79,138 +182,239 @@ class GuardianAggregatorService:
     # MERGE: alunos + dados acadêmicos
     # -----------------------------------------------------------------
 
-    def _merge_student_data(
-        self,
-        students_relations: List[Dict],
-        students_academic: List[Dict],
-    ) -> List[Dict]:
-        """
-        JOIN entre lista_alunos_dados_sensiveis e acesso/alunos.
-        Usa id_aluno como chave de junção.
-        """
-        # Índice O(1) para dados acadêmicos
+    def _academic_index(self, students_academic: List[Dict]) -> Dict:
+        """Índice O(1) id_aluno → dados acadêmicos."""
         academic_by_id = {}
         for s in students_academic:
             sid = s.get('id_aluno')
             if sid:
                 academic_by_id[sid] = s
+        return academic_by_id
+
+    def _merge_student_data(
+        self,
+        students_relations: List[Dict],
+        academic_by_id: Dict,
+    ) -> List[StudentRecord]:
+        """
+        JOIN entre lista_alunos_dados_sensiveis e acesso/alunos.
+        Usa id_aluno como chave de junção (academic_by_id: _academic_index).
 
-        merged = []
-        for student_rel in students_relations:
-            student_id = student_rel['id']
-            academic = academic_by_id.get(student_id, {})
-
-            merged.append({
-                # Dados de relacionamento (lista_alunos_dados_sensiveis)
-                **student_rel,
-                # Dados acadêmicos (acesso/alunos) — adicionados
-                '_turma': academic.get('nome_curso'),
-                '_serie': academic.get('nome_serie'),
-                '_turma_nome': academic.get('nome_turma'),
-                '_situacao': academic.get('situacao_aluno_turma'),
-            })
+        Returns:
+            Um StudentRecord por aluno, na ordem de students_relations
+        """
+        merged = [
+            self._build_student_record(
+                student_rel, academic_by_id.get(student_rel['id'], {})
+            )
+            for student_rel in students_relations
+        ]
 
         logger.debug(f"Merged {len(merged)} students with academic data")
         return merged
 
+    def _build_student_record(self, student: Dict, academic: Dict) -> StudentRecord:
+        """
+        Aluno com campos padronizados.
+        Inclui TUDO que pode ser necessário (list ou detail).
+        """
+        turma_nome = academic.get('nome_turma')
+        return StudentRecord(
+            id=student.get('id'),
+            nome=student.get('nome'),
+            matricula=student.get('matricula'),
+            turma=academic.get('nome_curso'),
+            serie=academic.get('nome_serie'),
+            turma_nome=turma_nome,
+            periodo=extrair_periodo(turma_nome),
+            status=mapear_status(academic.get('situacao_aluno_turma')),
+            url_foto=student.get('url_foto'),
+        )
+
     # -----------------------------------------------------------------
     # AGRUPAMENTO: alunos por responsável
     # -----------------------------------------------------------------
 
     def _group_students_by_guardian(
-        self, students: List[Dict]
-    ) -> Dict[int, List[Dict]]:
+        self,
+        students_relations: List[Dict],
+        students: List[StudentRecord],
+    ) -> Dict[int, List[Child]]:
         """
         Agrupa alunos por responsável ID.
         Um aluno pode aparecer em múltiplos responsáveis.
+
+        students: saída de _merge_student_data (mesma ordem de
+        students_relations, de onde vêm os vínculos).
         """
         guardian_map = defaultdict(list)
 
-        for student in students:
-            info = self._build_student_info(student)
-
+        for student_rel, record in zip(students_relations, students):
             # Mãe
-            mae_id = student.get('mae_id')
+            mae_id = student_rel.get('mae_id')
             if mae_id:
-                guardian_map[mae_id].append({
-                    **info,
-                    '_parentesco': 'mae',
-                    '_parentesco_display': 'Mãe',
-                })
+                guardian_map[mae_id].append((record, PARENTESCO_MAE))
 
             # Pai
-            pai_id = student.get('pai_id')
+            pai_id = student_rel.get('pai_id')
             if pai_id:
-                guardian_map[pai_id].append({
-                    **info,
-                    '_parentesco': 'pai',
-                    '_parentesco_display': 'Pai',
-                })
+                guardian_map[pai_id].append((record, PARENTESCO_PAI))
 
             # Responsável principal (se não for mãe/pai)
-            resp_id = student.get('responsavel_id')
+            resp_id = student_rel.get('responsavel_id')
             if resp_id and resp_id not in (mae_id, pai_id):
-                guardian_map[resp_id].append({
-                    **info,
-                    '_parentesco': 'responsavel_principal',
-                    '_parentesco_display': 'Responsável Principal',
-                })
+                guardian_map[resp_id].append((record, PARENTESCO_RESPONSAVEL))
 
             # Responsável secundário (se não duplicar)
-            resp2_id = student.get('responsavel_secundario_id')
+            resp2_id = student_rel.get('responsavel_secundario_id')
             if resp2_id and resp2_id not in (mae_id, pai_id, resp_id):
-                guardian_map[resp2_id].append({
-                    **info,
-                    '_parentesco': 'responsavel_secundario',
-                    '_parentesco_display': 'Responsável Secundário',
-                })
+                guardian_map[resp2_id].append((record, PARENTESCO_SECUNDARIO))
 
         return dict(guardian_map)
 
-    def _build_student_info(self, student: Dict) -> Dict:
+    # -----------------------------------------------------------------
+    # INCREMENTAL: hashes por linha + índice reverso aluno → responsáveis
+    # -----------------------------------------------------------------
+
+    def snapshot(
+        self,
+        guardians: List[Dict],
+        students_relations: List[Dict],
+        students_academic: List[Dict],
+        academic_by_id: Optional[Dict] = None,
+    ) -> Dict:
         """
-        Constrói dict de um aluno com campos padronizados.
-        Inclui TUDO que pode ser necessário (list ou detail).
+        Estado das 3 APIs para o próximo build_incremental (cacheado
+        junto com a lista processada).
+
+        Returns:
+            {
+                'guardians': {guardian_id: hash da linha},
+                'students': {student_id: hash da linha + dados acadêmicos},
+                'student_guardians': {student_id: (guardian_id, ...)},
+            }
         """
+        if academic_by_id is None:
+            academic_by_id = self._academic_index(students_academic)
+
+        student_hashes = {}
+        student_guardians = {}
+        no_academic = {}
+        for student in students_relations:
+            sid = student['id']
+            academic = academic_by_id.get(sid, no_academic)
+            student_hashes[sid] = _row_hash(
+                *map(student.get, _RELATION_HASH_FIELDS),
+                *map(academic.get, _ACADEMIC_HASH_FIELDS),
+            )
+            student_guardians[sid] = _linked_guardians(student)
+
         return {
-            'id': student.get('id'),
-            'nome': student.get('nome'),
-            'matricula': student.get('matricula'),
-            'turma': student.get('_turma'),
-            'serie': student.get('_serie'),
-            'turma_nome': student.get('_turma_nome'),
-            'periodo': extrair_periodo(student.get('_turma_nome')),
-            'status': mapear_status(student.get('_situacao')),
-            'url_foto': student.get('url_foto'),
+            'guardians': {
+                g['id']: _row_hash(*map(g.get, _GUARDIAN_HASH_FIELDS))
+                for g in guardians
+            },
+            'students': student_hashes,
+            'student_guardians': student_guardians,
         }
 
+    def build_incremental(
+        self,
+        guardians: List[Dict],
+        students_relations: List[Dict],
+        students_academic: List[Dict],
+        previous: List[Dict],
+        previous_state: Dict,
+    ) -> IncrementalAggregation:
+        """
+        Como build_guardians_response, remontando só os responsáveis
+        afetados desde previous_state:
+        - linha do responsável nova ou alterada
+        - linha de um filho (vínculos ou dados acadêmicos) nova, alterada
+          ou removida — pelos vínculos antigos E novos do aluno
+
+        Os demais são reaproveitados (mesmo objeto) de previous, a lista
+        processada do snapshot anterior — inclusive os resumos.
+
+        Args:
+            previous: Lista processada anterior
+            previous_state: snapshot() das APIs que geraram previous
+        """
+        academic_by_id = self._academic_index(students_academic)
+        state = self.snapshot(
+            guardians, students_relations, students_academic, academic_by_id
+        )
+
+        old_guardians = previous_state['guardians']
+        old_students = previous_state['students']
+        old_links = previous_state['student_guardians']
+
+        changed = {
+            gid for gid, row_hash in state['guardians'].items()
+            if old_guardians.get(gid) != row_hash
+        }
+        for sid, row_hash in state['students'].items():
+            if old_students.get(sid) != row_hash:
+                changed.update(state['student_guardians'][sid])
+                changed.update(old_links.get(sid, ()))
+        for sid in old_students.keys() - state['students'].keys():
+            changed.update(old_links[sid])
+
+        previous_by_id = {g.get('id'): g for g in previous}
+        changed.update(gid for gid in state['guardians'] if gid not in previous_by_id)
+        changed.intersection_update(state['guardians'])
+        removed = previous_by_id.keys() - state['guardians'].keys()
+
+        # JOIN só dos alunos ligados a algum responsável afetado
+        relations = [
+            s for s in students_relations
+            if not changed.isdisjoint(_linked_guardians(s))
+        ]
+        guardian_students_map = self._group_students_by_guardian(
+            relations, self._merge_student_data(relations, academic_by_id)
+        )
+
+        result = [
+            self._build_guardian_dict(guardian, guardian_students_map.get(guardian['id'], []))
+            if guardian['id'] in changed else previous_by_id[guardian['id']]
+            for guardian in guardians
+        ]
+
+        logger.info(
+            f"Aggregated {len(changed)}/{len(result)} guardians incrementally "
+            f"({len(removed)} removed)"
+        )
+        return IncrementalAggregation(result, state, changed, removed)
+
     # -----------------------------------------------------------------
     # CONSTRUÇÃO DO DICT DO RESPONSÁVEL
     # -----------------------------------------------------------------
 
     def _build_guardian_dict(
-        self, guardian: Dict, children: List[Dict]
+        self, guardian: Dict, children: List[Child]
     ) -> Dict:
         """
         Constrói dict COMPLETO do responsável.
         Inclui TODOS os campos do SIGA — os serializers filtram.
         """
+        # Filhos por id do aluno: a saída não depende da ordem das linhas de
+        # students_relations (o build incremental reaproveita guardians
+        # montados com a ordem anterior)
+        children = sorted(children, key=_child_order)
+
         # Parentesco (do primeiro filho, se houver)
         parentesco = 'responsavel'
         parentesco_display = 'Responsável'
         if children:
-            parentesco = children[0].get('_parentesco', 'responsavel')
-            parentesco_display = children[0].get(
-                '_parentesco_display', 'Responsável'
-            )
+            parentesco, parentesco_display = children[0][1]
 
-        # Limpar campos internos (_parentesco) dos filhos
-        filhos_clean = []
-        for child in children:
-            filhos_clean.append({
-                k: v for k, v in child.items()
-                if not k.startswith('_')
-            })
+        # Um dict novo por filho (a tupla do aluno é compartilhada), com o
+        # parentesco do vínculo com ESTE filho (o do responsável é o do primeiro)
+        filhos = []
+        for record, (parentesco_filho, _) in children:
+            filho = record._asdict()
+            filho['parentesco'] = parentesco_filho
+            filhos.append(filho)
 
         # Documentos (baseado em campos preenchidos)
         documentos = self._build_documents(guardian)
@@ -260,7 +464,7 @@ class GuardianAggregatorService:
             'parentesco_display': parentesco_display,
 
             # --- Filhos e documentos ---
-            'filhos': filhos_clean,
+            'filhos': filhos,
             'documentos': documentos,
         }
 
@@ -273,28 +477,13 @@ class GuardianAggregatorService:
         Gera lista de documentos baseado em campos preenchidos.
         O SIGA não tem endpoint de documentos — deduzimos do cadastro.
         """
-        docs = []
-        doc_id = 1
-
-        fields_map = [
-            ('cpf_cnpj', 'cpf', 'CPF'),
-            ('rg', 'rg', 'RG'),
-            ('email', 'email', 'Email'),
-            ('celular', 'telefone', 'Telefone'),
-            ('cep', 'comprovante_residencia', 'Comprovante de Residência'),
-        ]
-
-        for siga_field, tipo, nome in fields_map:
-            value = guardian.get(siga_field)
-            is_filled = bool(value and str(value).strip())
-
-            docs.append({
+        return [
+            {
                 'id': doc_id,
                 'tipo': tipo,
                 'nome': nome,
-                'status': 'entregue' if is_filled else 'pendente',
+                'status': 'entregue' if _is_filled(guardian.get(siga_field)) else 'pendente',
                 'data_entrega': None,  # SIGA não fornece
-            })
-            doc_id += 1
-
-        return docs
\ No newline at end of file
+            }
+            for doc_id, (siga_field, tipo, nome) in enumerate(DOCUMENT_FIELDS, 1)
+        ]
@@ -9,29 +9,44 @@ Este é o CÉREBRO da aplicação. Orquestra:
 - SigaCacheManager (cache das 3 APIs)
 - GuardianAggregatorService (JOIN das APIs)
 - InvoiceService (boletos)
+- InvoiceWarehouseService (agregados SQL dos boletos)
 
 Métodos públicos (chamados pelo ViewSet):
 - get_guardians_list()   → Lista SEM boletos, COM resumos
-- get_guardian_detail()   → Detalhe COM boletos
+- find_guardian()         → Um guardian (espelho local ou shard em cache)
+- get_search_index()      → Índice de busca da lista (?search=)
+- get_guardian_cards()    → Cards pré-serializados da lista (página)
+- get_guardian_detail()   → Detalhe COM boletos (filtros em memória)
+- get_full_detail()       → Detalhe sem filtros, cacheado (base dos boletos)
 - get_stats()             → Estatísticas globais
 - invalidate_cache()      → Limpa cache
 
+Chamado pelo crawl de boletos (background):
+- apply_invoice_rollups() → Resumos financeiros reais na lista em cache
+
 NÃO faz:
 - HTTP (ViewSet faz isso)
 - Filtros/ordenação (Selectors fazem isso)
-- Serialização (Serializers fazem isso)
+- Serialização (Serializers fazem isso — aqui só se cacheiam os cards)
 """
 
 import logging
+import time
 from typing import List, Dict, Optional
 from collections import Counter
 from datetime import datetime
 
+from django.conf import settings
 from django.utils import timezone
 
 from ..integrations.siga_cache_manager import SigaCacheManager
+from ..selectors.guardian_search_index import GuardianSearchIndex
+from ..serializers.guardian_serializers import render_guardian_cards
 from .guardian_aggregator_service import GuardianAggregatorService
 from .invoice_service import InvoiceService
+from .invoice_warehouse_service import InvoiceWarehouseService
+from .siga_integration_service import SigaIntegrationService
+from .siga_mirror_service import SigaMirrorService
 
 logger = logging.getLogger(__name__)
 
@@ -57,9 +72,12 @@ class GuardianService:
         Retorna lista de guardians com resumos (SEM boletos individuais).
 
         Fluxo:
-        1. Checa cache da lista processada
-        2. Se cache miss → busca 3 APIs SIGA (cada uma com cache próprio)
-        3. Agrega (JOIN)
+        1. Checa cache da lista processada — L1 do processo (sem unpickle)
+           e depois Redis; vencida no TTL soft → servida na hora e
+           revalidada em background
+        2. Se cache miss → single-flight: só um worker reconstrói, os
+           outros esperam o resultado (ou recebem a lista anterior)
+        3. Busca 3 APIs SIGA (cada uma com cache próprio) e agrega (JOIN)
         4. Calcula resumo_financeiro e resumo_documentos por guardian
         5. Cacheia resultado processado (2h)
 
@@ -67,46 +85,317 @@ class GuardianService:
             Lista de dicts prontos para GuardianListSerializer
         """
         # 1. Tentar cache da lista processada
-        cache_key = cls.CACHE_KEY_LIST.format(school_id=school_id)
-        cached = SigaCacheManager._safe_cache_get(cache_key)
+        cache_key = cls._list_cache_key(school_id)
+        cached = SigaCacheManager.get_or_revalidate(
+            cache_key, 'guardians_list', token, local=True, school_id=school_id
+        )
         if cached:
             logger.info(f"Cache HIT: processed list for school {school_id}")
             return cached
 
+        # 2. Reconstruir (um worker por vez)
+        return SigaCacheManager.single_flight(
+            cache_key,
+            lambda: cls._build_guardians_list(school_id, token, cache_key),
+            stale_key=SigaCacheManager.stale_key(cache_key),
+            dataset='guardians_list',
+        )
+
+    @classmethod
+    def _build_guardians_list(
+        cls,
+        school_id: int,
+        token: str,
+        cache_key: str,
+    ) -> List[Dict]:
+        """Reconstrói e cacheia a lista processada (passos 3–5)."""
         logger.info(f"Building guardians list for school {school_id}")
 
-        # 2. Buscar dados brutos do SIGA (cada API com cache individual)
+        # 3. Buscar dados brutos do SIGA (cada API com cache individual)
         all_data = SigaCacheManager.get_or_fetch_all_siga_data(
             school_id, token
         )
 
-        # 3. Agregar (JOIN das 3 APIs)
+        # Agregar (JOIN das 3 APIs) — só os responsáveis alterados, se há
+        # lista anterior com snapshot da agregação
         aggregator = GuardianAggregatorService()
-        guardians = aggregator.build_guardians_response(
-            guardians=all_data['guardians'],
-            students_relations=all_data['students_relations'],
-            students_academic=all_data['students_academic'],
-        )
+        previous = cls._previous_aggregation(school_id, cache_key)
+        if previous is not None:
+            previous_guardians, previous_state = previous
+            result = aggregator.build_incremental(
+                guardians=all_data['guardians'],
+                students_relations=all_data['students_relations'],
+                students_academic=all_data['students_academic'],
+                previous=previous_guardians,
+                previous_state=previous_state,
+            )
+            guardians, state = result.guardians, result.state
+            state['full_built_at'] = previous_state['full_built_at']
+            rebuilt = [g for g in guardians if g['id'] in result.changed]
+        else:
+            guardians = aggregator.build_guardians_response(
+                guardians=all_data['guardians'],
+                students_relations=all_data['students_relations'],
+                students_academic=all_data['students_academic'],
+            )
+            state = aggregator.snapshot(
+                all_data['guardians'],
+                all_data['students_relations'],
+                all_data['students_academic'],
+            )
+            state['full_built_at'] = time.time()
+            rebuilt = guardians
 
         # 4. Adicionar resumos (financeiro e documentos)
-        for guardian in guardians:
+        rollups = cls._invoice_rollups(school_id)
+        for guardian in rebuilt:
             guardian['resumo_financeiro'] = cls._build_resumo_financeiro_lista(
-                guardian
+                guardian, rollups
             )
             guardian['resumo_documentos'] = cls._build_resumo_documentos(
                 guardian
             )
 
-        # 5. Cachear lista processada
+        # 5. Cachear lista processada (não se veio de cópia stale — senão
+        #    o dado antigo ficaria 2h como se fosse novo após o SIGA voltar)
+        if SigaCacheManager.get_stale_datasets():
+            logger.warning(
+                f"Guardians list for school {school_id} built from stale SIGA data"
+            )
+            return guardians
+
+        # Derivados da versão anterior, lidos antes do bump
+        if previous is not None:
+            version = SigaCacheManager.get_school_version(school_id)
+            previous_cards = SigaCacheManager.get_guardian_cards(school_id, version)
+            previous_search = SigaCacheManager.get_guardian_search_state(
+                school_id, version
+            )
+
+        SigaCacheManager._swr_set(cache_key, guardians, cls.CACHE_TTL_LIST)
+        # Workers com a lista anterior no L1 passam a reler do Redis
+        SigaCacheManager.bump_school_version(school_id)
+        if previous is not None:
+            cls._patch_list_derivatives(
+                school_id, guardians, rebuilt, result.removed,
+                previous_cards, previous_search, cls.CACHE_TTL_LIST,
+            )
+        else:
+            cls._cache_list_derivatives(school_id, guardians, cls.CACHE_TTL_LIST)
+        # Cópia anterior servida a quem esperar demais pelo próximo rebuild
         SigaCacheManager._safe_cache_set(
-            cache_key, guardians, cls.CACHE_TTL_LIST
+            SigaCacheManager.stale_key(cache_key),
+            guardians,
+            SigaCacheManager.TTL_STALE,
         )
+        # Por último: snapshot só vale junto com a lista que o gerou
+        SigaCacheManager.set_guardians_aggregation(school_id, state)
 
         logger.info(
-            f"Built and cached {len(guardians)} guardians for school {school_id}"
+            f"Built and cached {len(guardians)} guardians for school {school_id} "
+            f"({len(rebuilt)} rebuilt)"
         )
         return guardians
 
+    @classmethod
+    def _previous_aggregation(cls, school_id: int, cache_key: str):
+        """
+        (lista processada, snapshot da agregação) para o rebuild
+        incremental, ou None → rebuild completo:
+        - GUARDIANS_FULL_REBUILD_INTERVAL = 0 (desativado) ou vencido
+          desde o último rebuild completo
+        - snapshot ou lista ausentes, ou de rebuilds diferentes
+        """
+        interval = getattr(settings, 'GUARDIANS_FULL_REBUILD_INTERVAL', 86400)
+        if interval <= 0:
+            return None
+
+        state = SigaCacheManager.get_guardians_aggregation(school_id)
+        if not state or time.time() - state.get('full_built_at', 0) >= interval:
+            return None
+
+        guardians, _ = SigaCacheManager._swr_get_entry(cache_key)
+        if not guardians or len(guardians) != len(state['guardians']) or any(
+            g.get('id') not in state['guardians'] for g in guardians
+        ):
+            return None
+        return guardians, state
+
+    @classmethod
+    def refresh_guardians_list(cls, school_id: int, token: str) -> List[Dict]:
+        """
+        Revalidação em background: recarrega as 3 APIs SIGA (ignorando
+        o cache) e reconstrói a lista processada.
+        """
+        SigaIntegrationService.run_concurrently({
+            dataset: (
+                lambda dataset=dataset: SigaCacheManager.refresh_dataset(
+                    dataset, school_id, token
+                )
+            )
+            for dataset in SigaCacheManager.DATASETS
+        })
+
+        # Mesmo lock do single-flight: não concorre com apply_invoice_rollups
+        cache_key = cls._list_cache_key(school_id)
+        with SigaCacheManager.exclusive(cache_key):
+            return cls._build_guardians_list(school_id, token, cache_key)
+
+    @classmethod
+    def _cache_list_derivatives(
+        cls,
+        school_id: int,
+        guardians: List[Dict],
+        timeout: int,
+    ) -> None:
+        """
+        Derivados da lista na versão atual (chamar após bump_school_version).
+
+        - Uma chave por guardian (detalhe/boletos sem carregar a lista).
+          Mesmo TTL soft da lista: expirado, find_guardian volta à lista,
+          que agenda a revalidação.
+        - Campos de busca normalizados uma vez por lista, não por requisição
+        - Cards JSON prontos: a página da listagem só concatena bytes
+        """
+        SigaCacheManager.set_guardian_shards(school_id, guardians, timeout)
+        SigaCacheManager.set_guardian_search_index(
+            school_id, GuardianSearchIndex.build(guardians), timeout
+        )
+        SigaCacheManager.set_guardian_cards(
+            school_id, render_guardian_cards(guardians), timeout
+        )
+
+    @classmethod
+    def _patch_list_derivatives(
+        cls,
+        school_id: int,
+        guardians: List[Dict],
+        rebuilt: List[Dict],
+        removed,
+        previous_cards: Optional[Dict],
+        previous_search: Optional[Dict],
+        timeout: int,
+    ) -> None:
+        """
+        Como _cache_list_derivatives, após um rebuild incremental: shards,
+        cards e campos de busca só dos guardians remontados; os demais
+        vêm dos derivados da versão anterior. Sem eles (expirados),
+        monta tudo de novo.
+        """
+        SigaCacheManager.patch_guardian_shards(
+            school_id, guardians, rebuilt, removed, timeout
+        )
+
+        if previous_search is None:
+            SigaCacheManager.set_guardian_search_index(
+                school_id, GuardianSearchIndex.build(guardians), timeout
+            )
+        else:
+            SigaCacheManager.set_guardian_search_state(
+                school_id,
+                GuardianSearchIndex.patch_state(
+                    previous_search, guardians, (g['id'] for g in rebuilt)
+                ),
+                timeout,
+            )
+
+        if previous_cards is None:
+            cards = render_guardian_cards(guardians)
+        else:
+            cards = dict(previous_cards)
+            for guardian_id in removed:
+                cards.pop(guardian_id, None)
+            for guardian in rebuilt:
+                # Card que não serializa: fica de fora (ver render_guardian_cards)
+                cards.pop(guardian['id'], None)
+            cards.update(render_guardian_cards(rebuilt))
+        SigaCacheManager.set_guardian_cards(school_id, cards, timeout)
+
+    @classmethod
+    def get_guardian_cards(
+        cls,
+        school_id: int,
+        guardians: List[Dict],
+    ) -> Dict:
+        """
+        Cards pré-serializados {id: bytes} da versão atual da lista.
+        Ausentes (lista de antes dos cards, ou servida da cópia stale):
+        montados a partir de guardians e cacheados.
+        """
+        version = SigaCacheManager.get_school_version(school_id)
+        cards = SigaCacheManager.get_guardian_cards(school_id, version)
+        if cards is None:
+            cards = render_guardian_cards(guardians)
+            SigaCacheManager.set_guardian_cards(school_id, cards, cls.CACHE_TTL_LIST)
+        return cards
+
+    @classmethod
+    def get_search_index(
+        cls,
+        school_id: int,
+        guardians: List[Dict],
+    ) -> GuardianSearchIndex:
+        """
+        Índice de busca da versão atual da lista (L1 → Redis). Ausente
+        (lista de antes do índice, ou servida da cópia stale): montado a
+        partir de guardians e cacheado.
+        """
+        version = SigaCacheManager.get_school_version(school_id)
+        index = SigaCacheManager.get_guardian_search_index(
+            school_id, version, GuardianSearchIndex.from_state
+        )
+        if index is None:
+            index = GuardianSearchIndex.build(guardians)
+            SigaCacheManager.set_guardian_search_index(
+                school_id, index, cls.CACHE_TTL_LIST
+            )
+        return index
+
+    @classmethod
+    def _list_cache_key(cls, school_id: int) -> str:
+        """Chave da lista processada (namespace da geração da escola)."""
+        return SigaCacheManager.school_key(
+            school_id, cls.CACHE_KEY_LIST.format(school_id=school_id)
+        )
+
+    @classmethod
+    def find_guardian(
+        cls,
+        guardian_id: int,
+        school_id: int,
+        token: str,
+    ) -> Optional[Dict]:
+        """
+        Um guardian da lista processada (sem boletos), ou None.
+
+        Com o espelho local ativo, é uma busca indexada por siga_id.
+        Senão, leitura O(1) do cache:
+        1. Índice id → guardian no L1 do processo (versão atual da escola)
+        2. Shard do guardian no Redis
+        3. Fallback: lista processada (reconstruída se preciso), que
+           passa a alimentar o índice L1
+        """
+        from ..selectors.guardian_mirror_selectors import GuardianMirrorSelector
+        from .siga_mirror_service import SigaMirrorService
+
+        if SigaMirrorService.should_read(school_id):
+            return GuardianMirrorSelector.get_payload(school_id, guardian_id)
+
+        version = SigaCacheManager.get_school_version(school_id)
+
+        index = SigaCacheManager.get_guardian_index(school_id, version)
+        if index is not None:
+            return index.get(guardian_id)
+
+        guardian = SigaCacheManager.get_guardian_shard(school_id, guardian_id)
+        if guardian is not None:
+            logger.info(f"Cache HIT: guardian {guardian_id} shard")
+            return guardian
+
+        guardians = cls.get_guardians_list(school_id, token)
+        index = SigaCacheManager.set_guardian_index(school_id, version, guardians)
+        return index.get(guardian_id)
+
     # =================================================================
     # DETAIL — GET /guardians/{id}/
     # =================================================================
@@ -124,33 +413,73 @@ class GuardianService:
         Retorna detalhe completo de um guardian COM boletos.
 
         Fluxo:
-        1. Checa cache do detalhe
-        2. Se cache miss → busca guardian da lista + boletos
-        3. Aplica filtros de boleto (ano, situação)
-        4. Calcula resumos completos
-        5. Cacheia detalhe (1h)
+        1. Detalhe completo, sem filtros (cache, ou montado e cacheado —
+           ver get_full_detail)
+        2. Filtros de boleto (ano, situação) aplicados em memória: trocar
+           o filtro não refaz a busca de boletos no SIGA
+        3. Resumos de boletos e financeiro recalculados sobre os filtrados
 
         Returns:
             Dict pronto para GuardianDetailSerializer ou None
         """
         logger.info(f"Fetching detail for guardian {guardian_id}")
 
-        # 1. Tentar cache do detalhe (só se sem filtros)
-        if not ano_letivo and not situacao_boleto:
-            cached = SigaCacheManager._safe_cache_get(
-                SigaCacheManager.KEY_GUARDIAN_DETAIL.format(
-                    guardian_id=guardian_id, school_id=school_id
-                )
+        detail = cls.get_full_detail(guardian_id, school_id, token)
+        if detail is None or (not ano_letivo and not situacao_boleto):
+            return detail
+
+        filhos = []
+        for filho in detail.get('filhos', []):
+            invoices = InvoiceService.filter_invoices(
+                filho.get('boletos', []), ano=ano_letivo, situacao=situacao_boleto
             )
-            if cached:
-                logger.info(f"Cache HIT: detail for guardian {guardian_id}")
-                return cached
+            filhos.append({
+                **filho,
+                'boletos': invoices,
+                'resumo_boletos': InvoiceService.calculate_student_summary(invoices),
+            })
 
-        # 2. Buscar guardian da lista (já agregado, sem boletos)
-        guardians = cls.get_guardians_list(school_id, token)
-        guardian = next(
-            (g for g in guardians if g['id'] == guardian_id), None
+        return {
+            **detail,
+            'filhos': filhos,
+            'resumo_financeiro': cls._build_resumo_financeiro_detalhe(filhos),
+        }
+
+    @classmethod
+    def get_cached_detail(cls, guardian_id: int, school_id: int) -> Optional[Dict]:
+        """Detalhe completo (sem filtros) do cache, ou None."""
+        cached = SigaCacheManager._safe_cache_get(
+            SigaCacheManager.guardian_detail_key(guardian_id, school_id)
         )
+        if cached:
+            logger.info(f"Cache HIT: detail for guardian {guardian_id}")
+        return cached or None
+
+    @classmethod
+    def get_full_detail(
+        cls,
+        guardian_id: int,
+        school_id: int,
+        token: str,
+    ) -> Optional[Dict]:
+        """
+        Detalhe do guardian com TODOS os boletos de cada filho — base do
+        detalhe filtrado e de GET /guardians/{id}/invoices/.
+
+        Fluxo:
+        1. Checa cache do detalhe
+        2. Se cache miss → busca guardian da lista + boletos (armazém
+           local se o crawl for recente, senão SIGA)
+        3. Calcula resumos completos
+        4. Cacheia detalhe pelo TTL dos boletos (30min): o detalhe não
+           fica mais velho que o cache de boletos de cada aluno
+        """
+        cached = cls.get_cached_detail(guardian_id, school_id)
+        if cached:
+            return cached
+
+        # Buscar guardian da lista (já agregado, sem boletos)
+        guardian = cls.find_guardian(guardian_id, school_id, token)
 
         if not guardian:
             logger.warning(f"Guardian {guardian_id} not found")
@@ -159,34 +488,24 @@ class GuardianService:
         # Copiar para não mutar o cache da lista
         guardian = {**guardian}
 
-        # 3. Buscar boletos de todos os filhos (paralelo)
+        # Buscar boletos de todos os filhos
         filhos = guardian.get('filhos', [])
         student_ids = [f['id'] for f in filhos if f.get('id')]
 
-        invoices_by_student = InvoiceService.get_multiple_students_invoices(
-            student_ids, token
-        )
+        if InvoiceWarehouseService.is_fresh(school_id):
+            invoices_by_student = InvoiceWarehouseService.get_invoices_by_student(
+                school_id, student_ids
+            )
+        else:
+            invoices_by_student = InvoiceService.get_multiple_students_invoices(
+                student_ids, token, school_id=school_id
+            )
 
-        # 4. Enriquecer cada filho com boletos
+        # Enriquecer cada filho com boletos
         filhos_enriched = []
         for filho in filhos:
             filho = {**filho}  # Copiar para não mutar
-            sid = filho.get('id')
-            invoices = invoices_by_student.get(sid, [])
-
-            # Aplicar filtros de boletos
-            if ano_letivo:
-                invoices = [
-                    inv for inv in invoices
-                    if (inv.get('vencimento') or '').startswith(ano_letivo)
-                ]
-
-            if situacao_boleto and situacao_boleto != 'todos':
-                invoices = [
-                    inv for inv in invoices
-                    if inv.get('situacao') == situacao_boleto
-                ]
-
+            invoices = invoices_by_student.get(filho.get('id'), [])
             filho['boletos'] = invoices
             filho['resumo_boletos'] = InvoiceService.calculate_student_summary(
                 invoices
@@ -195,20 +514,18 @@ class GuardianService:
 
         guardian['filhos'] = filhos_enriched
 
-        # 5. Resumo financeiro COMPLETO (com dados de boletos reais)
+        # Resumo financeiro COMPLETO (com dados de boletos reais)
         guardian['resumo_financeiro'] = cls._build_resumo_financeiro_detalhe(
             filhos_enriched
         )
         guardian['resumo_documentos'] = cls._build_resumo_documentos(guardian)
 
-        # 6. Cachear (só se sem filtros — resultado completo)
-        if not ano_letivo and not situacao_boleto:
+        # Cachear (não se veio de cópia stale)
+        if not SigaCacheManager.get_stale_datasets():
             SigaCacheManager._safe_cache_set(
-                SigaCacheManager.KEY_GUARDIAN_DETAIL.format(
-                    guardian_id=guardian_id, school_id=school_id
-                ),
+                SigaCacheManager.guardian_detail_key(guardian_id, school_id),
                 guardian,
-                SigaCacheManager.TTL_GUARDIAN_DETAIL,
+                SigaCacheManager.TTL_INVOICES,
             )
 
         logger.info(f"Guardian {guardian_id} detail built successfully")
@@ -238,20 +555,37 @@ class GuardianService:
         total_responsaveis = len(guardians)
         total_alunos = sum(len(g.get('filhos', [])) for g in guardians)
 
-        # Financeiro
-        inadimplentes = [
-            g for g in guardians
-            if g.get('resumo_financeiro', {}).get('tem_pendencia', False)
-        ]
-        em_dia = total_responsaveis - len(inadimplentes)
+        # Financeiro: armazém de boletos (agregação SQL) se o crawl for
+        # recente; senão, os resumos da lista
+        valor_recebido = 0
+        if InvoiceWarehouseService.is_fresh(school_id):
+            em_aberto = InvoiceWarehouseService.open_balances(school_id)
+            total_inadimplentes = 0
+            valor_pendente = 0.0
+            for g in guardians:
+                abertos = [
+                    em_aberto[f.get('id')] for f in g.get('filhos', [])
+                    if f.get('id') in em_aberto
+                ]
+                if abertos:
+                    total_inadimplentes += 1
+                    valor_pendente += sum(abertos)
+            valor_recebido = InvoiceWarehouseService.total_received(school_id)
+        else:
+            inadimplentes = [
+                g for g in guardians
+                if g.get('resumo_financeiro', {}).get('tem_pendencia', False)
+            ]
+            total_inadimplentes = len(inadimplentes)
+            valor_pendente = sum(
+                float(g.get('resumo_financeiro', {}).get('valor_pendente', 0))
+                for g in inadimplentes
+            )
 
-        valor_pendente = sum(
-            float(g.get('resumo_financeiro', {}).get('valor_pendente', 0))
-            for g in inadimplentes
-        )
+        em_dia = total_responsaveis - total_inadimplentes
 
         percentual_inadimplencia = (
-            round(len(inadimplentes) / total_responsaveis * 100, 1)
+            round(total_inadimplentes / total_responsaveis * 100, 1)
             if total_responsaveis > 0 else 0
         )
 
@@ -278,10 +612,10 @@ class GuardianService:
 
             'financeiro': {
                 'total_em_dia': em_dia,
-                'total_inadimplentes': len(inadimplentes),
+                'total_inadimplentes': total_inadimplentes,
                 'percentual_inadimplencia': percentual_inadimplencia,
                 'valor_total_pendente': round(valor_pendente, 2),
-                'valor_total_recebido': 0,  # Requer busca de boletos
+                'valor_total_recebido': valor_recebido,
             },
 
             'documentos': {
@@ -304,6 +638,98 @@ class GuardianService:
             'ultima_atualizacao': timezone.now().isoformat(),
         }
 
+    # =================================================================
+    # ROLLUP FINANCEIRO — crawl de boletos (background)
+    # =================================================================
+
+    @classmethod
+    def apply_invoice_rollups(cls, school_id: int) -> Optional[int]:
+        """
+        Grava na lista processada em cache os resumos financeiros do
+        armazém de boletos. Chamado pelo crawl (sync_invoice_stats, e
+        apply_invoice_rollups_task enfileirada pelo dashboard) logo após
+        gravar os boletos da escola.
+
+        Assim o filtro por status financeiro não consulta boletos na
+        requisição: tem_pendencia/valor_pendente já estão na lista.
+
+        A lista mantém o fresh_until atual (o crawl não renova os dados
+        de responsáveis/alunos); shards, L1 dos workers e espelho local
+        recebem os novos resumos. Nos dois casos a versão dos dados da
+        escola é incrementada (boletos novos = novas ETags).
+
+        Read-modify-write da lista sob o lock do single-flight: um
+        rebuild concorrente não é sobrescrito com a lista anterior (e o
+        snapshot da agregação continua descrevendo a lista em cache).
+
+        Returns:
+            Número de guardians atualizados, ou None se a lista não está
+            em cache (o próximo rebuild já lê os rollups do armazém)
+        """
+        cache_key = cls._list_cache_key(school_id)
+        with SigaCacheManager.exclusive(cache_key):
+            return cls._apply_invoice_rollups(school_id, cache_key)
+
+    @classmethod
+    def schedule_invoice_rollups(cls, school_id: int) -> bool:
+        """
+        Enfileira apply_invoice_rollups_task (ex: dashboard, numa
+        requisição GET que não deve esperar o lock da lista).
+
+        Returns:
+            True se a task foi enfileirada
+        """
+        from ..tasks import apply_invoice_rollups_task
+
+        try:
+            apply_invoice_rollups_task.apply_async(args=(school_id,), retry=False)
+        except Exception as e:
+            logger.warning(f"Could not enqueue invoice rollups for school {school_id}: {e}")
+            return False
+        return True
+
+    @classmethod
+    def _apply_invoice_rollups(cls, school_id: int, cache_key: str) -> Optional[int]:
+        guardians, fresh_until = SigaCacheManager._swr_get_entry(cache_key)
+        if not guardians:
+            SigaCacheManager.bump_data_version(school_id)
+            return None
+
+        rollups = InvoiceWarehouseService.financial_rollups(school_id)
+        for guardian in guardians:
+            guardian['resumo_financeiro'] = cls._build_resumo_financeiro_lista(
+                guardian, rollups
+            )
+
+        soft_ttl = min(fresh_until - time.time(), cls.CACHE_TTL_LIST)
+        SigaCacheManager._swr_set(cache_key, guardians, soft_ttl)
+        SigaCacheManager.bump_school_version(school_id)
+        # Derivados valem enquanto a lista existir (TTL hard): com a lista
+        # já vencida no soft, soft_ttl seria <= 0
+        cls._cache_list_derivatives(school_id, guardians, SigaCacheManager.TTL_HARD)
+        SigaCacheManager._safe_cache_set(
+            SigaCacheManager.stale_key(cache_key),
+            guardians,
+            SigaCacheManager.TTL_STALE,
+        )
+
+        if SigaMirrorService.read_enabled():
+            SigaMirrorService.update_payloads(school_id, guardians)
+        SigaCacheManager.bump_data_version(school_id)
+
+        logger.info(
+            f"Applied invoice rollups to {len(guardians)} guardians "
+            f"for school {school_id} ({len(rollups)} students with open invoices)"
+        )
+        return len(guardians)
+
+    @classmethod
+    def _invoice_rollups(cls, school_id: int) -> Dict:
+        """Rollups do armazém se o crawl for recente; senão, vazio (resumos zerados)."""
+        if not InvoiceWarehouseService.is_fresh(school_id):
+            return {}
+        return InvoiceWarehouseService.financial_rollups(school_id)
+
     # =================================================================
     # REFRESH — POST /guardians/refresh/
     # =================================================================
@@ -313,53 +739,55 @@ class GuardianService:
         """
         Invalida todo o cache de uma escola.
         Próxima requisição buscará tudo do SIGA.
+
+        Um INCR na geração da escola invalida todas as famílias de chaves
+        (lista, shards, detalhes, buscas, boletos, datasets SIGA, blob de
+        boletos da escola) — sem SCAN/DEL; as antigas expiram sozinhas.
         """
         logger.info(f"Invalidating all cache for school {school_id}")
 
-        keys_to_delete = [
-            # Cache da lista processada
-            cls.CACHE_KEY_LIST.format(school_id=school_id),
-            # Caches individuais das 3 APIs SIGA
-            SigaCacheManager.KEY_GUARDIANS_ALL.format(school_id=school_id),
-            SigaCacheManager.KEY_STUDENTS_RELATIONS.format(
-                school_id=school_id
-            ),
-            SigaCacheManager.KEY_STUDENTS_ACADEMIC.format(
-                school_id=school_id
-            ),
-        ]
+        SigaCacheManager.invalidate_school_cache(school_id)
 
-        for key in keys_to_delete:
-            SigaCacheManager._safe_cache_delete(key)
-
-        logger.info(
-            f"Invalidated {len(keys_to_delete)} cache keys for school {school_id}"
-        )
+        logger.info(f"Invalidated cache namespace for school {school_id}")
 
     # =================================================================
     # HELPERS: Resumos financeiros e documentos
     # =================================================================
 
     @classmethod
-    def _build_resumo_financeiro_lista(cls, guardian: Dict) -> Dict:
+    def _build_resumo_financeiro_lista(
+        cls,
+        guardian: Dict,
+        rollups: Optional[Dict] = None,
+    ) -> Dict:
         """
-        Resumo financeiro para a LISTA (sem dados reais de boletos).
-
-        Na lista, não temos boletos individuais. O resumo é inicialmente
-        zerado e será preenchido progressivamente conforme os detalhes
-        são acessados e cacheados.
+        Resumo financeiro para a LISTA (sem boletos individuais).
 
-        Se o detalhe já foi acessado antes, o cache do detalhe terá
-        os dados reais. Mas na primeira carga, mostramos valores default.
+        Soma os rollups por aluno do armazém de boletos
+        (InvoiceWarehouseService.financial_rollups) dos filhos do
+        guardian. Sem rollups (crawl ainda não rodou), o resumo fica
+        zerado.
         """
-        # Tentar buscar do cache do detalhe (se existir)
-        # Isso permite que guardians já visitados mostrem dados reais
-        # mesmo na lista
+        total_abertos = 0
+        valor_pendente = 0.0
+        proximo_vencimento = None
+
+        filhos = guardian.get('filhos', []) if rollups else []
+        for filho in filhos:
+            rollup = rollups.get(filho.get('id'))
+            if rollup is None:
+                continue
+            total_abertos += rollup['total_abertos']
+            valor_pendente += rollup['valor_pendente']
+            venc = rollup['proximo_vencimento']
+            if venc and (proximo_vencimento is None or venc < proximo_vencimento):
+                proximo_vencimento = venc
+
         return {
-            'tem_pendencia': False,
-            'total_abertos': 0,
-            'valor_pendente': 0,
-            'proximo_vencimento': None,
+            'tem_pendencia': total_abertos > 0,
+            'total_abertos': total_abertos,
+            'valor_pendente': round(valor_pendente, 2),
+            'proximo_vencimento': proximo_vencimento,
         }
 
     @classmethod
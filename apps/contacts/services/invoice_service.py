@@ -20,9 +20,11 @@ import logging
 import requests
 from typing import List, Dict, Optional
 from decimal import Decimal
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from ..integrations.siga_cache_manager import SigaCacheManager
+from ..integrations.siga_circuit_breaker import get_breaker
+from ..integrations.siga_client import get_siga_client
+from ..integrations.siga_fanout import SigaFanout
 
 logger = logging.getLogger(__name__)
 
@@ -33,7 +35,7 @@ SITUACAO_DISPLAY = {
     'CAN': 'Cancelado',
 }
 
-SIGA_INVOICES_URL = "https://siga.activesoft.com.br/api/v0/informacoes_boleto/"
+SIGA_INVOICES_PATH = "informacoes_boleto/"
 
 
 class InvoiceService:
@@ -49,6 +51,8 @@ class InvoiceService:
         student_id: int,
         token: str,
         use_cache: bool = True,
+        force_refresh: bool = False,
+        school_id: Optional[int] = None,
     ) -> List[Dict]:
         """
         Busca boletos de um aluno específico.
@@ -57,41 +61,30 @@ class InvoiceService:
             student_id: ID do aluno no SIGA
             token: Token de autenticação SIGA
             use_cache: Se deve usar cache Redis
+            force_refresh: Ignora o cache na leitura, mas grava o resultado
+                (revalidação em background)
+            school_id: Escola do aluno (namespace do cache, invalidado
+                pelo refresh da escola)
 
         Returns:
             Lista de boletos formatados (contrato BoletoSerializer)
         """
-        # Tentar cache
-        if use_cache:
-            cached = SigaCacheManager.get_or_set_student_invoices(student_id)
+        # Tentar cache (vencido no TTL soft → revalida em background)
+        if use_cache and not force_refresh:
+            cached = SigaCacheManager.get_or_set_student_invoices(
+                student_id, token=token, school_id=school_id
+            )
             if cached is not None:
                 return cached
 
-        # Buscar do SIGA
+        # Buscar do SIGA (circuit breaker do endpoint: fail fast em quedas)
         try:
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json",
-            }
-
-            response = requests.get(
-                SIGA_INVOICES_URL,
-                headers=headers,
-                params={'id_aluno': student_id},
-                timeout=10,
-            )
-            response.raise_for_status()
-
-            data = response.json()
-            raw_invoices = data.get('resultados', [])
-
-            # Formatar cada boleto
-            formatted = [cls._format_invoice(inv) for inv in raw_invoices]
+            formatted = cls._fetch_student_invoices(student_id, token)
 
             # Cachear
             if use_cache:
                 SigaCacheManager.get_or_set_student_invoices(
-                    student_id, formatted
+                    student_id, formatted, school_id=school_id
                 )
 
             logger.debug(
@@ -103,7 +96,37 @@ class InvoiceService:
             logger.error(
                 f"Error fetching invoices for student {student_id}: {e}"
             )
-            return []
+            # Último dado bom conhecido (marcado como stale na requisição)
+            stale = SigaCacheManager.get_stale_student_invoices(
+                student_id, school_id
+            )
+            return stale if stale is not None else []
+
+    @classmethod
+    def _fetch_student_invoices(cls, student_id: int, token: str) -> List[Dict]:
+        """
+        Boletos formatados direto do SIGA (sem cache), pelo circuit
+        breaker do endpoint.
+
+        Raises:
+            requests.exceptions.RequestException: SIGA falhou
+        """
+        data = get_breaker(SIGA_INVOICES_PATH).call(
+            cls._fetch_raw_invoices, student_id, token
+        )
+        return [cls._format_invoice(inv) for inv in data.get('resultados', [])]
+
+    @classmethod
+    def _fetch_raw_invoices(cls, student_id: int, token: str) -> Dict:
+        """GET informacoes_boleto/ de um aluno (JSON bruto)."""
+        response = get_siga_client().get(
+            SIGA_INVOICES_PATH,
+            token,
+            params={'id_aluno': student_id},
+            timeout=10,
+        )
+        response.raise_for_status()
+        return response.json()
 
     # -----------------------------------------------------------------
     # BUSCA DE BOLETOS (múltiplos alunos — PARALELO)
@@ -114,15 +137,23 @@ class InvoiceService:
         cls,
         student_ids: List[int],
         token: str,
-        max_workers: int = 10,
+        max_workers: Optional[int] = None,
+        school_id: Optional[int] = None,
     ) -> Dict[int, List[Dict]]:
         """
-        Busca boletos de múltiplos alunos em paralelo.
+        Busca boletos de múltiplos alunos em paralelo (SigaFanout).
+
+        Cache em lote: um MGET resolve todos os alunos cacheados (e, só se
+        houver ausentes, outro traz as cópias stale deles), só os ausentes
+        vão ao SIGA (em paralelo) e os resultados são gravados num único
+        pipeline — no máximo três idas ao Redis, não uma por aluno. A geração da escola vem do memo
+        da requisição (ver SigaCacheManager.get_school_generation).
 
         Args:
             student_ids: Lista de IDs dos alunos
             token: Token SIGA
-            max_workers: Threads paralelas (default: 10)
+            max_workers: Chamadas simultâneas (default: SIGA_FANOUT_CONCURRENCY)
+            school_id: Escola dos alunos (namespace do cache)
 
         Returns:
             Dict {student_id: [boletos_formatados]}
@@ -130,26 +161,44 @@ class InvoiceService:
         if not student_ids:
             return {}
 
-        result = {}
-
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = {
-                executor.submit(cls.get_student_invoices, sid, token): sid
-                for sid in student_ids
-            }
-
-            for future in as_completed(futures):
-                student_id = futures[future]
-                try:
-                    invoices = future.result()
-                    result[student_id] = invoices
-                except Exception as e:
-                    logger.error(
-                        f"Error fetching invoices for student {student_id}: {e}"
-                    )
-                    result[student_id] = []
+        generation = (
+            SigaCacheManager.get_school_generation(school_id)
+            if school_id is not None else None
+        )
+        result, stale_by_student = SigaCacheManager.get_many_student_invoices_with_stale(
+            student_ids, token=token, school_id=school_id, generation=generation
+        )
+        misses = [sid for sid in student_ids if sid not in result]
+
+        fetched = {}
+        fanout = SigaFanout(concurrency=max_workers)
+
+        for item in fanout.iter_completed(
+            lambda sid: cls._fetch_student_invoices(sid, token), misses
+        ):
+            if item.ok:
+                fetched[item.item] = item.value
+            else:
+                logger.error(
+                    f"Error fetching invoices for student {item.item}: {item.error}"
+                )
+                # Último dado bom conhecido (marcado como stale na requisição)
+                stale = stale_by_student.get(item.item)
+                if stale is not None:
+                    SigaCacheManager.mark_stale('invoices')
+                result[item.item] = stale if stale is not None else []
+
+        SigaCacheManager.set_many_student_invoices(
+            fetched, school_id, generation, previous=stale_by_student
+        )
+        result.update(fetched)
 
-        return result
+        if misses:
+            logger.debug(
+                f"Invoices: {len(student_ids) - len(misses)} cached, "
+                f"{len(fetched)} fetched from SIGA"
+            )
+        return {sid: result[sid] for sid in student_ids}
 
     # -----------------------------------------------------------------
     # ENDPOINT: GET /guardians/{id}/invoices/
@@ -174,11 +223,9 @@ class InvoiceService:
         """
         from .guardian_service import GuardianService
 
-        # Buscar guardian (do cache da lista, sem boletos)
-        guardians = GuardianService.get_guardians_list(school_id, token)
-        guardian = next(
-            (g for g in guardians if g['id'] == guardian_id), None
-        )
+        # Detalhe completo do guardian em cache (mesma fonte do detalhe),
+        # filtrado em memória — trocar o filtro não refaz a busca
+        guardian = GuardianService.get_full_detail(guardian_id, school_id, token)
 
         if not guardian:
             return None
@@ -189,12 +236,6 @@ class InvoiceService:
         if filho_id:
             filhos = [f for f in filhos if f.get('id') == filho_id]
 
-        # Buscar boletos de todos os filhos
-        student_ids = [f['id'] for f in filhos if f.get('id')]
-        invoices_by_student = cls.get_multiple_students_invoices(
-            student_ids, token
-        )
-
         # Montar resposta
         filhos_response = []
         total_geral = {
@@ -206,21 +247,9 @@ class InvoiceService:
 
         for filho in filhos:
             sid = filho.get('id')
-            invoices = invoices_by_student.get(sid, [])
-
-            # Aplicar filtros
-            if ano:
-                invoices = [
-                    inv for inv in invoices
-                    if inv.get('vencimento', '').startswith(ano)
-                ]
-
-            if situacao and situacao != 'todos':
-                invoices = [
-                    inv for inv in invoices
-                    if inv.get('situacao') == situacao
-                ]
-
+            invoices = cls.filter_invoices(
+                filho.get('boletos', []), ano=ano, situacao=situacao
+            )
             resumo = cls.calculate_student_summary(invoices)
 
             filhos_response.append({
@@ -257,6 +286,35 @@ class InvoiceService:
             },
         }
 
+    # -----------------------------------------------------------------
+    # FILTROS (em memória, sobre os boletos completos de um aluno)
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def filter_invoices(
+        cls,
+        invoices: List[Dict],
+        ano: Optional[str] = None,
+        situacao: Optional[str] = None,
+    ) -> List[Dict]:
+        """
+        Boletos do ano de vencimento e da situação pedidos
+        (situacao 'todos' ou vazia: sem filtro de situação).
+        """
+        if ano:
+            invoices = [
+                inv for inv in invoices
+                if (inv.get('vencimento') or '').startswith(ano)
+            ]
+
+        if situacao and situacao != 'todos':
+            invoices = [
+                inv for inv in invoices
+                if inv.get('situacao') == situacao
+            ]
+
+        return invoices
+
     # -----------------------------------------------------------------
     # CÁLCULOS: resumos financeiros
     # -----------------------------------------------------------------
@@ -0,0 +1,369 @@
+# apps/contacts/services/invoice_warehouse_service.py
+
+"""
+Armazém local de boletos SIGA (tabela siga_invoices).
+
+Responsabilidades:
+- Gravar em lote (bulk upsert por (escola, título)) os boletos varridos
+  pelo crawl — sync_invoice_stats e o dashboard
+- Responder boletos e resumos financeiros com agregações SQL
+- Informar se o armazém da escola está recente o suficiente para uso
+
+NÃO faz:
+- Chamadas ao SIGA (o crawl entrega os boletos brutos)
+- Cache Redis por aluno (InvoiceService / SigaCacheManager)
+"""
+
+import logging
+import re
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Min, Q, Sum
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from ..models import SigaInvoice
+from .invoice_service import SITUACAO_DISPLAY, InvoiceService
+
+logger = logging.getLogger(__name__)
+
+CPF_PATTERN = re.compile(r'\d{3}\.\d{3}\.\d{3}-\d{2}')
+
+# Boletos "abertos" no dashboard: tudo que não foi pago nem cancelado
+ABERTO_DASHBOARD = ~Q(situacao__in=['LIQ', 'CAN'])
+
+
+def _decimal(value) -> Decimal:
+    return Decimal(str(value or 0)).quantize(Decimal('0.01'))
+
+
+def _money(value) -> float:
+    return round(float(value or 0), 2)
+
+
+def _siga_key(value: str):
+    """IDs/títulos guardados como texto voltam ao tipo do SIGA (int)."""
+    return int(value) if value.isdigit() else value
+
+
+def _parse_date(value):
+    try:
+        return parse_date(value) if value else None
+    except ValueError:
+        return None
+
+
+class InvoiceWarehouseService:
+    """Persistência e agregações do armazém de boletos."""
+
+    BATCH_SIZE = 1000
+    DEFAULT_MAX_AGE = 7200  # 2 crawls do sync_invoice_stats (1h)
+
+    UPDATE_FIELDS = [
+        'student_siga_id', 'parcela', 'vencimento', 'valor', 'valor_pago',
+        'valor_multa', 'valor_juros', 'situacao', 'banco',
+        'linha_digitavel', 'link_pagamento', 'servico', 'pagador_cpf',
+        'synced_at', 'updated_at',
+    ]
+
+    # -----------------------------------------------------------------
+    # FRESCOR
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def is_fresh(cls, school_id: int) -> bool:
+        """O crawl gravou boletos da escola dentro de INVOICE_WAREHOUSE_MAX_AGE?"""
+        max_age = getattr(settings, 'INVOICE_WAREHOUSE_MAX_AGE', cls.DEFAULT_MAX_AGE)
+        if not max_age:
+            return False
+
+        return SigaInvoice.objects.filter(
+            school_id=school_id,
+            synced_at__gte=timezone.now() - timedelta(seconds=max_age),
+        ).exists()
+
+    # -----------------------------------------------------------------
+    # ESCRITA (crawl)
+    # -----------------------------------------------------------------
+
+    @classmethod
+    @transaction.atomic
+    def upsert_student_invoices(
+        cls,
+        school_id: int,
+        invoices_by_student: Dict,
+        all_student_ids: Optional[Iterable] = None,
+    ) -> Dict:
+        """
+        Bulk upsert dos boletos brutos do SIGA (informacoes_boleto).
+
+        Args:
+            invoices_by_student: {student_id: [boleto_bruto]} — só alunos
+                cuja consulta teve sucesso (os demais ficam intocados)
+            all_student_ids: Lista completa de alunos da escola; boletos
+                de alunos fora dela são removidos
+
+        Returns:
+            Contadores da gravação
+        """
+        now = timezone.now()
+
+        rows = {}
+        for student_id, raw_invoices in invoices_by_student.items():
+            for raw in raw_invoices or []:
+                if raw.get('titulo') is None:
+                    continue
+                invoice = cls._build_invoice(school_id, str(student_id), raw, now)
+                rows[invoice.titulo] = invoice
+
+        SigaInvoice.objects.bulk_create(
+            list(rows.values()),
+            batch_size=cls.BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['school', 'titulo'],
+            update_fields=cls.UPDATE_FIELDS,
+        )
+
+        # Boletos que sumiram dos alunos varridos (não regravados agora)
+        removed = 0
+        crawled = [str(sid) for sid in invoices_by_student]
+        for i in range(0, len(crawled), cls.BATCH_SIZE):
+            removed += SigaInvoice.objects.filter(
+                school_id=school_id,
+                student_siga_id__in=crawled[i:i + cls.BATCH_SIZE],
+                synced_at__lt=now,
+            ).delete()[0]
+
+        # Alunos que saíram da escola
+        if all_student_ids is not None:
+            removed += SigaInvoice.objects.filter(school_id=school_id).exclude(
+                student_siga_id__in=[str(sid) for sid in all_student_ids]
+            ).delete()[0]
+
+        result = {'invoices': len(rows), 'students': len(crawled), 'removed': removed}
+        logger.info(f"Invoice warehouse updated for school {school_id}: {result}")
+        return result
+
+    # -----------------------------------------------------------------
+    # LEITURA: boletos e resumos por aluno
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def get_invoices_by_student(
+        cls,
+        school_id: int,
+        student_ids: List,
+        ano: Optional[str] = None,
+        situacao: Optional[str] = None,
+    ) -> Dict:
+        """
+        Boletos no contrato BoletoSerializer, por aluno.
+
+        Returns:
+            Dict {student_id: [boletos_formatados]} (alunos sem boletos
+            ficam com lista vazia)
+        """
+        result = {sid: [] for sid in student_ids}
+        queryset = cls._filtered(school_id, student_ids, ano, situacao)
+
+        for row in queryset.order_by('student_siga_id', 'vencimento', 'titulo'):
+            result.setdefault(_siga_key(row.student_siga_id), []).append(
+                cls._to_api(row)
+            )
+
+        return result
+
+    @classmethod
+    def summaries_by_student(
+        cls,
+        school_id: int,
+        student_ids: List,
+        ano: Optional[str] = None,
+        situacao: Optional[str] = None,
+    ) -> Dict:
+        """
+        Resumos (formato InvoiceService.calculate_student_summary) em
+        uma única agregação SQL agrupada por aluno.
+        """
+        result = {
+            sid: InvoiceService.calculate_student_summary([])
+            for sid in student_ids
+        }
+        queryset = cls._filtered(school_id, student_ids, ano, situacao)
+
+        rows = queryset.order_by().values('student_siga_id').annotate(
+            total=Count('id'),
+            pagos=Count('id', filter=Q(situacao='LIQ')),
+            abertos=Count('id', filter=Q(situacao='ABE')),
+            cancelados=Count('id', filter=Q(situacao='CAN')),
+            valor_total=Sum('valor'),
+            valor_pago=Sum('valor_pago', filter=Q(situacao='LIQ')),
+            valor_pendente=Sum('valor', filter=Q(situacao='ABE')),
+        )
+
+        for row in rows:
+            result[_siga_key(row['student_siga_id'])] = {
+                'total': row['total'],
+                'pagos': row['pagos'],
+                'abertos': row['abertos'],
+                'cancelados': row['cancelados'],
+                'valor_total': _money(row['valor_total']),
+                'valor_pago': _money(row['valor_pago']),
+                'valor_pendente': _money(row['valor_pendente']),
+            }
+
+        return result
+
+    # -----------------------------------------------------------------
+    # LEITURA: agregados da escola
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def open_balances(cls, school_id: int) -> Dict:
+        """Valor em aberto (ABE) por aluno: {student_id: valor}."""
+        rows = SigaInvoice.objects.filter(
+            school_id=school_id, situacao='ABE'
+        ).order_by().values('student_siga_id').annotate(valor=Sum('valor'))
+
+        return {_siga_key(row['student_siga_id']): _money(row['valor']) for row in rows}
+
+    @classmethod
+    def financial_rollups(cls, school_id: int) -> Dict:
+        """
+        Boletos em aberto (ABE) por aluno, em uma única agregação SQL:
+        {student_id: {total_abertos, valor_pendente, proximo_vencimento}}.
+
+        Alunos sem boletos em aberto não aparecem.
+        """
+        rows = SigaInvoice.objects.filter(
+            school_id=school_id, situacao='ABE'
+        ).order_by().values('student_siga_id').annotate(
+            total=Count('id'),
+            valor=Sum('valor'),
+            proximo=Min('vencimento'),
+        )
+
+        return {
+            _siga_key(row['student_siga_id']): {
+                'total_abertos': row['total'],
+                'valor_pendente': _money(row['valor']),
+                'proximo_vencimento': row['proximo'].isoformat() if row['proximo'] else None,
+            }
+            for row in rows
+        }
+
+    @classmethod
+    def total_received(cls, school_id: int) -> float:
+        """Soma recebida dos boletos liquidados da escola."""
+        total = SigaInvoice.objects.filter(
+            school_id=school_id, situacao='LIQ'
+        ).aggregate(total=Sum('valor_pago'))['total']
+        return _money(total)
+
+    @classmethod
+    def school_totals(cls, school_id: int) -> Dict:
+        """Contadores e valores de boletos da escola (dashboard)."""
+        liquidado = Q(situacao='LIQ')
+
+        totals = SigaInvoice.objects.filter(school_id=school_id).aggregate(
+            total=Count('id'),
+            abertos=Count('id', filter=ABERTO_DASHBOARD),
+            pagos=Count('id', filter=liquidado),
+            cancelados=Count('id', filter=Q(situacao='CAN')),
+            vencidos=Count(
+                'id', filter=ABERTO_DASHBOARD & Q(vencimento__lt=timezone.localdate())
+            ),
+            valor_total=Sum('valor'),
+            valor_recebido=Sum('valor_pago', filter=liquidado),
+            valor_pendente=Sum('valor', filter=ABERTO_DASHBOARD),
+        )
+
+        for field in ('valor_total', 'valor_recebido', 'valor_pendente'):
+            totals[field] = _money(totals[field])
+
+        return totals
+
+    @classmethod
+    def students_with_invoices(cls, school_id: int) -> Dict:
+        """
+        Alunos com boletos no armazém: {student_id: tem_cpf_do_pagador}.
+        """
+        rows = SigaInvoice.objects.filter(school_id=school_id).order_by().values(
+            'student_siga_id'
+        ).annotate(
+            com_cpf=Count('id', filter=~Q(pagador_cpf=''))
+        )
+
+        return {_siga_key(row['student_siga_id']): row['com_cpf'] > 0 for row in rows}
+
+    # -----------------------------------------------------------------
+    # HELPERS
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def _filtered(cls, school_id, student_ids, ano, situacao):
+        queryset = SigaInvoice.objects.filter(
+            school_id=school_id,
+            student_siga_id__in=[str(sid) for sid in student_ids],
+        )
+
+        if ano:
+            # Mesmo critério do filtro em memória (vencimento começa com o ano)
+            if not ano.isdigit():
+                return queryset.none()
+            queryset = queryset.filter(vencimento__year=int(ano))
+
+        if situacao and situacao != 'todos':
+            queryset = queryset.filter(situacao=situacao)
+
+        return queryset
+
+    @classmethod
+    def _build_invoice(cls, school_id: int, student_id: str, raw: Dict, now) -> SigaInvoice:
+        formatted = InvoiceService._format_invoice(raw)
+
+        pagador = raw.get('pagador') or ''
+        cpf_match = CPF_PATTERN.search(pagador) if 'cpf' in pagador.lower() else None
+
+        return SigaInvoice(
+            school_id=school_id,
+            titulo=str(formatted['numero'])[:50],
+            student_siga_id=student_id,
+            parcela=formatted['parcela'][:50],
+            vencimento=_parse_date(formatted['vencimento']),
+            valor=_decimal(formatted['valor']),
+            valor_pago=_decimal(formatted['valor_pago']),
+            valor_multa=_decimal(formatted['valor_multa']),
+            valor_juros=_decimal(formatted['valor_juros']),
+            situacao=formatted['situacao'][:10],
+            banco=(formatted['banco'] or '')[:100] or None,
+            linha_digitavel=(formatted['linha_digitavel'] or '')[:100] or None,
+            link_pagamento=(formatted['link_pagamento'] or '')[:500] or None,
+            servico=(formatted['servico'] or '')[:200] or None,
+            pagador_cpf=cpf_match.group() if cpf_match else '',
+            synced_at=now,
+            updated_at=now,
+        )
+
+    @classmethod
+    def _to_api(cls, row: SigaInvoice) -> Dict:
+        """Linha do armazém → contrato BoletoSerializer (igual a _format_invoice)."""
+        return {
+            'numero': _siga_key(row.titulo),
+            'parcela': row.parcela,
+            'vencimento': row.vencimento.isoformat() if row.vencimento else None,
+            'valor': float(row.valor),
+            'valor_pago': float(row.valor_pago),
+            'valor_multa': float(row.valor_multa),
+            'valor_juros': float(row.valor_juros),
+            'situacao': row.situacao,
+            'situacao_display': SITUACAO_DISPLAY.get(row.situacao, row.situacao),
+            'banco': row.banco,
+            'linha_digitavel': row.linha_digitavel,
+            'link_pagamento': row.link_pagamento,
+            'servico': row.servico,
+        }
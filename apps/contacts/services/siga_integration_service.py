@@ -1,10 +1,19 @@
 # apps/contacts/services/siga_integration_service.py
 
+import contextvars
 import requests
 import logging
-from typing import List, Dict, Optional
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Iterable, List, Dict, Optional
+
+from ..integrations.siga_circuit_breaker import get_breaker
+from ..integrations.siga_client import SIGA_BASE_URL, get_siga_client
+from ..integrations.siga_stream import (
+    GUARDIAN_FIELDS,
+    STUDENT_ACADEMIC_FIELDS,
+    STUDENT_RELATION_FIELDS,
+    iter_siga_records,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,9 +30,12 @@ class SigaIntegrationService:
     """
     Serviço de integração com APIs do SIGA.
     Responsável por buscar dados brutos das 3 APIs necessárias.
+
+    Os datasets são lidos em streaming e projetados nos campos usados
+    pelo GuardianAggregatorService (ver integrations/siga_stream.py).
     """
 
-    BASE_URL = "https://siga.activesoft.com.br/api/v0"
+    BASE_URL = SIGA_BASE_URL
     TIMEOUT = 30  # segundos
 
     def __init__(self, token: str):
@@ -32,36 +44,38 @@ class SigaIntegrationService:
             token: Application token da escola
         """
         self.token = token
-        self.session = self._create_session()
+        # Cliente compartilhado pelo processo (pool keep-alive + retry)
+        self.client = get_siga_client()
+        self.session = self.client.session
 
-    def _create_session(self) -> requests.Session:
+    def _get_headers(self) -> Dict[str, str]:
         """
-        Cria session com retry automático para resiliência.
+        Retorna headers padrão para requisições.
         """
-        session = requests.Session()
+        return self.client.get_headers(self.token)
 
-        # Retry: 3 tentativas, backoff exponencial
-        retry_strategy = Retry(
-            total=3,
-            backoff_factor=1,  # 1s, 2s, 4s
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["GET"]
-        )
+    def _get_records(self, path: str, fields: Optional[Iterable[str]]) -> List[Dict]:
+        """
+        Lê um dataset SIGA em streaming (registro a registro, projetado
+        em `fields`, seguindo links 'next'), protegido pelo circuit
+        breaker do endpoint.
 
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
+        Com o circuito aberto, falha na hora (CircuitOpenError) em vez de
+        esperar timeouts — o SigaCacheManager serve a cópia stale.
+        """
+        url = f"{self.BASE_URL}/{path}"
 
-        return session
+        def request():
+            try:
+                return list(iter_siga_records(
+                    self.client, url, self.token, fields=fields, timeout=self.TIMEOUT
+                ))
+            except ValueError as e:
+                raise requests.exceptions.InvalidJSONError(
+                    f"Invalid JSON from SIGA {path}: {e}"
+                ) from e
 
-    def _get_headers(self) -> Dict[str, str]:
-        """
-        Retorna headers padrão para requisições.
-        """
-        return {
-            "Authorization": f"Bearer {self.token}",
-            "Content-Type": "application/json"
-        }
+        return get_breaker(path).call(request)
 
     def fetch_all_guardians(self) -> List[Dict]:
         """
@@ -73,23 +87,16 @@ class SigaIntegrationService:
         Raises:
             requests.exceptions.RequestException: Em caso de erro na API
         """
-        url = f"{self.BASE_URL}/lista_responsaveis_dados_sensiveis/"
+        path = "lista_responsaveis_dados_sensiveis/"
 
         try:
-            logger.info(f"Fetching guardians from {url}")
-            response = self.session.get(
-                url,
-                headers=self._get_headers(),
-                timeout=self.TIMEOUT
-            )
-            response.raise_for_status()
-
-            data = response.json()
+            logger.info(f"Fetching guardians from {path}")
+            data = self._get_records(path, GUARDIAN_FIELDS)
             logger.info(f"Fetched {len(data)} guardians")
             return data
 
         except requests.exceptions.Timeout:
-            logger.error(f"Timeout fetching guardians from {url}")
+            logger.error(f"Timeout fetching guardians from {path}")
             raise
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching guardians: {str(e)}")
@@ -105,23 +112,16 @@ class SigaIntegrationService:
         Raises:
             requests.exceptions.RequestException: Em caso de erro na API
         """
-        url = f"{self.BASE_URL}/lista_alunos_dados_sensiveis/"
+        path = "lista_alunos_dados_sensiveis/"
 
         try:
-            logger.info(f"Fetching students relations from {url}")
-            response = self.session.get(
-                url,
-                headers=self._get_headers(),
-                timeout=self.TIMEOUT
-            )
-            response.raise_for_status()
-
-            data = response.json()
+            logger.info(f"Fetching students relations from {path}")
+            data = self._get_records(path, STUDENT_RELATION_FIELDS)
             logger.info(f"Fetched {len(data)} students (relations)")
             return data
 
         except requests.exceptions.Timeout:
-            logger.error(f"Timeout fetching students relations from {url}")
+            logger.error(f"Timeout fetching students relations from {path}")
             raise
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching students relations: {str(e)}")
@@ -137,23 +137,16 @@ class SigaIntegrationService:
         Raises:
             requests.exceptions.RequestException: Em caso de erro na API
         """
-        url = f"{self.BASE_URL}/acesso/alunos/"
+        path = "acesso/alunos/"
 
         try:
-            logger.info(f"Fetching students academic data from {url}")
-            response = self.session.get(
-                url,
-                headers=self._get_headers(),
-                timeout=self.TIMEOUT
-            )
-            response.raise_for_status()
-
-            data = response.json()
+            logger.info(f"Fetching students academic data from {path}")
+            data = self._get_records(path, STUDENT_ACADEMIC_FIELDS)
             logger.info(f"Fetched {len(data)} students (academic)")
             return data
 
         except requests.exceptions.Timeout:
-            logger.error(f"Timeout fetching students academic from {url}")
+            logger.error(f"Timeout fetching students academic from {path}")
             raise
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching students academic: {str(e)}")
@@ -161,7 +154,9 @@ class SigaIntegrationService:
 
     def fetch_all_data(self) -> Dict[str, List[Dict]]:
         """
-        Busca todos os dados necessários das 3 APIs.
+        Busca todos os dados necessários das 3 APIs, em paralelo.
+
+        O tempo total é o da API mais lenta, não a soma das três.
 
         Returns:
             Dict com chaves: guardians, students_relations, students_academic
@@ -169,16 +164,50 @@ class SigaIntegrationService:
         Raises:
             requests.exceptions.RequestException: Em caso de erro em qualquer API
         """
-        try:
-            guardians = self.fetch_all_guardians()
-            students_relations = self.fetch_students_relations()
-            students_academic = self.fetch_students_academic()
-
-            return {
-                'guardians': guardians,
-                'students_relations': students_relations,
-                'students_academic': students_academic
+        return self.run_concurrently({
+            'guardians': self.fetch_all_guardians,
+            'students_relations': self.fetch_students_relations,
+            'students_academic': self.fetch_students_academic,
+        })
+
+    @staticmethod
+    def run_concurrently(fetchers: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+        """
+        Executa buscas independentes em paralelo (uma thread por dataset).
+
+        Erros são tratados por dataset: todas as buscas rodam até o fim
+        (as que funcionaram podem ser cacheadas pelo chamador) e, se
+        alguma falhou, a primeira exceção é relançada com o tipo original.
+
+        Cada busca roda numa cópia do contexto do chamador (marcadores
+        de dados stale da requisição continuam visíveis).
+
+        Args:
+            fetchers: {nome_dataset: callable sem argumentos}
+
+        Returns:
+            {nome_dataset: resultado}
+        """
+        results = {}
+        errors = {}
+
+        with ThreadPoolExecutor(max_workers=len(fetchers) or 1) as executor:
+            futures = {
+                executor.submit(contextvars.copy_context().run, fetcher): name
+                for name, fetcher in fetchers.items()
             }
 
-        except requests.exceptions.RequestException:
-            raise
\ No newline at end of file
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching SIGA dataset '{name}': {e}")
+                    errors[name] = e
+
+        if errors:
+            failed = [name for name in fetchers if name in errors]
+            logger.error(f"SIGA datasets failed: {', '.join(failed)}")
+            raise errors[failed[0]]
+
+        return {name: results[name] for name in fetchers}
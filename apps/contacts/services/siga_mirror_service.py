@@ -0,0 +1,293 @@
+# apps/contacts/services/siga_mirror_service.py
+
+"""
+Espelho local (Postgres) dos responsáveis e alunos do SIGA.
+
+Responsabilidades:
+- Sincronizar, em background, a lista processada de guardians de uma
+  escola para as tabelas Guardian / Student / StudentGuardian
+  (bulk upsert em lotes, remoção do que saiu do SIGA)
+- Informar se a escola já tem espelho (modo de leitura do ViewSet)
+
+NÃO faz:
+- Filtros/ordenação (GuardianMirrorSelector faz isso)
+- Agregação das APIs (GuardianService / GuardianAggregatorService)
+"""
+
+import logging
+from datetime import date
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from ..integrations.siga_cache_manager import SigaCacheManager
+from ..models import Guardian, Student, StudentGuardian
+from ..selectors.guardian_search_index import fold
+
+logger = logging.getLogger(__name__)
+
+# Prioridade de contato por parentesco (StudentGuardian.prioridade)
+PRIORIDADE_PARENTESCO = {
+    'mae': 1,
+    'pai': 2,
+    'responsavel_principal': 3,
+    'responsavel_secundario': 4,
+}
+
+
+def _digits(value: Optional[str]) -> str:
+    return ''.join(c for c in str(value or '') if c.isdigit())
+
+
+def _parse_date(value) -> Optional[date]:
+    try:
+        return parse_date(str(value)) if value else None
+    except ValueError:
+        return None
+
+
+class SigaMirrorService:
+    """Sincronização SIGA → tabelas locais."""
+
+    BATCH_SIZE = 1000
+
+    GUARDIAN_UPDATE_FIELDS = [
+        'nome_completo', 'cpf', 'email', 'telefone_principal', 'rg',
+        'data_nascimento', 'cep', 'logradouro', 'complemento', 'bairro',
+        'cidade', 'estado', 'siga_payload', 'busca', 'docs_completos',
+        'siga_synced_at', 'ativo', 'updated_at',
+    ]
+    STUDENT_UPDATE_FIELDS = [
+        'nome_completo', 'matricula', 'siga_payload', 'ativo', 'updated_at',
+    ]
+
+    # -----------------------------------------------------------------
+    # MODO DE LEITURA
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def read_enabled(cls) -> bool:
+        """GuardianViewSet deve ler do espelho (quando sincronizado)?"""
+        return getattr(settings, 'GUARDIANS_READ_MODE', 'cache') == 'database'
+
+    @classmethod
+    def is_synced(cls, school_id: int) -> bool:
+        """A escola já tem espelho sincronizado?"""
+        return Guardian.objects.filter(
+            school_id=school_id, siga_synced_at__isnull=False
+        ).exists()
+
+    @classmethod
+    def should_read(cls, school_id: int) -> bool:
+        return cls.read_enabled() and cls.is_synced(school_id)
+
+    # -----------------------------------------------------------------
+    # SINCRONIZAÇÃO
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def sync_school(cls, school_id: int, token: str) -> Optional[Dict]:
+        """
+        Recarrega as 3 APIs SIGA e espelha a lista processada da escola.
+
+        Returns:
+            Contadores da sincronização, ou None se o SIGA estava
+            indisponível (dados stale não sobrescrevem o espelho)
+        """
+        from .guardian_service import GuardianService
+
+        SigaCacheManager.start_staleness_tracking()
+        guardians = GuardianService.refresh_guardians_list(school_id, token)
+
+        stale = SigaCacheManager.get_stale_datasets()
+        if stale:
+            logger.warning(
+                f"Mirror sync skipped for school {school_id}: stale {', '.join(stale)}"
+            )
+            return None
+
+        return cls.upsert_guardians(school_id, guardians)
+
+    @classmethod
+    @transaction.atomic
+    def upsert_guardians(cls, school_id: int, guardians: List[Dict]) -> Dict:
+        """
+        Bulk upsert da lista processada (formato GuardianListSerializer).
+
+        Guardians/alunos que não vieram na lista são removidos do espelho;
+        vínculos StudentGuardian da escola são recriados.
+        """
+        now = timezone.now()
+
+        # 1. Alunos (deduplicados — um aluno aparece em vários responsáveis)
+        students_by_id = {}
+        for guardian in guardians:
+            for filho in guardian.get('filhos', []):
+                if filho.get('id'):
+                    students_by_id[str(filho['id'])] = filho
+
+        Student.objects.bulk_create(
+            [cls._build_student(school_id, sid, filho, now) for sid, filho in students_by_id.items()],
+            batch_size=cls.BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['school', 'siga_id'],
+            update_fields=cls.STUDENT_UPDATE_FIELDS,
+        )
+
+        # 2. Responsáveis
+        guardians_by_id = {str(g['id']): g for g in guardians if g.get('id')}
+
+        Guardian.objects.bulk_create(
+            [cls._build_guardian(school_id, gid, g, now) for gid, g in guardians_by_id.items()],
+            batch_size=cls.BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['school', 'siga_id'],
+            update_fields=cls.GUARDIAN_UPDATE_FIELDS,
+        )
+
+        # 3. Remover o que saiu do SIGA
+        _, removed = Guardian.objects.filter(school_id=school_id).exclude(
+            siga_id__in=list(guardians_by_id)
+        ).delete()
+        removed_guardians = removed.get(Guardian._meta.label, 0)
+        _, removed = Student.objects.filter(school_id=school_id).exclude(
+            siga_id__in=list(students_by_id)
+        ).delete()
+        removed_students = removed.get(Student._meta.label, 0)
+
+        # 4. Vínculos (recriados)
+        guardian_pks = dict(
+            Guardian.objects.filter(school_id=school_id).values_list('siga_id', 'id')
+        )
+        student_pks = dict(
+            Student.objects.filter(school_id=school_id).values_list('siga_id', 'id')
+        )
+
+        StudentGuardian.objects.filter(guardian__school_id=school_id).delete()
+
+        links = []
+        for gid, guardian in guardians_by_id.items():
+            for filho in guardian.get('filhos', []):
+                student_pk = student_pks.get(str(filho.get('id')))
+                if student_pk is None:
+                    continue
+                # Vínculo com este filho (mãe de um, responsável de outro);
+                # listas antigas sem o campo usam o do responsável
+                parentesco = filho.get('parentesco') or guardian.get('parentesco') or ''
+                links.append(StudentGuardian(
+                    student_id=student_pk,
+                    guardian_id=guardian_pks[gid],
+                    parentesco=parentesco,
+                    prioridade=PRIORIDADE_PARENTESCO.get(parentesco, 5),
+                ))
+
+        StudentGuardian.objects.bulk_create(
+            links, batch_size=cls.BATCH_SIZE, ignore_conflicts=True
+        )
+
+        result = {
+            'guardians': len(guardians_by_id),
+            'students': len(students_by_id),
+            'links': len(links),
+            'removed_guardians': removed_guardians,
+            'removed_students': removed_students,
+        }
+        # Leituras do espelho mudam: novas ETags só com os dados gravados
+        transaction.on_commit(lambda: SigaCacheManager.bump_data_version(school_id))
+
+        logger.info(f"Mirror synced for school {school_id}: {result}")
+        return result
+
+    @classmethod
+    def update_payloads(cls, school_id: int, guardians: List[Dict]) -> int:
+        """
+        Regrava só o siga_payload dos responsáveis já espelhados (ex:
+        resumos financeiros do crawl de boletos), sem recriar vínculos.
+
+        Returns:
+            Número de responsáveis atualizados
+        """
+        guardians_by_id = {str(g['id']): g for g in guardians if g.get('id')}
+
+        rows = []
+        for row in Guardian.objects.filter(school_id=school_id).only('id', 'siga_id'):
+            data = guardians_by_id.get(row.siga_id)
+            if data is not None:
+                row.siga_payload = data
+                rows.append(row)
+
+        Guardian.objects.bulk_update(rows, ['siga_payload'], batch_size=cls.BATCH_SIZE)
+        return len(rows)
+
+    @classmethod
+    def schedule_sync(cls, school_id: int, token: str) -> None:
+        """Enfileira sync_siga_mirror_task (ex: após POST /refresh/)."""
+        from ..tasks import sync_siga_mirror_task
+
+        try:
+            sync_siga_mirror_task.apply_async(args=(school_id, token), retry=False)
+        except Exception as e:
+            logger.warning(f"Could not enqueue mirror sync for school {school_id}: {e}")
+
+    # -----------------------------------------------------------------
+    # MAPEAMENTO dict → model
+    # -----------------------------------------------------------------
+
+    @classmethod
+    def _build_guardian(cls, school_id: int, siga_id: str, data: Dict, now) -> Guardian:
+        endereco = data.get('endereco') or {}
+        cpf = _digits(data.get('cpf'))
+        telefone = _digits(data.get('telefone'))
+        cep = _digits(endereco.get('cep'))
+        uf = (endereco.get('uf') or '').strip().upper()
+
+        return Guardian(
+            school_id=school_id,
+            siga_id=siga_id,
+            nome_completo=(data.get('nome') or '')[:200],
+            # Colunas indexadas só recebem valores no formato do model;
+            # o dado original completo fica em siga_payload
+            cpf=cpf if len(cpf) == 11 else None,
+            email=(data.get('email') or '').strip().lower()[:254] or None,
+            telefone_principal=telefone if len(telefone) in (10, 11) else None,
+            rg=(data.get('rg') or '')[:20] or None,
+            data_nascimento=_parse_date(data.get('data_nascimento')),
+            cep=cep if len(cep) == 8 else None,
+            logradouro=(endereco.get('logradouro') or '')[:200] or None,
+            complemento=(endereco.get('complemento') or '')[:100] or None,
+            bairro=(endereco.get('bairro') or '')[:100] or None,
+            cidade=(endereco.get('cidade') or '')[:100] or None,
+            estado=uf if len(uf) == 2 else None,
+            siga_payload=data,
+            busca=cls._build_busca(data),
+            docs_completos=bool((data.get('resumo_documentos') or {}).get('completo')),
+            siga_synced_at=now,
+            ativo=True,
+            updated_at=now,
+        )
+
+    @staticmethod
+    def _build_busca(data: Dict) -> str:
+        """Campos de busca normalizados, um por linha (ver GuardianMirrorSelector)."""
+        return '\n'.join(
+            fold(value or '') for value in (
+                data.get('nome'),
+                data.get('email'),
+                *(filho.get('nome') for filho in data.get('filhos', [])),
+            )
+        )
+
+    @classmethod
+    def _build_student(cls, school_id: int, siga_id: str, data: Dict, now) -> Student:
+        return Student(
+            school_id=school_id,
+            siga_id=siga_id,
+            nome_completo=(data.get('nome') or '')[:200],
+            matricula=(str(data.get('matricula') or ''))[:50] or None,
+            siga_payload=data,
+            ativo=True,
+            updated_at=now,
+        )
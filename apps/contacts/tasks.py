@@ -1,39 +1,105 @@
 # apps/contacts/tasks.py
 from celery import shared_task
-from django.core.cache import cache
-from django.utils import timezone
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import requests
+import logging
 
+from .integrations.siga_cache_manager import SigaCacheManager
+from .integrations.siga_rate_limiter import PRIORITY_BACKGROUND, siga_priority
 
-@shared_task(bind=True, max_retries=3)
-def fetch_all_invoices_task(self, school_id, token):
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def refresh_siga_cache_task(cache_key, kind, token, school_id=None, student_id=None):
     """
-    Task Celery para buscar boletos em background
+    Revalidação em background (stale-while-revalidate) de uma chave SIGA.
+
+    Enfileirada por SigaCacheManager.schedule_refresh quando a entrada
+    passa do TTL soft; o usuário já recebeu o valor antigo.
+
+    kind:
+        guardians | students_relations | students_academic → dataset SIGA
+        guardians_list → 3 datasets + lista processada
+        student_invoices → boletos de um aluno
     """
-    cache_key = f"all_invoices_school_{school_id}"
-    processing_key = f"invoice_processing_{school_id}"
+    from .services.guardian_service import GuardianService
+    from .services.invoice_service import InvoiceService
+
+    SigaCacheManager.start_staleness_tracking()
 
     try:
-        # Marcar como processando
-        cache.set(processing_key, True, timeout=600)
+        with siga_priority(PRIORITY_BACKGROUND):
+            if kind in SigaCacheManager.DATASETS:
+                SigaCacheManager.refresh_dataset(kind, school_id, token)
+            elif kind == 'guardians_list':
+                GuardianService.refresh_guardians_list(school_id, token)
+            elif kind == 'student_invoices':
+                InvoiceService.get_student_invoices(
+                    student_id, token, force_refresh=True, school_id=school_id
+                )
+            else:
+                logger.error(f"Unknown SIGA refresh kind: {kind}")
+                return
+
+        logger.info(f"Revalidated {cache_key} ({kind})")
+
+    except Exception as e:
+        logger.error(f"Revalidation failed for {cache_key}: {e}")
 
-        # Buscar dados
-        invoices_data = _fetch_invoices_parallel(token)
+    finally:
+        SigaCacheManager.finish_refresh(cache_key)
 
-        # Salvar no cache (1 hora)
-        cache.set(cache_key, invoices_data, timeout=3600)
 
-        return {"status": "success", "total_invoices": invoices_data['summary']['total_invoices']}
+@shared_task(ignore_result=True)
+def sync_siga_mirror_task(school_id, token):
+    """
+    Sincroniza o espelho local (Guardian/Student/StudentGuardian) de uma
+    escola com o SIGA. Enfileirada pelo POST /guardians/refresh/; a
+    sincronização periódica é sync_all_schools_siga_mirror.
+    """
+    from .services.siga_mirror_service import SigaMirrorService
 
+    try:
+        with siga_priority(PRIORITY_BACKGROUND):
+            SigaMirrorService.sync_school(school_id, token)
     except Exception as e:
-        return {"status": "error", "error": str(e)}
+        logger.error(f"Mirror sync failed for school {school_id}: {e}")
 
-    finally:
-        cache.delete(processing_key)
 
+@shared_task(ignore_result=True)
+def apply_invoice_rollups_task(school_id):
+    """
+    Grava os resumos financeiros do armazém na lista processada da
+    escola (GuardianService.apply_invoice_rollups). Enfileirada pelo
+    dashboard depois de alimentar o armazém: a requisição não espera o
+    lock da lista nem regrava shards, cards e espelho.
+    """
+    from .services.guardian_service import GuardianService
+
+    try:
+        GuardianService.apply_invoice_rollups(school_id)
+    except Exception as e:
+        logger.error(f"Invoice rollups failed for school {school_id}: {e}")
+
+
+@shared_task(ignore_result=True)
+def sync_all_schools_invoice_stats():
+    """
+    Crawl horário de boletos de todas as escolas (beat, ver celery.py):
+    armazém local, blob all_invoices e resumos financeiros da lista de
+    guardians (GuardianService.apply_invoice_rollups).
+    """
+    from django.core.management import call_command
+
+    call_command('sync_invoice_stats')
+
+
+@shared_task(ignore_result=True)
+def sync_all_schools_siga_mirror():
+    """
+    Sincronização horária do espelho SIGA de todas as escolas (beat, ver
+    celery.py): com GUARDIANS_READ_MODE=database a listagem lê do
+    espelho, que sem isso só mudaria no POST /guardians/refresh/.
+    """
+    from django.core.management import call_command
 
-def _fetch_invoices_parallel(token):
-    """Implementação igual ao método da view"""
-    # ... (copiar código de _fetch_all_invoices_parallel)
-    pass
\ No newline at end of file
+    call_command('sync_siga_mirror')
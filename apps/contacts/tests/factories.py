@@ -0,0 +1,36 @@
+# apps/contacts/tests/factories.py
+
+"""Fixtures compartilhadas dos testes de contacts."""
+
+from django.test import override_settings
+
+import factory
+from factory.django import DjangoModelFactory
+
+from apps.schools.models import School
+
+# Cache do processo no lugar do Redis (cada teste limpa com cache.clear())
+LOCMEM_CACHE = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+}
+
+
+def locmem_cache(target):
+    """Decorator de classe/método de teste: CACHES=LOCMEM_CACHE."""
+    return override_settings(CACHES=LOCMEM_CACHE)(target)
+
+
+class SchoolFactory(DjangoModelFactory):
+    """Escola do espelho SIGA."""
+
+    class Meta:
+        model = School
+
+    school_name = factory.Sequence(lambda n: f'Escola {n}')
+    tax_id = factory.Sequence(lambda n: f'{n:014d}')
+    phone = '11999999999'
+    email = factory.Sequence(lambda n: f'escola{n}@test.com')
+    postal_code = '01000-000'
+    street_address = 'Rua A'
+    city = 'São Paulo'
+    state = 'SP'
@@ -0,0 +1,73 @@
+# apps/contacts/tests/test_cache_codec.py
+
+import pickle
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.contacts.integrations.cache_codec import (
+    MAGIC,
+    decode_cache_value,
+    encode_cache_value,
+    get_codec,
+)
+from apps.contacts.integrations.siga_cache_manager import SigaCacheManager
+from apps.contacts.tests.factories import LOCMEM_CACHE
+
+GUARDIANS = [
+    {
+        'id': gid,
+        'nome': f'Responsável {gid}',
+        'endereco': {'cidade': 'São Paulo', 'uf': 'SP'},
+        'filhos': [{'id': gid * 10, 'nome': 'Aluno', 'url_foto': None, 'ativo': True}],
+        'resumo_financeiro': {'valor_pendente': 12.5, 'tem_pendencia': False},
+        'tags': [],
+    }
+    for gid in range(1, 200)
+]
+
+
+class CacheCodecTestCase(SimpleTestCase):
+    """Codecs de cache: round-trip, fallback e compatibilidade."""
+
+    def test_round_trip_all_codecs(self):
+        value = {'__swr__': True, 'value': GUARDIANS, 'fresh_until': 1700000000.5}
+        for name in ('pickle', 'pickle-zlib', 'compact'):
+            with self.subTest(codec=name), override_settings(SIGA_CACHE_CODEC=name):
+                self.assertEqual(decode_cache_value(encode_cache_value(value)), value)
+
+    @override_settings(SIGA_CACHE_CODEC='compact')
+    def test_compact_falls_back_to_pickle_for_non_json_values(self):
+        for value in ({1: 'a'}, {'valor': Decimal('1.10')}, [('a', 1)], ['\x00r', 0]):
+            with self.subTest(value=value):
+                encoded = encode_cache_value(value)
+                self.assertTrue(encoded.startswith(MAGIC + b'z'))
+                self.assertEqual(decode_cache_value(encoded), value)
+
+    @override_settings(SIGA_CACHE_CODEC='pickle-zlib')
+    def test_scalars_and_legacy_values_pass_through(self):
+        self.assertEqual(encode_cache_value(3), 3)
+        self.assertEqual(encode_cache_value('token'), 'token')
+        self.assertEqual(decode_cache_value([{'id': 1}]), [{'id': 1}])
+        self.assertIsNone(decode_cache_value(None))
+
+        # Trocar o codec não invalida o que já está gravado
+        with override_settings(SIGA_CACHE_CODEC='compact'):
+            encoded = encode_cache_value(GUARDIANS)
+        self.assertEqual(decode_cache_value(encoded), GUARDIANS)
+
+    def test_compressed_codecs_shrink_blob(self):
+        raw = len(pickle.dumps(GUARDIANS, protocol=pickle.HIGHEST_PROTOCOL))
+        for name in ('pickle-zlib', 'compact'):
+            with self.subTest(codec=name):
+                self.assertLess(len(get_codec(name).encode(GUARDIANS)), raw / 3)
+
+    @override_settings(CACHES=LOCMEM_CACHE, SIGA_CACHE_CODEC='pickle-zlib')
+    def test_cache_manager_stores_encoded_blob(self):
+        cache.clear()
+
+        SigaCacheManager._safe_cache_set('siga:test:blob', GUARDIANS, 60)
+
+        self.assertTrue(cache.get('siga:test:blob').startswith(MAGIC))
+        self.assertEqual(SigaCacheManager._safe_cache_get('siga:test:blob'), GUARDIANS)
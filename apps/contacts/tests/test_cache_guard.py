@@ -0,0 +1,99 @@
+# apps/contacts/tests/test_cache_guard.py
+
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from apps.contacts.integrations.cache_guard import CacheUnavailable, GuardedCache
+from apps.contacts.integrations.local_cache import local_caches_stats, redis_fallback
+from apps.contacts.integrations.siga_cache_manager import SigaCacheManager
+
+
+class GuardedCacheTestCase(SimpleTestCase):
+    """Redis fora do ar: depois de N falhas, chamadas pulam o Redis."""
+
+    def setUp(self):
+        self.backend = MagicMock()
+        self.backend.get.side_effect = ConnectionError('redis down')
+        self.guard = GuardedCache(self.backend, failure_threshold=3, cooldown=30)
+        patcher = patch.object(GuardedCache, '_schedule_probe')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _fail(self, n):
+        for _ in range(n):
+            with self.assertRaises(ConnectionError):
+                self.guard.get('k')
+
+    def test_opens_after_threshold_and_skips_backend(self):
+        self._fail(3)
+        self.assertFalse(self.guard.available)
+
+        with self.assertRaises(CacheUnavailable):
+            self.guard.set('k', 1)
+
+        self.backend.set.assert_not_called()
+        self.assertEqual(self.guard.stats()['skipped_calls'], 1)
+
+    def test_success_resets_failures_and_value_error_is_not_outage(self):
+        self._fail(2)
+        self.backend.incr.side_effect = ValueError('missing key')
+
+        with self.assertRaises(ValueError):
+            self.guard.incr('k')
+        self._fail(2)
+
+        self.assertTrue(self.guard.available)
+
+    def test_background_probe_closes_circuit(self):
+        self._fail(3)
+
+        self.guard._probe()
+        self.assertFalse(self.guard.available)  # Redis ainda fora
+
+        self.backend.get.side_effect = None
+        self.guard._probe()
+        self.assertTrue(self.guard.available)
+
+    def test_set_many_timeouts_uses_one_pipeline(self):
+        client = self.backend.client
+        pipeline = client.get_client.return_value.pipeline.return_value
+
+        self.guard.set_many_timeouts({'a': (1, 60), 'b': (2, 600)})
+
+        client.get_client.return_value.pipeline.assert_called_once_with()
+        client.set.assert_any_call('a', 1, 60, client=pipeline)
+        client.set.assert_any_call('b', 2, 600, client=pipeline)
+        pipeline.execute.assert_called_once_with()
+
+        # Backend sem cliente Redis: um set_many por TTL
+        backend = MagicMock(spec=['set_many'])
+        GuardedCache(backend).set_many_timeouts({'a': (1, 60), 'b': (2, 60), 'c': (3, 5)})
+        backend.set_many.assert_any_call({'a': 1, 'b': 2}, timeout=60)
+        backend.set_many.assert_any_call({'c': 3}, timeout=5)
+
+    def test_cache_manager_degrades_without_waiting(self):
+        self._fail(3)
+
+        with patch(
+            'apps.contacts.integrations.siga_cache_manager.guarded_cache', self.guard
+        ):
+            self.assertIsNone(SigaCacheManager._safe_cache_get('k'))
+            SigaCacheManager._safe_cache_set('k', [1], 60)
+
+        self.assertEqual(self.backend.get.call_count, 3)
+        self.backend.set.assert_not_called()
+
+    def test_cache_manager_falls_back_to_bounded_local_cache(self):
+        self._fail(3)
+        redis_fallback.clear()
+
+        with patch(
+            'apps.contacts.integrations.siga_cache_manager.guarded_cache', self.guard
+        ):
+            SigaCacheManager._safe_cache_set('k', [{'id': 1}], 60)
+            self.assertEqual(SigaCacheManager._safe_cache_get('k'), [{'id': 1}])
+            SigaCacheManager._safe_cache_delete('k')
+            self.assertIsNone(SigaCacheManager._safe_cache_get('k'))
+
+        self.assertEqual(local_caches_stats()['redis_fallback']['entries'], 0)
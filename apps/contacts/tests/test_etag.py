@@ -0,0 +1,138 @@
+# apps/contacts/tests/test_etag.py
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework.test import APIRequestFactory
+
+from apps.contacts.integrations.cache_guard import CacheUnavailable, guarded_cache
+from apps.contacts.integrations.siga_cache_manager import SigaCacheManager
+from apps.contacts.services.guardian_service import GuardianService
+from apps.contacts.tests.factories import locmem_cache
+from apps.contacts.views.conditional import etag_matches
+from apps.contacts.views.guardian_viewset import GuardianViewSet
+
+SCHOOL = SimpleNamespace(id=1, application_token='token')
+
+STATS = {
+    'total_responsaveis': 1, 'total_alunos': 1,
+    'financeiro': {}, 'documentos': {}, 'distribuicao_parentesco': {},
+}
+
+
+@locmem_cache
+class GuardianETagTestCase(SimpleTestCase):
+    """304 antes de buscar/serializar; ETag muda com as versões da escola."""
+
+    def setUp(self):
+        cache.clear()
+        patches = [
+            patch.object(GuardianViewSet, 'permission_classes', []),
+            patch.object(
+                GuardianViewSet, '_get_school_and_token',
+                return_value=(SCHOOL, 'token', None),
+            ),
+            patch.object(GuardianService, 'get_stats', return_value=STATS),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.get_stats = GuardianService.get_stats
+
+    def stats(self, query='', **headers):
+        request = APIRequestFactory().get(
+            f'/api/v1/contacts/guardians/stats/{query}', **headers
+        )
+        return GuardianViewSet.as_view({'get': 'stats'})(request).render()
+
+    def test_if_none_match_returns_304_without_fetching(self):
+        first = self.stats()
+        etag = first['ETag']
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first['Cache-Control'], 'private, no-cache')
+
+        second = self.stats(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second['ETag'], etag)
+        self.assertEqual(second.content, b'')
+        self.assertEqual(self.get_stats.call_count, 1)
+
+        # Weak / lista / curinga também casam; query diferente não
+        self.assertEqual(self.stats(HTTP_IF_NONE_MATCH=f'"x", W/{etag}').status_code, 304)
+        self.assertEqual(self.stats(HTTP_IF_NONE_MATCH='*').status_code, 304)
+        self.assertEqual(
+            self.stats('?a=1', HTTP_IF_NONE_MATCH=etag).status_code, 200
+        )
+
+    def test_etag_changes_with_school_versions(self):
+        etag = self.stats()['ETag']
+        self.assertEqual(self.stats()['ETag'], etag)
+
+        for bump in (
+            SigaCacheManager.bump_school_version,
+            SigaCacheManager.bump_data_version,
+            SigaCacheManager.invalidate_school_cache,
+            lambda school_id: SigaCacheManager.set_many_student_invoices(
+                {10: []}, school_id
+            ),
+        ):
+            bump(1)
+            response = self.stats(HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+            etag = response['ETag']
+
+    def test_no_etag_when_stale_or_cache_down(self):
+        def stale_stats(**kwargs):
+            SigaCacheManager.mark_stale('guardians')
+            return STATS
+
+        with patch.object(GuardianService, 'get_stats', side_effect=stale_stats):
+            response = self.stats()
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+        with patch.object(guarded_cache, 'get_many', side_effect=CacheUnavailable):
+            response = self.stats(HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_etag_matches(self):
+        self.assertTrue(etag_matches('"abc"', '"abc"'))
+        self.assertTrue(etag_matches('"abc"', 'W/"abc"'))
+        self.assertFalse(etag_matches('"abc"', '"abd", W/"ab"'))
+        self.assertFalse(etag_matches('"abc"', 'lixo'))
+
+    def test_unchanged_invoices_keep_etag(self):
+        SigaCacheManager.set_many_student_invoices({10: [{'numero': 1}]}, 1)
+        etag = self.stats()['ETag']
+
+        SigaCacheManager.set_many_student_invoices({10: [{'numero': 1}]}, 1)
+        SigaCacheManager.get_or_set_student_invoices(10, [{'numero': 1}], school_id=1)
+        self.assertEqual(self.stats(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        SigaCacheManager.get_or_set_student_invoices(10, [{'numero': 2}], school_id=1)
+        self.assertEqual(self.stats(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_etag_recomputed_when_request_changes_data(self):
+        def fetching_stats(**kwargs):
+            SigaCacheManager.set_many_student_invoices({10: [{'numero': 3}]}, 1)
+            return STATS
+
+        with patch.object(GuardianService, 'get_stats', side_effect=fetching_stats):
+            etag = self.stats()['ETag']
+
+        self.assertEqual(self.stats(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_etag_expires_with_max_age_bucket(self):
+        with patch('apps.contacts.views.conditional.time.time', return_value=10_000):
+            etag = self.stats()['ETag']
+            self.assertEqual(self.stats(HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Dados em cache já podem ter vencido no TTL soft: serve e revalida
+        later = 10_000 + GuardianViewSet.ETAG_MAX_AGE
+        with patch('apps.contacts.views.conditional.time.time', return_value=later):
+            self.assertEqual(self.stats(HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.get_stats.call_count, 2)
@@ -0,0 +1,204 @@
+# apps/contacts/tests/test_guardian_aggregator.py
+
+import copy
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from apps.contacts.integrations.siga_cache_manager import SigaCacheManager, _local_cache
+from apps.contacts.serializers.guardian_serializers import render_guardian_cards
+from apps.contacts.services.guardian_aggregator_service import GuardianAggregatorService
+from apps.contacts.services.guardian_service import GuardianService
+from apps.contacts.tests.factories import LOCMEM_CACHE
+
+GUARDIANS = [
+    {'id': 1, 'nome': 'Maria', 'cpf_cnpj': '123', 'email': ' ', 'estado_civil': 1,
+     'data_nascimento': '1985-04-12T00:00:00', 'cep': '01000000'},
+    {'id': 2, 'nome': 'José'},
+    {'id': 3, 'nome': 'Ana'},
+    {'id': 4, 'nome': 'Sem filhos'},
+]
+
+RELATIONS = [
+    {'id': 10, 'nome': 'Pedro', 'matricula': 'M10', 'url_foto': None,
+     'mae_id': 1, 'pai_id': 2, 'responsavel_id': 1, 'responsavel_secundario_id': 3},
+    {'id': 11, 'nome': 'Luíza', 'matricula': 'M11',
+     'mae_id': None, 'pai_id': 2, 'responsavel_id': 3, 'responsavel_secundario_id': 2},
+]
+
+ACADEMIC = [
+    {'id_aluno': 10, 'nome_curso': '3º Ano A', 'nome_serie': '3º Ano',
+     'nome_turma': '3A - Tarde', 'situacao_aluno_turma': 'Transferido'},
+]
+
+
+class GuardianAggregatorTestCase(SimpleTestCase):
+    """JOIN das 3 APIs: vínculos, parentesco e campos de cada filho."""
+
+    def setUp(self):
+        result = GuardianAggregatorService().build_guardians_response(
+            GUARDIANS, RELATIONS, ACADEMIC
+        )
+        self.by_id = {g['id']: g for g in result}
+
+    def children(self, guardian_id):
+        return [f['id'] for f in self.by_id[guardian_id]['filhos']]
+
+    def test_relationships_and_parentesco(self):
+        self.assertEqual(self.children(1), [10])
+        self.assertEqual(self.children(2), [10, 11])       # secundário duplicado ignorado
+        self.assertEqual(self.children(3), [10, 11])
+        self.assertEqual(self.children(4), [])
+
+        self.assertEqual(self.by_id[1]['parentesco'], 'mae')
+        self.assertEqual(self.by_id[2]['parentesco_display'], 'Pai')
+        self.assertEqual(self.by_id[3]['parentesco'], 'responsavel_secundario')
+        self.assertEqual(self.by_id[4]['parentesco'], 'responsavel')
+
+        # Parentesco de cada vínculo, não só o do primeiro filho
+        self.assertEqual(
+            [f['parentesco'] for f in self.by_id[3]['filhos']],
+            ['responsavel_secundario', 'responsavel_principal'],
+        )
+
+    def test_child_fields_and_one_dict_per_child(self):
+        pedro = self.by_id[1]['filhos'][0]
+        self.assertEqual(pedro, {
+            'id': 10, 'nome': 'Pedro', 'matricula': 'M10',
+            'turma': '3º Ano A', 'serie': '3º Ano', 'turma_nome': '3A - Tarde',
+            'periodo': 'tarde', 'status': 'transferido', 'url_foto': None,
+            'parentesco': 'mae',
+        })
+        self.assertEqual(self.by_id[3]['filhos'][1]['status'], 'ativo')  # sem acadêmico
+
+        # Mesmo aluno em vários responsáveis: dicts independentes
+        self.assertIsNot(self.by_id[2]['filhos'][0], pedro)
+        pedro['boletos'] = []
+        self.assertNotIn('boletos', self.by_id[2]['filhos'][0])
+
+    def test_guardian_fields(self):
+        maria = self.by_id[1]
+        self.assertEqual(maria['cpf'], '123')
+        self.assertEqual(maria['estado_civil'], 'Casado(a)')
+        self.assertEqual(maria['data_nascimento'], '1985-04-12')
+        self.assertEqual(
+            [d['status'] for d in maria['documentos']],
+            ['entregue', 'pendente', 'pendente', 'pendente', 'entregue'],
+        )
+        self.assertEqual([d['id'] for d in maria['documentos']], [1, 2, 3, 4, 5])
+
+
+def _changed_datasets():
+    """Churn: responsável editado/removido/novo, aluno trocado de pai e de turma."""
+    guardians, relations, academic = copy.deepcopy((GUARDIANS, RELATIONS, ACADEMIC))
+    guardians[0]['email'] = 'maria@email.com'
+    guardians.pop(3)
+    guardians.append({'id': 5, 'nome': 'Novo'})
+    relations[1]['pai_id'] = 5
+    academic[0]['nome_turma'] = '3A - Manhã'
+    return guardians, relations, academic
+
+
+class GuardianIncrementalAggregationTestCase(SimpleTestCase):
+    """build_incremental = build_guardians_response, remontando só os afetados."""
+
+    def test_incremental_matches_full_build(self):
+        aggregator = GuardianAggregatorService()
+        previous = aggregator.build_guardians_response(GUARDIANS, RELATIONS, ACADEMIC)
+        state = aggregator.snapshot(GUARDIANS, RELATIONS, ACADEMIC)
+
+        unchanged = aggregator.build_incremental(
+            GUARDIANS, RELATIONS, ACADEMIC, previous, state
+        )
+        self.assertEqual(unchanged.changed, set())
+        self.assertEqual([id(g) for g in unchanged.guardians], [id(g) for g in previous])
+
+        datasets = _changed_datasets()
+        result = aggregator.build_incremental(*datasets, previous, state)
+
+        self.assertEqual(result.guardians, aggregator.build_guardians_response(*datasets))
+        self.assertEqual(result.state, aggregator.snapshot(*datasets))
+        # 1: email + filho com turma nova; 2 e 3: filhos; 5: novo
+        self.assertEqual(result.changed, {1, 2, 3, 5})
+        self.assertEqual(result.removed, {4})
+
+
+    def test_reordered_relations_match_full_build(self):
+        aggregator = GuardianAggregatorService()
+        reordered = list(reversed(RELATIONS))
+        previous = aggregator.build_guardians_response(GUARDIANS, RELATIONS, ACADEMIC)
+        state = aggregator.snapshot(GUARDIANS, RELATIONS, ACADEMIC)
+
+        result = aggregator.build_incremental(
+            GUARDIANS, reordered, ACADEMIC, previous, state
+        )
+
+        # Mesmas linhas em outra ordem: nada remontado, igual ao build completo
+        self.assertEqual(result.changed, set())
+        self.assertEqual(
+            result.guardians,
+            aggregator.build_guardians_response(GUARDIANS, reordered, ACADEMIC),
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHE, GUARDIANS_FULL_REBUILD_INTERVAL=3600)
+class GuardianIncrementalRebuildTestCase(SimpleTestCase):
+    """Rebuild da lista: remonta e re-serializa só os guardians alterados."""
+
+    def setUp(self):
+        cache.clear()
+        _local_cache.clear()
+        self.datasets = (GUARDIANS, RELATIONS, ACADEMIC)
+        patches = [
+            patch.object(
+                SigaCacheManager, 'get_or_fetch_all_siga_data',
+                side_effect=lambda school_id, token: dict(zip(
+                    ('guardians', 'students_relations', 'students_academic'),
+                    copy.deepcopy(self.datasets),
+                )),
+            ),
+            patch.object(GuardianService, '_invoice_rollups', return_value={}),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def build(self):
+        return GuardianService._build_guardians_list(
+            1, 'tok', GuardianService._list_cache_key(1)
+        )
+
+    def test_rebuilds_only_changed_guardians(self):
+        self.build()
+        self.datasets = _changed_datasets()
+
+        with patch(
+            'apps.contacts.services.guardian_service.render_guardian_cards',
+            wraps=render_guardian_cards,
+        ) as render:
+            guardians = self.build()
+
+        [(rebuilt,), _] = render.call_args
+        self.assertEqual({g['id'] for g in rebuilt}, {1, 2, 3, 5})
+
+        with self.settings(GUARDIANS_FULL_REBUILD_INTERVAL=0):
+            self.assertEqual(guardians, self.build())
+
+    def test_derivatives_after_patch(self):
+        self.build()
+        self.datasets = _changed_datasets()
+        guardians = self.build()
+        _local_cache.clear()  # outro worker
+
+        cards = GuardianService.get_guardian_cards(1, [])
+        self.assertEqual(set(cards), {1, 2, 3, 5})
+        self.assertEqual(cards, render_guardian_cards(guardians))
+
+        index = GuardianService.get_search_index(1, [])
+        self.assertEqual(index.search('maria@'), {1})
+        self.assertEqual(index.search('sem filhos'), set())
+
+        self.assertEqual(SigaCacheManager.get_guardian_shard(1, 1)['email'], 'maria@email.com')
+        self.assertEqual(SigaCacheManager.get_guardian_shard(1, 3)['nome'], 'Ana')
+        self.assertIsNone(SigaCacheManager.get_guardian_shard(1, 4))
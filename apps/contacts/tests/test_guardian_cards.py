@@ -0,0 +1,84 @@
+# apps/contacts/tests/test_guardian_cards.py
+
+import json
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from apps.contacts.integrations.siga_cache_manager import SigaCacheManager
+from apps.contacts.serializers.guardian_serializers import (
+    GuardianListSerializer,
+    render_guardian_cards,
+)
+from apps.contacts.services.guardian_service import GuardianService
+from apps.contacts.tests.factories import locmem_cache
+from apps.contacts.views.guardian_viewset import GuardianPagination
+
+GUARDIANS = [
+    {
+        'id': gid,
+        'nome': f'Responsável {gid} — João',
+        'cpf': None,
+        'email': f'resp{gid}@email.com',
+        'endereco': {'cidade': 'São Paulo', 'uf': 'SP'},
+        'parentesco': 'mae',
+        'parentesco_display': 'Mãe',
+        'filhos': [{'id': gid * 10, 'nome': 'Aluno', 'turma': '3º A'}],
+        'resumo_financeiro': {
+            'tem_pendencia': True, 'total_abertos': 2,
+            'valor_pendente': 1250.5, 'proximo_vencimento': '2025-03-10',
+        },
+        'resumo_documentos': {'total': 5, 'entregues': 4, 'pendentes': 1, 'completo': False},
+    }
+    for gid in range(1, 46)
+]
+
+
+def _request(query=''):
+    return Request(APIRequestFactory().get(f'/api/v1/contacts/guardians/{query}'))
+
+
+class GuardianCardsTestCase(SimpleTestCase):
+    """Página montada com cards pré-serializados = página serializada pelo DRF."""
+
+    def test_paginated_json_matches_serializer_response(self):
+        for query in ('', '?page=2', '?page=3&page_size=20'):
+            with self.subTest(query=query):
+                expected_paginator = GuardianPagination()
+                page = expected_paginator.paginate_queryset(GUARDIANS, _request(query))
+                expected = JSONRenderer().render(
+                    expected_paginator.get_paginated_response(
+                        GuardianListSerializer(page, many=True).data
+                    ).data
+                )
+
+                paginator = GuardianPagination()
+                page = paginator.paginate_queryset(GUARDIANS, _request(query))
+                cards = render_guardian_cards(GUARDIANS)
+                response = paginator.get_paginated_json([cards[g['id']] for g in page])
+
+                self.assertEqual(response.content, expected)
+                self.assertEqual(response['Content-Type'], 'application/json')
+
+        self.assertEqual(json.loads(cards[1])['resumo_financeiro']['valor_pendente'], '1250.50')
+
+    @locmem_cache
+    def test_cards_cached_per_version(self):
+        cache.clear()
+
+        with patch(
+            'apps.contacts.services.guardian_service.render_guardian_cards',
+            wraps=render_guardian_cards,
+        ) as render:
+            cards = GuardianService.get_guardian_cards(1, GUARDIANS)
+            self.assertIs(GuardianService.get_guardian_cards(1, GUARDIANS), cards)
+            self.assertEqual(render.call_count, 1)
+
+            # Nova versão da lista: cards antigos deixam de valer
+            SigaCacheManager.bump_school_version(1)
+            GuardianService.get_guardian_cards(1, GUARDIANS)
+            self.assertEqual(render.call_count, 2)
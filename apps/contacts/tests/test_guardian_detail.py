@@ -0,0 +1,98 @@
+# apps/contacts/tests/test_guardian_detail.py
+
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from apps.contacts.integrations.siga_cache_manager import SigaCacheManager
+from apps.contacts.services.guardian_service import GuardianService
+from apps.contacts.services.invoice_service import InvoiceService
+from apps.contacts.services.invoice_warehouse_service import InvoiceWarehouseService
+from apps.contacts.tests.factories import locmem_cache
+
+GUARDIAN = {
+    'id': 1, 'nome': 'Maria', 'parentesco': 'mae',
+    'filhos': [{'id': 10, 'nome': 'Ana'}, {'id': 11, 'nome': 'Pedro'}],
+}
+
+INVOICES = {
+    10: [
+        {'numero': 1, 'vencimento': '2024-02-10', 'situacao': 'LIQ', 'valor': 500.0, 'valor_pago': 500.0},
+        {'numero': 2, 'vencimento': '2025-02-10', 'situacao': 'ABE', 'valor': 500.0, 'valor_pago': 0},
+        {'numero': 3, 'vencimento': None, 'situacao': 'CAN', 'valor': 10.0, 'valor_pago': 0},
+    ],
+    11: [
+        {'numero': 4, 'vencimento': '2025-03-10', 'situacao': 'ABE', 'valor': 250.5, 'valor_pago': 0},
+    ],
+}
+
+
+@locmem_cache
+class GuardianDetailFiltersTestCase(SimpleTestCase):
+    """Detalhe filtrado e boletos do guardian saem do detalhe completo em cache."""
+
+    def setUp(self):
+        cache.clear()
+        patches = [
+            patch.object(GuardianService, 'find_guardian', return_value=GUARDIAN),
+            patch.object(
+                InvoiceService, 'get_multiple_students_invoices', return_value=INVOICES
+            ),
+            patch.object(InvoiceWarehouseService, 'is_fresh', return_value=False),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        self.fetch = InvoiceService.get_multiple_students_invoices
+
+    def test_filters_applied_in_memory_over_one_fetch(self):
+        full = GuardianService.get_guardian_detail(1, 1, 'token')
+        self.assertEqual(full['resumo_financeiro']['total_abertos'], 2)
+
+        detail = GuardianService.get_guardian_detail(
+            1, 1, 'token', ano_letivo='2025', situacao_boleto='ABE'
+        )
+        self.assertEqual([b['numero'] for b in detail['filhos'][0]['boletos']], [2])
+        self.assertEqual(detail['filhos'][1]['resumo_boletos']['valor_pendente'], 250.5)
+        self.assertEqual(detail['resumo_financeiro']['total_pagos'], 0)
+        self.assertEqual(detail['resumo_financeiro']['valor_pendente'], 750.5)
+
+        invoices = InvoiceService.get_guardian_invoices(
+            1, 1, 'token', ano='2024', filho_id=10
+        )
+        self.assertEqual(invoices['resumo_geral']['total_filhos'], 1)
+        self.assertEqual([b['numero'] for b in invoices['filhos'][0]['boletos']], [1])
+        self.assertEqual(invoices['resumo_geral']['valor_total_pago'], 500.0)
+
+        # Uma busca de boletos; o detalhe completo no cache não foi filtrado
+        self.fetch.assert_called_once()
+        self.assertEqual(GuardianService.get_guardian_detail(1, 1, 'token'), full)
+
+    def test_invoices_endpoint_builds_and_caches_detail(self):
+        invoices = InvoiceService.get_guardian_invoices(1, 1, 'token', situacao='todos')
+        self.assertEqual(invoices['resumo_geral']['total_boletos'], 4)
+
+        self.assertIsNotNone(GuardianService.get_cached_detail(1, 1))
+        GuardianService.get_guardian_detail(1, 1, 'token', situacao_boleto='LIQ')
+        self.fetch.assert_called_once()
+
+    def test_bundle_source_and_ttl_follow_invoices(self):
+        with patch.object(InvoiceWarehouseService, 'is_fresh', return_value=True), \
+                patch.object(
+                    InvoiceWarehouseService, 'get_invoices_by_student', return_value=INVOICES
+                ) as warehouse, \
+                patch.object(
+                    SigaCacheManager, '_safe_cache_set', wraps=SigaCacheManager._safe_cache_set
+                ) as cache_set:
+            invoices = InvoiceService.get_guardian_invoices(1, 1, 'token', situacao='ABE')
+            detail = GuardianService.get_guardian_detail(1, 1, 'token', situacao_boleto='ABE')
+
+        warehouse.assert_called_once_with(1, [10, 11])
+        self.fetch.assert_not_called()
+        self.assertEqual(
+            invoices['resumo_geral']['valor_total_pendente'],
+            detail['resumo_financeiro']['valor_pendente'],
+        )
+        cache_set.assert_called_once()
+        self.assertEqual(cache_set.call_args[0][2], SigaCacheManager.TTL_INVOICES)
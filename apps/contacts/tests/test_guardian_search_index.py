@@ -0,0 +1,92 @@
+# apps/contacts/tests/test_guardian_search_index.py
+
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from apps.contacts.integrations.siga_cache_manager import SigaCacheManager
+from apps.contacts.selectors.guardian_search_index import GuardianSearchIndex, fold
+from apps.contacts.selectors.guardian_selectors import GuardianSelector
+from apps.contacts.services.guardian_service import GuardianService
+from apps.contacts.tests.factories import locmem_cache
+
+GUARDIANS = [
+    {
+        'id': 1, 'nome': 'João da Silva', 'cpf': '123.456.789-01',
+        'email': 'joao@email.com', 'telefone': '(11) 98765-4321',
+        'filhos': [{'id': 10, 'nome': 'Ana Clara'}],
+    },
+    {
+        'id': 2, 'nome': 'MARIA JOSÉ', 'cpf': '98765432100',
+        'email': None, 'telefone': None,
+        'filhos': [{'id': 20, 'nome': 'Pedro Conceição'}, {'id': 21, 'nome': 'Luíza'}],
+    },
+    {'id': 3, 'nome': 'Carlos', 'cpf': None, 'email': 'carlos@escola.com', 'filhos': []},
+]
+
+
+def _ids(guardians):
+    return [g['id'] for g in guardians]
+
+
+class GuardianSearchIndexTestCase(SimpleTestCase):
+    """Busca por índice invertido: mesmos campos da busca linear + acentos."""
+
+    def setUp(self):
+        self.index = GuardianSearchIndex.build(GUARDIANS)
+
+    def search(self, query):
+        return _ids(GuardianSelector.filter_by_search(GUARDIANS, query, index=self.index))
+
+    def test_fold(self):
+        self.assertEqual(fold('João CONCEIÇÃO'), 'joao conceicao')
+
+    def test_matches_fields_accent_insensitive(self):
+        self.assertEqual(self.search('joao'), [1])
+        self.assertEqual(self.search('JOSE'), [2])
+        self.assertEqual(self.search('conceição'), [2])   # filho
+        self.assertEqual(self.search('luiza'), [2])
+        self.assertEqual(self.search('@escola'), [3])      # email
+        self.assertEqual(self.search('a'), [1, 2, 3])      # termo curto
+
+    def test_substring_and_phrase_semantics(self):
+        self.assertEqual(self.search('ria jo'), [2])       # atravessa tokens
+        self.assertEqual(self.search('silva joão'), [])    # ordem importa
+        self.assertEqual(self.search('xyz'), [])
+
+    def test_digits_match_cpf_and_phone(self):
+        self.assertEqual(self.search('456.789'), [1])
+        self.assertEqual(self.search('98765'), [1, 2])     # telefone do 1, CPF do 2
+        self.assertEqual(self.search('   '), [1, 2, 3])
+
+    def test_without_index_and_state_round_trip(self):
+        restored = GuardianSearchIndex.from_state(self.index.to_state())
+
+        for query in ('joao', 'ria jo', '98765', 'ana'):
+            with self.subTest(query=query):
+                self.assertEqual(
+                    _ids(GuardianSelector.filter_by_search(GUARDIANS, query)),
+                    self.search(query),
+                )
+                self.assertEqual(restored.search(query), self.index.search(query))
+
+    @locmem_cache
+    def test_service_caches_index_per_version(self):
+        cache.clear()
+        SigaCacheManager.bump_school_version(1)
+
+        with patch.object(GuardianSearchIndex, 'build', wraps=GuardianSearchIndex.build) as build:
+            first = GuardianService.get_search_index(1, GUARDIANS)
+            self.assertIs(GuardianService.get_search_index(1, GUARDIANS), first)
+            self.assertEqual(build.call_count, 1)
+
+            # Outro worker (L1 vazio após nova versão): remonta do Redis
+            SigaCacheManager.set_guardian_search_index(1, first, 60)
+            version = SigaCacheManager.get_school_version(1)
+            SigaCacheManager.bump_school_version(1)
+            restored = SigaCacheManager.get_guardian_search_index(
+                1, version, GuardianSearchIndex.from_state
+            )
+            self.assertEqual(restored.search('joao'), {1})
+            self.assertEqual(build.call_count, 1)
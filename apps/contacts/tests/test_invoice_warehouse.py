@@ -0,0 +1,213 @@
+# apps/contacts/tests/test_invoice_warehouse.py
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.contacts.integrations.siga_cache_manager import SigaCacheManager
+from apps.contacts.models import SigaInvoice
+from apps.contacts.services.guardian_service import GuardianService
+from apps.contacts.services.invoice_service import InvoiceService
+from apps.contacts.services.invoice_warehouse_service import InvoiceWarehouseService
+from apps.contacts.tests.factories import SchoolFactory, locmem_cache
+
+
+def _raw(titulo, situacao, valor, vencimento='2025-03-10', pago=0, pagador=''):
+    return {
+        'titulo': titulo,
+        'parcela_cobranca': ' 1/12 ',
+        'dt_vencimento': f'{vencimento}T00:00:00',
+        'valor_documento': valor,
+        'valor_recebido_total': pago,
+        'situacao_titulo': situacao,
+        'nome_banco': 'Banco X',
+        'pagador': pagador,
+    }
+
+
+class InvoiceWarehouseTestCase(TestCase):
+    """Armazém de boletos: upsert em lote e agregações SQL."""
+
+    def setUp(self):
+        self.school = SchoolFactory()
+        self.crawl = {
+            10: [
+                _raw(1001, 'LIQ', 500, pago=510, pagador='Maria (CPF: 123.456.789-01)'),
+                _raw(1002, 'ABE', 500, vencimento='2020-01-10'),
+                _raw(1003, 'ABE', 500, vencimento='2099-01-10'),
+            ],
+            11: [_raw(2001, 'CAN', 300), _raw(2002, 'ABE', 250.5, vencimento='2024-05-10')],
+            12: [],
+        }
+        InvoiceWarehouseService.upsert_student_invoices(
+            self.school.id, self.crawl, all_student_ids=[10, 11, 12]
+        )
+
+    def test_upsert_updates_and_prunes(self):
+        self.assertEqual(SigaInvoice.objects.filter(school=self.school).count(), 5)
+
+        # 1002 foi pago; 1003 sumiu; aluno 11 falhou (intocado); 13 saiu
+        result = InvoiceWarehouseService.upsert_student_invoices(
+            self.school.id,
+            {10: [self.crawl[10][0], _raw(1002, 'LIQ', 500, pago=500)]},
+            all_student_ids=[10, 11],
+        )
+
+        self.assertEqual(result['removed'], 1)
+        self.assertEqual(
+            sorted(SigaInvoice.objects.values_list('titulo', flat=True)),
+            ['1001', '1002', '2001', '2002'],
+        )
+        self.assertEqual(SigaInvoice.objects.get(titulo='1002').situacao, 'LIQ')
+
+        InvoiceWarehouseService.upsert_student_invoices(self.school.id, {}, all_student_ids=[10])
+        self.assertFalse(SigaInvoice.objects.filter(student_siga_id='11').exists())
+
+    def test_invoices_and_summaries_by_student(self):
+        invoices = InvoiceWarehouseService.get_invoices_by_student(
+            self.school.id, [10, 12], situacao='ABE'
+        )
+        self.assertEqual([i['numero'] for i in invoices[10]], [1002, 1003])
+        self.assertEqual(invoices[10][0]['vencimento'], '2020-01-10')
+        self.assertEqual(invoices[10][0]['parcela'], '1/12')
+        self.assertEqual(invoices[12], [])
+
+        summaries = InvoiceWarehouseService.summaries_by_student(self.school.id, [10, 11, 12])
+        expected = InvoiceService.calculate_student_summary(
+            [InvoiceService._format_invoice(raw) for raw in self.crawl[10]]
+        )
+        self.assertEqual(summaries[10], expected)
+        self.assertEqual(summaries[11]['valor_pendente'], 250.5)
+        self.assertEqual(summaries[12]['total'], 0)
+
+        by_year = InvoiceWarehouseService.summaries_by_student(self.school.id, [10], ano='2099')
+        self.assertEqual(by_year[10]['total'], 1)
+
+    def test_school_totals(self):
+        totals = InvoiceWarehouseService.school_totals(self.school.id)
+
+        self.assertEqual(totals['total'], 5)
+        self.assertEqual(totals['pagos'], 1)
+        self.assertEqual(totals['cancelados'], 1)
+        self.assertEqual(totals['abertos'], 3)
+        self.assertEqual(totals['vencidos'], 2)
+        self.assertEqual(totals['valor_recebido'], 510.0)
+        self.assertEqual(totals['valor_pendente'], 1250.5)
+        self.assertEqual(
+            InvoiceWarehouseService.students_with_invoices(self.school.id),
+            {10: True, 11: False},
+        )
+
+    def test_freshness_window(self):
+        self.assertTrue(InvoiceWarehouseService.is_fresh(self.school.id))
+
+        SigaInvoice.objects.update(synced_at=timezone.now() - timedelta(hours=3))
+        self.assertFalse(InvoiceWarehouseService.is_fresh(self.school.id))
+
+        with override_settings(INVOICE_WAREHOUSE_MAX_AGE=0):
+            SigaInvoice.objects.update(synced_at=timezone.now())
+            self.assertFalse(InvoiceWarehouseService.is_fresh(self.school.id))
+
+    def test_services_answer_from_warehouse(self):
+        guardians = [
+            {'id': 1, 'nome': 'Maria', 'parentesco': 'mae',
+             'filhos': [{'id': 10, 'nome': 'Ana'}, {'id': 11, 'nome': 'Pedro'}]},
+            {'id': 2, 'nome': 'João', 'parentesco': 'pai', 'filhos': [{'id': 12, 'nome': 'Lia'}]},
+        ]
+
+        with patch.object(GuardianService, 'get_guardians_list', return_value=guardians), \
+                patch.object(InvoiceService, 'get_multiple_students_invoices') as siga:
+            stats = GuardianService.get_stats(self.school.id, 'token')
+            invoices = InvoiceService.get_guardian_invoices(
+                1, self.school.id, 'token', situacao='ABE'
+            )
+
+        siga.assert_not_called()
+        self.assertEqual(stats['financeiro']['total_inadimplentes'], 1)
+        self.assertEqual(stats['financeiro']['valor_total_pendente'], 1250.5)
+        self.assertEqual(stats['financeiro']['valor_total_recebido'], 510.0)
+
+        self.assertEqual(invoices['resumo_geral']['total_boletos'], 3)
+        self.assertEqual(invoices['resumo_geral']['valor_total_pendente'], 1250.5)
+        self.assertEqual(len(invoices['filhos'][0]['boletos']), 2)
+
+    def test_financial_rollups_by_student(self):
+        self.assertEqual(
+            InvoiceWarehouseService.financial_rollups(self.school.id),
+            {
+                10: {'total_abertos': 2, 'valor_pendente': 1000.0,
+                     'proximo_vencimento': '2020-01-10'},
+                11: {'total_abertos': 1, 'valor_pendente': 250.5,
+                     'proximo_vencimento': '2024-05-10'},
+            },
+        )
+
+    @locmem_cache
+    def test_rollups_merged_into_cached_list(self):
+        cache.clear()
+        guardians = [
+            {'id': 1, 'filhos': [{'id': 10}, {'id': 11}]},
+            {'id': 2, 'filhos': [{'id': 12}]},
+        ]
+        for guardian in guardians:
+            guardian['resumo_financeiro'] = GuardianService._build_resumo_financeiro_lista(guardian)
+        cache_key = GuardianService._list_cache_key(self.school.id)
+        SigaCacheManager._swr_set(cache_key, guardians, 600)
+        version = SigaCacheManager.get_school_version(self.school.id)
+
+        updated = GuardianService.apply_invoice_rollups(self.school.id)
+
+        self.assertEqual(updated, 2)
+        cached, fresh = SigaCacheManager._swr_get(cache_key)
+        self.assertTrue(fresh)
+        self.assertEqual(cached[0]['resumo_financeiro'], {
+            'tem_pendencia': True,
+            'total_abertos': 3,
+            'valor_pendente': 1250.5,
+            'proximo_vencimento': '2020-01-10',
+        })
+        self.assertFalse(cached[1]['resumo_financeiro']['tem_pendencia'])
+
+        # Workers relêem a lista; shards e cópia stale com os novos resumos
+        new_version = SigaCacheManager.get_school_version(self.school.id)
+        self.assertNotEqual(new_version, version)
+        shard = SigaCacheManager.get_guardian_shard(self.school.id, 1)
+        self.assertEqual(shard['resumo_financeiro']['total_abertos'], 3)
+        stale = SigaCacheManager._safe_cache_get(SigaCacheManager.stale_key(cache_key))
+        self.assertEqual(stale[0]['resumo_financeiro']['valor_pendente'], 1250.5)
+
+    @locmem_cache
+    def test_rollups_locked_and_derivatives_outlive_soft_ttl(self):
+        cache.clear()
+        guardians = [{'id': 1, 'filhos': [{'id': 10}]}]
+        cache_key = GuardianService._list_cache_key(self.school.id)
+        SigaCacheManager._swr_set(cache_key, guardians, -60)  # vencida no soft
+
+        with patch.object(
+            SigaCacheManager, 'exclusive', wraps=SigaCacheManager.exclusive
+        ) as exclusive, patch.object(
+            GuardianService, '_cache_list_derivatives'
+        ) as derivatives:
+            self.assertEqual(GuardianService.apply_invoice_rollups(self.school.id), 1)
+
+        exclusive.assert_called_once_with(cache_key)
+        self.assertEqual(derivatives.call_args.args[2], SigaCacheManager.TTL_HARD)
+
+    def test_rollups_scheduled_off_the_request(self):
+        with patch('apps.contacts.tasks.apply_invoice_rollups_task.apply_async') as enqueue, \
+                patch.object(GuardianService, 'apply_invoice_rollups') as apply:
+            self.assertTrue(GuardianService.schedule_invoice_rollups(self.school.id))
+
+            enqueue.side_effect = ConnectionError('broker down')
+            self.assertFalse(GuardianService.schedule_invoice_rollups(self.school.id))
+
+        enqueue.assert_called_with(args=(self.school.id,), retry=False)
+        apply.assert_not_called()
+
+    @locmem_cache
+    def test_rollups_without_cached_list_is_noop(self):
+        cache.clear()
+        self.assertIsNone(GuardianService.apply_invoice_rollups(self.school.id))
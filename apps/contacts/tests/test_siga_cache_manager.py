@@ -0,0 +1,433 @@
+# apps/contacts/tests/test_siga_cache_manager.py
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from apps.contacts.integrations.cache_guard import guarded_cache
+from apps.contacts.integrations.local_cache import LocalLRUCache, redis_fallback
+from apps.contacts.integrations.siga_cache_manager import SigaCacheManager, _local_cache
+from apps.contacts.services.guardian_service import GuardianService
+from apps.contacts.tasks import refresh_siga_cache_task
+from apps.contacts.tests.factories import locmem_cache
+
+
+@locmem_cache
+class SingleFlightTestCase(SimpleTestCase):
+    """Só um worker reconstrói uma chave expirada."""
+
+    def setUp(self):
+        cache.clear()
+        SigaCacheManager.start_staleness_tracking()
+
+    def _run_concurrently(self, fn, n=5):
+        results = [None] * n
+
+        def worker(i):
+            results[i] = fn()
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(n)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return results
+
+    def test_concurrent_misses_build_once(self):
+        calls = []
+
+        def build():
+            calls.append(1)
+            time.sleep(0.2)
+            cache.set('k', ['fresh'])
+            return ['fresh']
+
+        before = SigaCacheManager.single_flight_stats()
+        results = self._run_concurrently(
+            lambda: SigaCacheManager.single_flight('k', build)
+        )
+        after = SigaCacheManager.single_flight_stats()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [['fresh']] * 5)
+        self.assertEqual(after['leaders'] - before['leaders'], 1)
+        self.assertEqual(after['waiter_hits'] - before['waiter_hits'], 4)
+        self.assertGreater(after['lock_hold_seconds_max'], 0.15)
+
+    def test_waiters_get_stale_value_after_bound(self):
+        cache.set('k:stale', ['old'])
+        cache.add('k:lock', 'other-worker')
+
+        value = SigaCacheManager.single_flight(
+            'k', lambda: ['rebuilt'], stale_key='k:stale',
+            dataset='guardians_list', wait_timeout=0.2,
+        )
+
+        self.assertEqual(value, ['old'])
+        self.assertEqual(SigaCacheManager.get_stale_datasets(), ['guardians_list'])
+
+    def test_waiter_takes_over_when_leader_fails(self):
+        calls = []
+
+        def build():
+            calls.append(1)
+            if len(calls) == 1:
+                time.sleep(0.1)
+                raise RuntimeError('SIGA down')
+            cache.set('k', ['fresh'])
+            return ['fresh']
+
+        results = []
+
+        def worker():
+            try:
+                results.append(SigaCacheManager.single_flight('k', build))
+            except RuntimeError:
+                results.append('error')
+
+        threads = [threading.Thread(target=worker) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(sorted(map(str, results)), ["['fresh']", 'error'])
+
+    def test_exclusive_waits_for_lock_holder(self):
+        order = []
+
+        def leader():
+            with SigaCacheManager.exclusive('k'):
+                order.append('leader')
+                time.sleep(0.2)
+                order.append('leader done')
+
+        thread = threading.Thread(target=leader)
+        thread.start()
+        time.sleep(0.05)
+        with SigaCacheManager.exclusive('k'):
+            order.append('second')
+        thread.join()
+
+        self.assertEqual(order, ['leader', 'leader done', 'second'])
+        self.assertIsNone(cache.get('k:lock'))
+
+        # Lock de um worker morto: segue após o limite
+        cache.add('k:lock', 'dead-worker')
+        with SigaCacheManager.exclusive('k', wait_timeout=0.1):
+            pass
+        self.assertEqual(cache.get('k:lock'), 'dead-worker')
+
+
+@locmem_cache
+class StaleWhileRevalidateTestCase(SimpleTestCase):
+    """Entradas vencidas no TTL soft são servidas e revalidadas em background."""
+
+    def setUp(self):
+        cache.clear()
+        self.key = SigaCacheManager.school_key(
+            1, SigaCacheManager.KEY_GUARDIANS_ALL.format(school_id=1)
+        )
+
+    def test_soft_expired_value_is_served_and_refresh_enqueued_once(self):
+        SigaCacheManager._swr_set(self.key, [{'id': 1}], soft_ttl=-1)
+        service = MagicMock()
+
+        with patch.object(SigaCacheManager, '_siga_service', return_value=service), \
+                patch.object(refresh_siga_cache_task, 'apply_async') as enqueue:
+            first = SigaCacheManager.get_or_fetch_guardians(1, 'tok')
+            second = SigaCacheManager.get_or_fetch_guardians(1, 'tok')
+
+        self.assertEqual(first, [{'id': 1}])
+        self.assertEqual(second, [{'id': 1}])
+        service.fetch_all_guardians.assert_not_called()
+        enqueue.assert_called_once_with(
+            args=(self.key, 'guardians', 'tok'), kwargs={'school_id': 1}, retry=False
+        )
+
+    def test_fresh_value_does_not_enqueue(self):
+        SigaCacheManager._swr_set(self.key, [{'id': 1}], soft_ttl=60)
+
+        with patch.object(refresh_siga_cache_task, 'apply_async') as enqueue:
+            SigaCacheManager.get_or_fetch_guardians(1, 'tok')
+
+        enqueue.assert_not_called()
+
+    def test_refresh_task_reloads_dataset_and_clears_dedup(self):
+        SigaCacheManager._swr_set(self.key, [{'id': 1}], soft_ttl=-1)
+        cache.add(self.key + SigaCacheManager.KEY_REFRESHING_SUFFIX, True)
+        service = MagicMock()
+        service.fetch_all_guardians.return_value = [{'id': 2}]
+
+        with patch.object(SigaCacheManager, '_siga_service', return_value=service):
+            refresh_siga_cache_task(self.key, 'guardians', 'tok', school_id=1)
+
+        value, fresh = SigaCacheManager._swr_get(self.key)
+        self.assertEqual(value, [{'id': 2}])
+        self.assertTrue(fresh)
+        self.assertIsNone(cache.get(self.key + SigaCacheManager.KEY_REFRESHING_SUFFIX))
+
+
+class LocalLRUCacheTestCase(SimpleTestCase):
+    """L1 limitado por entradas e TTL."""
+
+    def test_evicts_least_recently_used(self):
+        lru = LocalLRUCache(max_entries=2, ttl=60)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        lru.get('a')
+        lru.set('c', 3)
+
+        self.assertEqual(lru.get('a'), 1)
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.stats()['evictions'], 1)
+
+    def test_entries_expire(self):
+        lru = LocalLRUCache(max_entries=2, ttl=0.01)
+        lru.set('a', 1)
+        time.sleep(0.02)
+        self.assertIsNone(lru.get('a'))
+
+    def test_memory_budget_evicts_and_rejects_oversized(self):
+        lru = LocalLRUCache(max_entries=10, ttl=60, max_bytes=100)
+        lru.set('a', b'x' * 40)
+        lru.set('b', b'x' * 40)
+        lru.set('c', b'x' * 40)
+        lru.set('huge', b'x' * 101)
+
+        self.assertIsNone(lru.get('a'))
+        self.assertIsNone(lru.get('huge'))
+        self.assertEqual(lru.stats()['bytes'], 80)
+
+    def test_writes_sweep_expired_entries(self):
+        lru = LocalLRUCache(max_entries=10, ttl=0.01, sweep_interval=0)
+        lru.set('a', b'x' * 10)
+        lru.set('b', b'x' * 10)
+        time.sleep(0.02)
+        lru.set('c', b'x' * 10, ttl=60)
+
+        self.assertEqual(len(lru), 1)
+        self.assertEqual(lru.stats()['bytes'], 10)
+        self.assertEqual(lru.stats()['expired'], 2)
+
+
+@locmem_cache
+class TwoTierCacheTestCase(SimpleTestCase):
+    """Lista processada servida do L1 até a versão da escola mudar."""
+
+    def setUp(self):
+        cache.clear()
+        _local_cache.clear()
+        self.key = 'guardians:school:1:processed_list'
+        SigaCacheManager._swr_set(self.key, [{'id': 1}], soft_ttl=60)
+
+    def _read(self):
+        return SigaCacheManager.get_or_revalidate(
+            self.key, 'guardians_list', 'tok', local=True, school_id=1
+        )
+
+    def test_hot_reads_skip_redis_value(self):
+        with patch.object(
+            SigaCacheManager, '_swr_get_entry', wraps=SigaCacheManager._swr_get_entry
+        ) as redis_read:
+            first = self._read()
+            second = self._read()
+
+        self.assertIs(first, second)
+        self.assertEqual(redis_read.call_count, 1)
+
+    def test_version_bump_invalidates_other_workers(self):
+        self._read()
+
+        # Outro worker reconstrói: grava no Redis e incrementa a versão
+        SigaCacheManager._swr_set(self.key, [{'id': 2}], soft_ttl=60)
+        # (sem passar por bump_school_version, que limparia o L1 local)
+        cache.set(SigaCacheManager.KEY_SCHOOL_VERSION.format(school_id=1), 7)
+
+        self.assertEqual(self._read(), [{'id': 2}])
+
+    def test_soft_expired_l1_entry_schedules_refresh(self):
+        SigaCacheManager._swr_set(self.key, [{'id': 1}], soft_ttl=-1)
+
+        with patch.object(refresh_siga_cache_task, 'apply_async') as enqueue:
+            self._read()
+            self._read()
+
+        enqueue.assert_called_once()
+
+
+@locmem_cache
+class GuardianShardTestCase(SimpleTestCase):
+    """Um guardian lido pela chave própria, sem carregar a lista."""
+
+    def setUp(self):
+        cache.clear()
+        _local_cache.clear()
+        self.guardians = [{'id': gid, 'nome': f'G{gid}'} for gid in range(1, 6)]
+        SigaCacheManager.bump_school_version(1)
+        SigaCacheManager.set_guardian_shards(1, self.guardians, timeout=60)
+
+    def _find(self, guardian_id):
+        return GuardianService.find_guardian(guardian_id, 1, 'tok')
+
+    def test_reads_shard_without_list(self):
+        _local_cache.clear()  # outro worker: sem índice L1
+
+        with patch.object(GuardianService, 'get_guardians_list') as full_list:
+            self.assertEqual(self._find(3), {'id': 3, 'nome': 'G3'})
+
+        full_list.assert_not_called()
+
+    def test_local_index_answers_hits_and_misses(self):
+        with patch.object(SigaCacheManager, 'get_guardian_shard') as shard, \
+                patch.object(GuardianService, 'get_guardians_list') as full_list:
+            self.assertIs(self._find(2), self.guardians[1])
+            self.assertIsNone(self._find(99))
+
+        shard.assert_not_called()
+        full_list.assert_not_called()
+
+    def test_invalidation_falls_back_to_list_once(self):
+        SigaCacheManager.invalidate_school_cache(1)
+
+        with patch.object(
+            GuardianService, 'get_guardians_list', return_value=self.guardians
+        ) as full_list:
+            self.assertEqual(self._find(4)['nome'], 'G4')
+            self.assertEqual(self._find(5)['nome'], 'G5')
+
+        full_list.assert_called_once()
+
+    def test_patch_keeps_unchanged_shards(self):
+        SigaCacheManager.bump_school_version(1)
+        changed = {'id': 2, 'nome': 'Novo'}
+        SigaCacheManager.patch_guardian_shards(
+            1, [self.guardians[0], changed], [changed], [3], timeout=60
+        )
+        _local_cache.clear()
+
+        with patch.object(GuardianService, 'get_guardians_list') as full_list:
+            self.assertEqual(self._find(1), {'id': 1, 'nome': 'G1'})
+            self.assertEqual(self._find(2), changed)
+            self.assertIsNone(SigaCacheManager.get_guardian_shard(1, 3))
+
+        full_list.assert_not_called()
+
+
+@locmem_cache
+class SchoolGenerationTestCase(SimpleTestCase):
+    """Refresh da escola invalida todas as famílias de chaves com um INCR."""
+
+    def setUp(self):
+        cache.clear()
+        _local_cache.clear()
+        SigaCacheManager.start_staleness_tracking()
+
+    def test_invalidate_hides_every_school_key_family(self):
+        SigaCacheManager.get_or_set_student_invoices(10, [{'numero': 1}], school_id=1)
+        SigaCacheManager.cache_search_results(1, 'maria', [{'id': 1}])
+        SigaCacheManager._safe_cache_set(
+            SigaCacheManager.guardian_detail_key(5, 1), {'id': 5}, 60
+        )
+        other_school = SigaCacheManager.school_key(2, 'all_invoices_school_2')
+        SigaCacheManager._safe_cache_set(other_school, {'students': []}, 60)
+
+        with patch.object(guarded_cache, 'delete') as delete:
+            GuardianService.invalidate_cache(1)
+
+        delete.assert_not_called()
+        self.assertIsNone(SigaCacheManager.get_or_set_student_invoices(10, school_id=1))
+        self.assertIsNone(SigaCacheManager.get_cached_search_results(1, 'maria'))
+        self.assertIsNone(
+            SigaCacheManager._safe_cache_get(SigaCacheManager.guardian_detail_key(5, 1))
+        )
+        # Outras escolas não são afetadas
+        self.assertEqual(SigaCacheManager.school_key(2, 'all_invoices_school_2'), other_school)
+        self.assertEqual(SigaCacheManager._safe_cache_get(other_school), {'students': []})
+
+    def test_stale_copy_survives_invalidation(self):
+        SigaCacheManager.get_or_set_student_invoices(10, [{'numero': 1}], school_id=1)
+
+        SigaCacheManager.invalidate_school_cache(1)
+
+        self.assertEqual(
+            SigaCacheManager.get_stale_student_invoices(10, school_id=1), [{'numero': 1}]
+        )
+        self.assertEqual(SigaCacheManager.get_stale_datasets(), ['invoices'])
+
+    def test_redis_down_bump_drops_only_that_school_from_fallback(self):
+        redis_fallback.clear()
+        self.addCleanup(redis_fallback.clear)
+        mine = SigaCacheManager.school_key(1, 'all_invoices_school_1')
+        other = SigaCacheManager.school_key(2, 'all_invoices_school_2')
+        stale = SigaCacheManager.stale_key(mine)
+        for key in (mine, other, stale):
+            redis_fallback.set(key, b'x')
+
+        with patch.object(guarded_cache, 'add', side_effect=ConnectionError):
+            SigaCacheManager.bump_school_generation(1)
+
+        self.assertIsNone(redis_fallback.get(mine))
+        self.assertEqual(redis_fallback.get(other), b'x')
+        self.assertEqual(redis_fallback.get(stale), b'x')
+
+
+@locmem_cache
+class StudentInvoicesBatchTestCase(SimpleTestCase):
+    """Boletos de vários alunos: um MGET, SIGA só para os ausentes."""
+
+    def setUp(self):
+        cache.clear()
+        SigaCacheManager.start_staleness_tracking()
+        SigaCacheManager.set_many_student_invoices({1: [{'numero': 100}]}, school_id=1)
+
+    def _fetch(self, sid, token):
+        return [{'numero': sid * 100}]
+
+    def test_only_misses_go_to_siga_and_are_batched_back(self):
+        from apps.contacts.services.invoice_service import InvoiceService
+
+        with patch.object(
+            InvoiceService, '_fetch_student_invoices', side_effect=self._fetch
+        ) as fetch, patch.object(
+            guarded_cache, 'get_many', wraps=guarded_cache.get_many
+        ) as get_many, patch.object(
+            guarded_cache, 'get', wraps=guarded_cache.get
+        ) as get, patch.object(
+            guarded_cache, 'set_many_timeouts', wraps=guarded_cache.set_many_timeouts
+        ) as set_many:
+            result = InvoiceService.get_multiple_students_invoices([1, 2, 3], 'tok', school_id=1)
+            again = InvoiceService.get_multiple_students_invoices([1, 2, 3], 'tok', school_id=1)
+
+        self.assertEqual(sorted(call.args[0] for call in fetch.call_args_list), [2, 3])
+        self.assertEqual(result, {1: [{'numero': 100}], 2: [{'numero': 200}], 3: [{'numero': 300}]})
+        self.assertEqual(again, result)
+        # 1ª chamada: MGET das entradas + MGET das cópias stale só dos
+        # ausentes; 2ª (todos em cache): só o MGET das entradas. Um
+        # pipeline de escrita (entradas + cópias stale) para os ausentes
+        self.assertEqual(
+            [len(call.args[0]) for call in get_many.call_args_list], [3, 2, 3]
+        )
+        set_many.assert_called_once()
+        self.assertEqual(len(set_many.call_args.args[0]), 4)
+        # Geração da escola já lida nesta requisição (memo)
+        get.assert_not_called()
+
+    def test_failed_student_gets_stale_copy(self):
+        from apps.contacts.services.invoice_service import InvoiceService
+
+        SigaCacheManager.invalidate_school_cache(1)
+
+        with patch.object(
+            InvoiceService, '_fetch_student_invoices',
+            side_effect=requests.exceptions.ConnectionError(),
+        ):
+            result = InvoiceService.get_multiple_students_invoices([1, 2], 'tok', school_id=1)
+
+        self.assertEqual(result, {1: [{'numero': 100}], 2: []})
+        self.assertEqual(SigaCacheManager.get_stale_datasets(), ['invoices'])
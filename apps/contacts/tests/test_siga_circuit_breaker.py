@@ -0,0 +1,100 @@
+# apps/contacts/tests/test_siga_circuit_breaker.py
+
+import time
+from unittest.mock import MagicMock, patch
+
+import requests
+from django.test import SimpleTestCase
+
+from apps.contacts.integrations.siga_cache_manager import SigaCacheManager
+from apps.contacts.integrations.siga_circuit_breaker import (
+    STATE_CLOSED,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+)
+from apps.contacts.tests.factories import locmem_cache
+
+
+def _http_error(status_code):
+    return requests.exceptions.HTTPError(response=MagicMock(status_code=status_code))
+
+
+class CircuitBreakerTestCase(SimpleTestCase):
+    """Breaker por endpoint com sonda half-open em background."""
+
+    def test_opens_after_consecutive_outages_and_fails_fast(self):
+        breaker = CircuitBreaker('x/', failure_threshold=2, recovery_timeout=60)
+        failing = MagicMock(side_effect=requests.exceptions.Timeout('slow'))
+
+        for _ in range(2):
+            with self.assertRaises(requests.exceptions.Timeout):
+                breaker.call(failing)
+
+        self.assertEqual(breaker.state, STATE_OPEN)
+        with self.assertRaises(CircuitOpenError):
+            breaker.call(failing)
+        self.assertEqual(failing.call_count, 2)
+        breaker.reset()
+
+    def test_client_errors_do_not_open_circuit(self):
+        breaker = CircuitBreaker('x/', failure_threshold=1)
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            breaker.call(MagicMock(side_effect=_http_error(401)))
+
+        self.assertEqual(breaker.state, STATE_CLOSED)
+
+    def test_background_probe_closes_circuit(self):
+        breaker = CircuitBreaker('x/', failure_threshold=1, recovery_timeout=0.05)
+        calls = {'n': 0}
+
+        def flaky():
+            calls['n'] += 1
+            if calls['n'] == 1:
+                raise _http_error(503)
+            return 'ok'
+
+        with self.assertRaises(requests.exceptions.HTTPError):
+            breaker.call(flaky)
+        self.assertEqual(breaker.state, STATE_OPEN)
+
+        time.sleep(0.3)
+
+        self.assertEqual(breaker.state, STATE_CLOSED)
+        self.assertEqual(breaker.call(flaky), 'ok')
+
+
+@locmem_cache
+class StaleFallbackTestCase(SimpleTestCase):
+    """Cópia stale servida quando o SIGA falha."""
+
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        SigaCacheManager.start_staleness_tracking()
+
+    def test_serves_stale_copy_and_marks_dataset(self):
+        service = MagicMock()
+        service.fetch_all_guardians.return_value = [{'id': 1}]
+
+        with patch.object(SigaCacheManager, '_siga_service', return_value=service):
+            SigaCacheManager.get_or_fetch_guardians(1, 'tok')
+
+            # TTL normal expirou; SIGA fora do ar
+            SigaCacheManager.invalidate_school_cache(1)
+            service.fetch_all_guardians.side_effect = CircuitOpenError('open')
+            data = SigaCacheManager.get_or_fetch_guardians(1, 'tok')
+
+        self.assertEqual(data, [{'id': 1}])
+        self.assertEqual(SigaCacheManager.get_stale_datasets(), ['guardians'])
+
+    def test_raises_without_stale_copy(self):
+        service = MagicMock()
+        service.fetch_all_guardians.side_effect = requests.exceptions.ConnectionError()
+
+        with patch.object(SigaCacheManager, '_siga_service', return_value=service):
+            with self.assertRaises(requests.exceptions.ConnectionError):
+                SigaCacheManager.get_or_fetch_guardians(1, 'tok')
+
+        self.assertEqual(SigaCacheManager.get_stale_datasets(), [])
@@ -0,0 +1,71 @@
+# apps/contacts/tests/test_siga_client.py
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.test import SimpleTestCase
+
+from apps.contacts.integrations.siga_client import SigaClient, get_siga_client
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = json.dumps({'resultados': [], 'auth': self.headers.get('Authorization')})
+        body = body.encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class SigaClientTestCase(SimpleTestCase):
+    """Testes do cliente HTTP compartilhado do SIGA."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _KeepAliveHandler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}/api/v0"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def test_reuses_connections(self):
+        """Requisições sequenciais reaproveitam a mesma conexão keep-alive."""
+        client = SigaClient(base_url=self.base_url)
+
+        for student_id in range(10):
+            response = client.get(
+                'informacoes_boleto/', 'tok', params={'id_aluno': student_id}
+            )
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json()['auth'], 'Bearer tok')
+
+        stats = client.pool_stats()
+        self.assertEqual(stats['requests'], 10)
+        self.assertEqual(stats['connections_opened'], 1)
+        self.assertEqual(stats['reuse_ratio'], 0.9)
+        self.assertEqual(stats['idle_connections'], 1)
+        client.close()
+
+    def test_build_url_accepts_absolute_next_links(self):
+        client = SigaClient(base_url=self.base_url)
+        next_link = 'https://siga.activesoft.com.br/api/v0/x/?page=2'
+
+        self.assertEqual(client.build_url(next_link), next_link)
+        self.assertEqual(client.build_url('/x/'), f"{self.base_url}/x/")
+
+    def test_singleton_per_process(self):
+        self.assertIs(get_siga_client(), get_siga_client())
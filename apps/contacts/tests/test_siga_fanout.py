@@ -0,0 +1,101 @@
+# apps/contacts/tests/test_siga_fanout.py
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+
+from apps.contacts.integrations.siga_fanout import FanoutDeadlineExceeded, SigaFanout
+
+request_marker = contextvars.ContextVar('request_marker', default=None)
+
+
+class SigaFanoutTestCase(SimpleTestCase):
+    """Motor de fan-out das chamadas por aluno."""
+
+    def test_map_preserves_input_order(self):
+        def fetch(n):
+            time.sleep(0.01 * (5 - n))
+            return n * 10
+
+        results = SigaFanout(concurrency=5).map(fetch, range(5))
+
+        self.assertEqual([r.value for r in results], [0, 10, 20, 30, 40])
+        self.assertTrue(all(r.ok for r in results))
+
+    def test_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        state = {'running': 0, 'peak': 0}
+
+        def fetch(n):
+            with lock:
+                state['running'] += 1
+                state['peak'] = max(state['peak'], state['running'])
+            time.sleep(0.02)
+            with lock:
+                state['running'] -= 1
+            return n
+
+        SigaFanout(concurrency=3).map(fetch, range(12))
+
+        self.assertLessEqual(state['peak'], 3)
+
+    def test_errors_and_deadlines_are_per_call(self):
+        def fetch(n):
+            if n == 1:
+                raise ValueError('bad student')
+            if n == 2:
+                time.sleep(0.5)
+            return n
+
+        results = SigaFanout(concurrency=3, call_timeout=0.1).map(fetch, range(3))
+
+        self.assertEqual(results[0].value, 0)
+        self.assertIsInstance(results[1].error, ValueError)
+        self.assertIsInstance(results[2].error, FanoutDeadlineExceeded)
+
+    def test_executor_queue_time_does_not_count_against_call_deadline(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        busy = threading.Event()
+
+        def slow(n):
+            busy.set()
+            time.sleep(0.3)
+            return n
+
+        with patch(
+            'apps.contacts.integrations.siga_fanout._get_executor', return_value=executor
+        ):
+            other = threading.Thread(target=lambda: SigaFanout().map(slow, [0]))
+            other.start()
+            busy.wait(1)
+            # Fica ~0.3s na fila do executor (ocupado pelo outro fan-out)
+            results = SigaFanout(call_timeout=0.2).map(lambda n: n, [1, 2])
+            other.join()
+
+        self.assertEqual([r.value for r in results], [1, 2])
+
+    def test_total_deadline_covers_executor_queue(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+
+        with patch(
+            'apps.contacts.integrations.siga_fanout._get_executor', return_value=executor
+        ):
+            results = SigaFanout(concurrency=2, total_timeout=0.1).map(
+                lambda n: time.sleep(0.3), [0, 1]
+            )
+
+        self.assertIsInstance(results[0].error, FanoutDeadlineExceeded)
+        self.assertIsInstance(results[1].error, FanoutDeadlineExceeded)
+
+    def test_caller_context_is_visible_in_calls(self):
+        request_marker.set('req-1')
+
+        results = SigaFanout().map(lambda n: request_marker.get(), range(3))
+
+        self.assertEqual([r.value for r in results], ['req-1'] * 3)
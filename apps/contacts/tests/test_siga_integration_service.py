@@ -0,0 +1,52 @@
+# apps/contacts/tests/test_siga_integration_service.py
+
+import time
+from unittest.mock import patch
+
+import requests
+from django.test import SimpleTestCase
+
+from apps.contacts.services.siga_integration_service import SigaIntegrationService
+
+
+class FetchAllDataTestCase(SimpleTestCase):
+    """Busca paralela dos 3 datasets do SIGA."""
+
+    def _slow(self, value, delay=0.2):
+        def fetch(*args, **kwargs):
+            time.sleep(delay)
+            return value
+        return fetch
+
+    def test_fetches_run_concurrently(self):
+        service = SigaIntegrationService('tok')
+
+        with patch.object(service, 'fetch_all_guardians', self._slow([1])), \
+                patch.object(service, 'fetch_students_relations', self._slow([2])), \
+                patch.object(service, 'fetch_students_academic', self._slow([3])):
+            start = time.monotonic()
+            data = service.fetch_all_data()
+            elapsed = time.monotonic() - start
+
+        self.assertEqual(data, {
+            'guardians': [1],
+            'students_relations': [2],
+            'students_academic': [3],
+        })
+        self.assertLess(elapsed, 0.5)
+
+    def test_failure_is_reported_after_other_datasets_finish(self):
+        finished = []
+
+        def ok():
+            time.sleep(0.1)
+            finished.append('ok')
+            return []
+
+        def boom():
+            raise requests.exceptions.Timeout('slow')
+
+        with self.assertRaises(requests.exceptions.Timeout):
+            SigaIntegrationService.run_concurrently({'a': ok, 'b': boom})
+
+        self.assertEqual(finished, ['ok'])
@@ -0,0 +1,151 @@
+# apps/contacts/tests/test_siga_mirror.py
+
+from importlib import import_module
+
+from django.apps import apps
+from django.test import TestCase, override_settings
+
+from apps.contacts.models import Guardian, Student, StudentGuardian
+from apps.contacts.selectors.guardian_mirror_selectors import GuardianMirrorSelector
+from apps.contacts.services.siga_mirror_service import SigaMirrorService
+from apps.contacts.tests.factories import SchoolFactory
+
+
+def _guardian(gid, nome, parentesco='mae', filhos=(), pendente=False, completo=False, **extra):
+    return {
+        'id': gid,
+        'nome': nome,
+        'cpf': extra.get('cpf', ''),
+        'email': extra.get('email', ''),
+        'telefone': extra.get('telefone', ''),
+        'parentesco': parentesco,
+        'endereco': {'cep': '01000-000', 'uf': 'sp', 'cidade': 'São Paulo'},
+        'filhos': [{'id': fid, 'nome': fnome, 'matricula': f'M{fid}'} for fid, fnome in filhos],
+        'resumo_financeiro': {'tem_pendencia': pendente},
+        'resumo_documentos': {'completo': completo},
+    }
+
+
+class SigaMirrorTestCase(TestCase):
+    """Espelho local: upsert em lote + filtros SQL."""
+
+    def setUp(self):
+        self.school = SchoolFactory()
+        self.guardians = [
+            _guardian(1, 'Maria Souza', filhos=[(10, 'Ana Souza')], pendente=True,
+                      cpf='123.456.789-01', telefone='(11) 98888-7777'),
+            _guardian(2, 'João Souza', parentesco='pai', filhos=[(10, 'Ana Souza')],
+                      completo=True, email='Joao@Mail.com'),
+            _guardian(3, 'Carla Lima', filhos=[(11, 'Pedro Lima')]),
+        ]
+
+    def _qs(self):
+        return GuardianMirrorSelector.for_school(self.school.id)
+
+    def test_upsert_creates_rows_and_links(self):
+        result = SigaMirrorService.upsert_guardians(self.school.id, self.guardians)
+
+        self.assertEqual(result['guardians'], 3)
+        self.assertEqual(result['students'], 2)
+        self.assertEqual(StudentGuardian.objects.filter(guardian__school=self.school).count(), 3)
+
+        maria = Guardian.objects.get(school=self.school, siga_id='1')
+        self.assertEqual(maria.cpf, '12345678901')
+        self.assertEqual(maria.telefone_principal, '11988887777')
+        self.assertEqual(maria.estado, 'SP')
+        self.assertEqual(maria.siga_payload['nome'], 'Maria Souza')
+        self.assertEqual(
+            StudentGuardian.objects.get(guardian=maria).prioridade, 1
+        )
+
+    def test_link_parentesco_comes_from_each_child(self):
+        carla = _guardian(3, 'Carla Lima', filhos=[(11, 'Pedro Lima'), (12, 'Bia Lima')])
+        carla['filhos'][0]['parentesco'] = 'mae'
+        carla['filhos'][1]['parentesco'] = 'responsavel_principal'
+        SigaMirrorService.upsert_guardians(self.school.id, [carla])
+
+        links = StudentGuardian.objects.filter(guardian__school=self.school)
+        self.assertEqual(
+            {(link.student.siga_id, link.parentesco, link.prioridade) for link in links},
+            {('11', 'mae', 1), ('12', 'responsavel_principal', 3)},
+        )
+
+    def test_resync_updates_and_removes(self):
+        SigaMirrorService.upsert_guardians(self.school.id, self.guardians)
+
+        updated = [{**self.guardians[0], 'nome': 'Maria S. Souza'}, self.guardians[1]]
+        result = SigaMirrorService.upsert_guardians(self.school.id, updated)
+
+        self.assertEqual(result['removed_guardians'], 1)
+        self.assertEqual(result['removed_students'], 1)
+        self.assertEqual(Guardian.objects.filter(school=self.school).count(), 2)
+        self.assertFalse(Student.objects.filter(school=self.school, siga_id='11').exists())
+        self.assertEqual(
+            GuardianMirrorSelector.get_payload(self.school.id, 1)['nome'], 'Maria S. Souza'
+        )
+
+    def test_repeated_or_swapped_matricula_does_not_break_sync(self):
+        SigaMirrorService.upsert_guardians(self.school.id, self.guardians)
+
+        trocados = [
+            _guardian(1, 'Maria Souza', filhos=[(10, 'Ana Souza')]),
+            _guardian(3, 'Carla Lima', filhos=[(11, 'Pedro Lima'), (12, 'Bia Lima')]),
+        ]
+        trocados[0]['filhos'][0]['matricula'] = 'M11'
+        trocados[1]['filhos'][0]['matricula'] = 'M10'
+        trocados[1]['filhos'][1]['matricula'] = 'M10'
+        SigaMirrorService.upsert_guardians(self.school.id, trocados)
+
+        self.assertEqual(
+            Student.objects.get(school=self.school, siga_id='10').matricula, 'M11'
+        )
+        self.assertEqual(
+            Student.objects.filter(school=self.school, matricula='M10').count(), 2
+        )
+
+    def test_selector_filters_and_ordering(self):
+        SigaMirrorService.upsert_guardians(self.school.id, self.guardians)
+
+        def ids(qs):
+            return [int(i) for i in qs.values_list('siga_id', flat=True)]
+
+        search = GuardianMirrorSelector.filter_by_search
+        self.assertEqual(sorted(ids(search(self._qs(), 'souza'))), [1, 2])
+        self.assertEqual(ids(search(self._qs(), 'pedro')), [3])
+        self.assertEqual(ids(search(self._qs(), '456.789')), [1])
+        self.assertEqual(ids(search(self._qs(), 'joao@mail')), [2])
+        # Sem acento/caixa, como a busca em memória
+        self.assertEqual(ids(search(self._qs(), 'joao')), [2])
+        self.assertEqual(ids(search(self._qs(), 'JOÃO SOUZA')), [2])
+        self.assertEqual(ids(search(self._qs(), 'sao paulo')), [])
+
+        self.assertEqual(ids(GuardianMirrorSelector.filter_by_cpf(self._qs(), '123.456.789-01')), [1])
+        self.assertEqual(
+            ids(GuardianMirrorSelector.filter_by_status_financeiro(self._qs(), 'inadimplente')), [1]
+        )
+        self.assertEqual(
+            sorted(ids(GuardianMirrorSelector.filter_by_status_financeiro(self._qs(), 'em_dia'))), [2, 3]
+        )
+        self.assertEqual(ids(GuardianMirrorSelector.filter_by_docs_completos(self._qs(), True)), [2])
+
+        self.assertEqual(ids(GuardianMirrorSelector.order_by(self._qs(), 'nome')), [3, 2, 1])
+        self.assertEqual(ids(GuardianMirrorSelector.order_by(self._qs(), '-nome')), [1, 2, 3])
+
+    def test_migration_backfills_busca_of_existing_rows(self):
+        SigaMirrorService.upsert_guardians(self.school.id, self.guardians)
+        Guardian.objects.update(busca='')
+
+        migration = import_module('apps.contacts.migrations.0005_backfill_guardian_busca')
+        migration.backfill_busca(apps, None)
+
+        joao = GuardianMirrorSelector.filter_by_search(self._qs(), 'joao souza')
+        self.assertEqual(list(joao.values_list('siga_id', flat=True)), ['2'])
+
+    def test_read_mode(self):
+        self.assertFalse(SigaMirrorService.should_read(self.school.id))
+
+        SigaMirrorService.upsert_guardians(self.school.id, self.guardians)
+        self.assertFalse(SigaMirrorService.should_read(self.school.id))
+
+        with override_settings(GUARDIANS_READ_MODE='database'):
+            self.assertTrue(SigaMirrorService.should_read(self.school.id))
@@ -0,0 +1,76 @@
+# apps/contacts/tests/test_siga_rate_limiter.py
+
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from apps.contacts.integrations.siga_client import SigaClient
+from apps.contacts.integrations.siga_rate_limiter import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    SigaRateLimited,
+    SigaRateLimiter,
+    get_current_priority,
+    siga_priority,
+)
+
+
+class SigaRateLimiterTestCase(SimpleTestCase):
+    """Token bucket por escola com faixas de prioridade."""
+
+    def _limiter(self, **kwargs):
+        defaults = {'rate': 1, 'burst': 4, 'background_reserve': 0.5, 'use_redis': False}
+        defaults.update(kwargs)
+        return SigaRateLimiter(**defaults)
+
+    def test_background_leaves_reserve_for_interactive(self):
+        limiter = self._limiter()
+
+        # Burst 4, reserva 2: background só consome 2 tokens
+        limiter.acquire('tok', PRIORITY_BACKGROUND, max_wait=0)
+        limiter.acquire('tok', PRIORITY_BACKGROUND, max_wait=0)
+        with self.assertRaises(SigaRateLimited):
+            limiter.acquire('tok', PRIORITY_BACKGROUND, max_wait=0)
+
+        # Interativas ainda passam sem esperar
+        self.assertEqual(limiter.acquire('tok', PRIORITY_INTERACTIVE, max_wait=0), 0)
+        self.assertEqual(limiter.acquire('tok', PRIORITY_INTERACTIVE, max_wait=0), 0)
+
+    def test_buckets_are_per_token(self):
+        limiter = self._limiter(burst=1)
+
+        limiter.acquire('school-a', max_wait=0)
+        with self.assertRaises(SigaRateLimited):
+            limiter.acquire('school-a', max_wait=0)
+
+        self.assertEqual(limiter.acquire('school-b', max_wait=0), 0)
+
+    def test_penalize_blocks_bucket(self):
+        limiter = self._limiter(rate=10, burst=10)
+
+        limiter.penalize('tok', retry_after=5)
+
+        with self.assertRaises(SigaRateLimited):
+            limiter.acquire('tok', max_wait=1)
+
+    def test_priority_context(self):
+        self.assertEqual(get_current_priority(), PRIORITY_INTERACTIVE)
+        with siga_priority(PRIORITY_BACKGROUND):
+            self.assertEqual(get_current_priority(), PRIORITY_BACKGROUND)
+        self.assertEqual(get_current_priority(), PRIORITY_INTERACTIVE)
+
+    def test_client_penalizes_bucket_on_429(self):
+        limiter = MagicMock()
+        limiter.acquire.return_value = 0
+        client = SigaClient(rate_limiter=limiter)
+
+        throttled = MagicMock(status_code=429, headers={'Retry-After': '2'})
+        ok = MagicMock(status_code=200, headers={})
+
+        with patch.object(client.session, 'get', side_effect=[throttled, ok]):
+            response = client.get('informacoes_boleto/', 'tok')
+
+        self.assertIs(response, ok)
+        limiter.penalize.assert_called_once_with('tok', 2.0)
+        self.assertEqual(limiter.acquire.call_count, 2)
+        self.assertEqual(client.pool_stats()['throttled_429'], 1)
@@ -0,0 +1,69 @@
+# apps/contacts/tests/test_siga_stream.py
+
+import json
+from unittest.mock import MagicMock
+
+from django.test import SimpleTestCase
+
+from apps.contacts.integrations.siga_stream import (
+    iter_json_array_records,
+    iter_siga_records,
+)
+
+
+def _chunks(payload, size=7):
+    body = json.dumps(payload, ensure_ascii=False).encode()
+    return [body[i:i + size] for i in range(0, len(body), size)]
+
+
+def _response(payload):
+    response = MagicMock()
+    response.iter_content.return_value = _chunks(payload)
+    return response
+
+
+class SigaStreamTestCase(SimpleTestCase):
+    """Parser incremental dos datasets SIGA."""
+
+    def test_array_records_across_chunk_boundaries(self):
+        payload = [
+            {'id': 1, 'nome': 'José Ávila', 'cpf': '1', 'extra': {'a': [1, 2]}},
+            {'id': 22, 'nome': 'Maria', 'cpf': None, 'extra': 'x' * 50},
+        ]
+
+        records = list(iter_json_array_records(_chunks(payload), fields=('id', 'nome')))
+
+        self.assertEqual(records, [
+            {'id': 1, 'nome': 'José Ávila'},
+            {'id': 22, 'nome': 'Maria'},
+        ])
+
+    def test_paginated_envelope_keeps_meta(self):
+        payload = {'count': 12345, 'next': 'http://x/?page=2', 'results': [{'id': 1}]}
+        meta = {}
+
+        records = list(iter_json_array_records(_chunks(payload, size=3), meta=meta))
+
+        self.assertEqual(records, [{'id': 1}])
+        self.assertEqual(meta, {'count': 12345, 'next': 'http://x/?page=2'})
+
+    def test_empty_and_malformed_payloads(self):
+        self.assertEqual(list(iter_json_array_records([b'[ ]'])), [])
+
+        with self.assertRaises(ValueError):
+            list(iter_json_array_records([b'[{"id": 1}, {"id": ']))
+
+    def test_follows_next_links(self):
+        client = MagicMock()
+        client.get.side_effect = [
+            _response({'next': 'page2', 'results': [{'id': 1, 'rg': 'x'}]}),
+            _response({'next': None, 'results': [{'id': 2, 'rg': 'y'}]}),
+        ]
+
+        records = list(iter_siga_records(client, 'lista/', 'tok', fields=('id',)))
+
+        self.assertEqual(records, [{'id': 1}, {'id': 2}])
+        self.assertEqual(
+            [c.args[0] for c in client.get.call_args_list], ['lista/', 'page2']
+        )
+        self.assertTrue(all(c.kwargs['stream'] for c in client.get.call_args_list))
@@ -0,0 +1,125 @@
+# apps/contacts/views/conditional.py
+"""
+GET condicional (ETag / If-None-Match) nas views com dados do SIGA.
+
+O front re-consulta lista, stats e detalhe de guardians (e o dashboard)
+a cada navegação; na maioria das vezes nada mudou. A ETag é forte e
+derivada das versões da escola no Redis (SigaCacheManager
+.get_etag_versions) + path + query params — calculada sem buscar nem
+serializar nada. If-None-Match igual → 304 sem corpo.
+
+As versões mudam em toda invalidação, rebuild da lista, crawl de
+boletos, boletos de aluno diferentes dos já cacheados e sincronização
+do espelho.
+
+A ETag também carrega um bucket de tempo (ETAG_MAX_AGE da view): o
+dado em cache vence no TTL soft e só é revalidado quando uma requisição
+o lê. Um cliente que sempre manda If-None-Match receberia 304 para
+sempre; virando o bucket, a próxima requisição é servida normalmente
+(e agenda a revalidação).
+
+Sem ETag quando:
+- o Redis está fora (versões desconhecidas)
+- a resposta usou cópia stale do SIGA (não deve ser revalidada como boa)
+- a resposta não é 200
+"""
+
+import hashlib
+import time
+from typing import Optional, Tuple
+
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from ..integrations.siga_cache_manager import SigaCacheManager
+
+
+def siga_etag(request, school_id: int, freshness: Tuple = ()) -> Optional[str]:
+    """
+    ETag forte da resposta para a escola, ou None sem versões no Redis.
+
+    freshness: valores que mudam com o tempo (ver SigaETagMixin.etag_freshness).
+    """
+    versions = SigaCacheManager.get_etag_versions(school_id)
+    if versions is None:
+        return None
+
+    query = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    raw = repr((school_id, versions, freshness, request.path, query))
+    return '"%s"' % hashlib.sha1(raw.encode()).hexdigest()
+
+
+def etag_matches(etag: str, if_none_match: str) -> bool:
+    """Comparação fraca do If-None-Match (RFC 9110): ignora o prefixo W/."""
+    for tag in parse_etags(if_none_match):
+        if tag == '*' or tag.removeprefix('W/') == etag:
+            return True
+    return False
+
+
+class SigaETagMixin:
+    """
+    ETag + 304 para views APIView/ViewSet com dados derivados do SIGA.
+
+    Na action, logo após validar a escola (antes de buscar dados):
+
+        not_modified = self.check_not_modified(request, school.id)
+        if not_modified:
+            return not_modified
+
+    A ETag calculada ali é anexada às respostas 200 em finalize_response
+    — recalculada se a própria requisição mudou as versões da escola
+    (boletos novos buscados no SIGA, rebuild da lista): senão o próximo
+    If-None-Match do cliente nunca bateria.
+    """
+
+    ETAG_CACHE_CONTROL = 'private, no-cache'
+
+    # Idade máxima (s) de uma ETag: em geral o menor TTL soft dos dados
+    # da resposta
+    ETAG_MAX_AGE = 1800
+
+    def etag_freshness(self) -> Tuple:
+        """Parte da ETag que muda com o tempo (bucket de ETAG_MAX_AGE)."""
+        return (int(time.time() // self.ETAG_MAX_AGE),)
+
+    def initial(self, request, *args, **kwargs):
+        self.siga_etag = None
+        self.siga_school_id = None
+        SigaCacheManager.start_staleness_tracking()
+        super().initial(request, *args, **kwargs)
+
+    def check_not_modified(self, request, school_id: int) -> Optional[Response]:
+        """304 se o If-None-Match bate com a ETag atual; senão None."""
+        self.siga_school_id = school_id
+        self.siga_etag = siga_etag(request, school_id, self.etag_freshness())
+        if self.siga_etag is None:
+            return None
+
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match and etag_matches(self.siga_etag, if_none_match):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return None
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        etag = getattr(self, 'siga_etag', None)
+        school_id = getattr(self, 'siga_school_id', None)
+        if etag and SigaCacheManager.versions_bumped(school_id):
+            etag = siga_etag(request, school_id, self.etag_freshness())
+        if (
+            etag
+            and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED)
+            and not SigaCacheManager.get_stale_datasets()
+        ):
+            response['ETag'] = etag
+            # Navegador guarda a resposta, mas revalida a cada uso
+            response['Cache-Control'] = self.ETAG_CACHE_CONTROL
+
+        return response
@@ -6,11 +6,13 @@ Fornece visão geral sobre:
 - Situação de boletos (pagos, pendentes, cancelados)
 - Completude de dados cadastrais dos responsáveis
 - KPIs gerais da escola
+
+Boletos vêm do armazém local (SigaInvoice, agregações SQL) quando o
+crawl é recente; senão são varridos no SIGA e gravados no armazém.
 """
 
 import logging
 from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
 from rest_framework.views import APIView
@@ -18,11 +20,17 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.utils import timezone
 from core.permissions import IsSchoolStaff
+from ..integrations.siga_cache_manager import SigaCacheManager
+from ..integrations.siga_client import get_siga_client
+from ..integrations.siga_fanout import SigaFanout
+from ..services.guardian_service import GuardianService
+from ..services.invoice_warehouse_service import InvoiceWarehouseService
+from .conditional import SigaETagMixin
 
 logger = logging.getLogger(__name__)
 
 
-class SchoolDashboardView(APIView):
+class SchoolDashboardView(SigaETagMixin, APIView):
     """
     GET /api/contacts/dashboard/
 
@@ -31,9 +39,18 @@ class SchoolDashboardView(APIView):
     - Completude cadastral (responsáveis)
     - KPIs gerais
 
+    ETag pelas versões da escola (SigaETagMixin): If-None-Match igual
+    → 304 sem consultar o SIGA. Alunos vêm ao vivo do SIGA e "vencidos"
+    depende da data: a ETag vale no máximo o TTL dos datasets de alunos
+    e muda na virada do dia.
+
     Permissões: IsSchoolStaff (Manager/Operator)
     """
     permission_classes = [IsSchoolStaff]
+    ETAG_MAX_AGE = SigaCacheManager.TTL_STUDENTS_GLOBAL
+
+    def etag_freshness(self):
+        return (*super().etag_freshness(), timezone.localdate().isoformat())
 
     def get(self, request):
         """GET /api/contacts/dashboard/"""
@@ -56,17 +73,17 @@ class SchoolDashboardView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+        not_modified = self.check_not_modified(request, school.id)
+        if not_modified:
+            return not_modified
+
         logger.info(f"📊 Buscando dashboard - Escola: {school.school_name}")
 
         try:
-            # Buscar dados em paralelo
-            headers = {
-                "Authorization": f"Bearer {school.application_token}",
-                "Content-Type": "application/json"
-            }
+            token = school.application_token
 
             # 1. Buscar alunos
-            students = self._fetch_students(headers)
+            students = self._fetch_students(token)
 
             if not students:
                 return Response({
@@ -76,93 +93,17 @@ class SchoolDashboardView(APIView):
                     "alunos": {"total": 0, "com_boletos": 0, "sem_boletos": 0}
                 })
 
-            # 2. Buscar boletos e analisar dados em paralelo
-            logger.info(f"📊 Analisando {len(students)} alunos...")
-
-            boletos_stats = {
-                'total': 0,
-                'abertos': 0,
-                'pagos': 0,
-                'cancelados': 0,
-                'vencidos': 0,
-                'valor_total': 0.0,
-                'valor_recebido': 0.0,
-                'valor_pendente': 0.0,
-            }
-
-            guardians_stats = {
-                'total_alunos': len(students),
-                'sem_cpf': 0,
-                'sem_email': 0,
-                'sem_telefone': 0,
-                'sem_dados_completos': 0,
-            }
-
-            alunos_com_boletos = 0
-
-            # Processar em paralelo (10 threads)
-            with ThreadPoolExecutor(max_workers=10) as executor:
-                futures = {
-                    executor.submit(self._process_student, student, headers): student
-                    for student in students
-                }
-
-                for future in as_completed(futures):
-                    try:
-                        result = future.result()
-
-                        if result:
-                            # Agregar estatísticas de boletos
-                            if result['invoices']:
-                                alunos_com_boletos += 1
-
-                                for inv in result['invoices']:
-                                    boletos_stats['total'] += 1
-
-                                    status_code = inv.get('situacao_titulo', '')
-                                    valor_doc = float(inv.get('valor_documento', 0) or 0)
-                                    valor_recebido = float(inv.get('valor_recebido_total', 0) or 0)
-                                    dt_venc = inv.get('dt_vencimento')
-
-                                    boletos_stats['valor_total'] += valor_doc
-
-                                    if status_code == 'LIQ':  # Liquidado/Pago
-                                        boletos_stats['pagos'] += 1
-                                        boletos_stats['valor_recebido'] += valor_recebido
-                                    elif status_code == 'CAN':  # Cancelado
-                                        boletos_stats['cancelados'] += 1
-                                    else:  # Aberto
-                                        boletos_stats['abertos'] += 1
-                                        boletos_stats['valor_pendente'] += valor_doc
-
-                                        # Verificar se está vencido
-                                        if dt_venc:
-                                            try:
-                                                venc = datetime.fromisoformat(dt_venc.replace('Z', '+00:00'))
-                                                if venc.date() < timezone.now().date():
-                                                    boletos_stats['vencidos'] += 1
-                                            except:
-                                                pass
-
-                            # Agregar estatísticas cadastrais
-                            guardian_data = result.get('guardian_data', {})
-                            if guardian_data:
-                                if not guardian_data.get('cpf'):
-                                    guardians_stats['sem_cpf'] += 1
-                                if not guardian_data.get('email'):
-                                    guardians_stats['sem_email'] += 1
-                                if not guardian_data.get('telefone'):
-                                    guardians_stats['sem_telefone'] += 1
-
-                                # Dados incompletos: falta pelo menos 1 campo
-                                if not (guardian_data.get('cpf') and
-                                        guardian_data.get('email') and
-                                        guardian_data.get('telefone')):
-                                    guardians_stats['sem_dados_completos'] += 1
-
-                    except Exception as e:
-                        logger.error(f"Erro ao processar aluno: {e}")
-                        continue
+            # 2. Estatísticas de boletos e cadastro: armazém local (SQL) se
+            #    o crawl for recente, senão varredura no SIGA
+            if InvoiceWarehouseService.is_fresh(school.id):
+                logger.info(f"📊 Usando armazém de boletos ({len(students)} alunos)")
+                boletos_stats, guardians_stats, alunos_com_boletos = (
+                    self._stats_from_warehouse(school, students)
+                )
+            else:
+                boletos_stats, guardians_stats, alunos_com_boletos = (
+                    self._stats_from_siga(school, students, token)
+                )
 
             # 3. Calcular métricas derivadas
             taxa_inadimplencia = 0.0
@@ -256,15 +197,173 @@ class SchoolDashboardView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
-    def _fetch_students(self, headers):
+    def _stats_from_siga(self, school, students, token):
+        """
+        Busca boletos de cada aluno no SIGA (fan-out) e agrega em memória.
+
+        Os boletos varridos alimentam o armazém local (SigaInvoice).
+        """
+        logger.info(f"📊 Analisando {len(students)} alunos...")
+
+        boletos_stats = {
+            'total': 0,
+            'abertos': 0,
+            'pagos': 0,
+            'cancelados': 0,
+            'vencidos': 0,
+            'valor_total': 0.0,
+            'valor_recebido': 0.0,
+            'valor_pendente': 0.0,
+        }
+
+        guardians_stats = {
+            'total_alunos': len(students),
+            'sem_cpf': 0,
+            'sem_email': 0,
+            'sem_telefone': 0,
+            'sem_dados_completos': 0,
+        }
+
+        alunos_com_boletos = 0
+        crawled = {}
+
+        # Processar em paralelo (fan-out compartilhado)
+        fanout = SigaFanout()
+        for item in fanout.iter_completed(
+            lambda student: self._process_student(student, token), students
+        ):
+            if not item.ok:
+                logger.error(f"Erro ao processar aluno: {item.error}")
+                continue
+
+            try:
+                result = item.value
+
+                if result:
+                    # Agregar estatísticas de boletos
+                    if result['invoices']:
+                        alunos_com_boletos += 1
+
+                        for inv in result['invoices']:
+                            boletos_stats['total'] += 1
+
+                            status_code = inv.get('situacao_titulo', '')
+                            valor_doc = float(inv.get('valor_documento', 0) or 0)
+                            valor_recebido = float(inv.get('valor_recebido_total', 0) or 0)
+                            dt_venc = inv.get('dt_vencimento')
+
+                            boletos_stats['valor_total'] += valor_doc
+
+                            if status_code == 'LIQ':  # Liquidado/Pago
+                                boletos_stats['pagos'] += 1
+                                boletos_stats['valor_recebido'] += valor_recebido
+                            elif status_code == 'CAN':  # Cancelado
+                                boletos_stats['cancelados'] += 1
+                            else:  # Aberto
+                                boletos_stats['abertos'] += 1
+                                boletos_stats['valor_pendente'] += valor_doc
+
+                                # Verificar se está vencido
+                                if dt_venc:
+                                    try:
+                                        venc = datetime.fromisoformat(dt_venc.replace('Z', '+00:00'))
+                                        if venc.date() < timezone.now().date():
+                                            boletos_stats['vencidos'] += 1
+                                    except:
+                                        pass
+
+                    # Agregar estatísticas cadastrais
+                    self._count_guardian_data(
+                        guardians_stats, result.get('guardian_data', {})
+                    )
+
+                    if result.get('fetched'):
+                        crawled[item.item['id']] = result['invoices']
+
+            except Exception as e:
+                logger.error(f"Erro ao processar aluno: {e}")
+                continue
+
+        # Alimentar o armazém local (próximos dashboards em SQL)
+        try:
+            InvoiceWarehouseService.upsert_student_invoices(
+                school.id,
+                crawled,
+                all_student_ids=[s['id'] for s in students if s.get('id')],
+            )
+            # Rollups na lista em background: o GET não espera o lock dela
+            GuardianService.schedule_invoice_rollups(school.id)
+        except Exception as e:
+            logger.error(f"Erro ao gravar armazém de boletos: {e}")
+
+        return boletos_stats, guardians_stats, alunos_com_boletos
+
+    def _stats_from_warehouse(self, school, students):
+        """Mesmas estatísticas, com agregações SQL sobre SigaInvoice."""
+        boletos_stats = InvoiceWarehouseService.school_totals(school.id)
+        cpf_por_aluno = InvoiceWarehouseService.students_with_invoices(school.id)
+
+        guardians_stats = {
+            'total_alunos': len(students),
+            'sem_cpf': 0,
+            'sem_email': 0,
+            'sem_telefone': 0,
+            'sem_dados_completos': 0,
+        }
+
+        alunos_com_boletos = 0
+
+        for student in students:
+            student_id = student.get('id')
+            if not student_id:
+                continue
+
+            if student_id in cpf_por_aluno:
+                alunos_com_boletos += 1
+                # Dados do pagador do boleto (SIGA não retorna email/telefone)
+                guardian_data = {
+                    'cpf': cpf_por_aluno[student_id],
+                    'email': None,
+                    'telefone': None,
+                }
+            else:
+                guardian_data = {
+                    'cpf': student.get('cpf_responsavel'),
+                    'email': student.get('email_responsavel'),
+                    'telefone': student.get('telefone_responsavel'),
+                }
+
+            self._count_guardian_data(guardians_stats, guardian_data)
+
+        return boletos_stats, guardians_stats, alunos_com_boletos
+
+    def _count_guardian_data(self, guardians_stats, guardian_data):
+        """Acumula campos cadastrais faltantes de um responsável"""
+        if not guardian_data:
+            return
+
+        if not guardian_data.get('cpf'):
+            guardians_stats['sem_cpf'] += 1
+        if not guardian_data.get('email'):
+            guardians_stats['sem_email'] += 1
+        if not guardian_data.get('telefone'):
+            guardians_stats['sem_telefone'] += 1
+
+        # Dados incompletos: falta pelo menos 1 campo
+        if not (guardian_data.get('cpf') and
+                guardian_data.get('email') and
+                guardian_data.get('telefone')):
+            guardians_stats['sem_dados_completos'] += 1
+
+    def _fetch_students(self, token):
         """Busca lista de alunos da API SIGA"""
-        url = "https://siga.activesoft.com.br/api/v0/lista_alunos_dados_sensiveis/"
+        client = get_siga_client()
 
         all_students = []
-        next_url = url
+        next_url = "lista_alunos_dados_sensiveis/"
 
         while next_url:
-            response = requests.get(next_url, headers=headers, timeout=30)
+            response = client.get(next_url, token, timeout=30)
             response.raise_for_status()
             data = response.json()
 
@@ -279,7 +378,7 @@ class SchoolDashboardView(APIView):
 
         return all_students
 
-    def _process_student(self, student, headers):
+    def _process_student(self, student, token):
         """Processa um aluno: busca boletos e dados cadastrais"""
         student_id = student.get('id')
 
@@ -288,14 +387,15 @@ class SchoolDashboardView(APIView):
 
         result = {
             'invoices': [],
-            'guardian_data': {}
+            'guardian_data': {},
+            'fetched': False,
         }
 
         try:
             # Buscar boletos
-            r = requests.get(
-                "https://siga.activesoft.com.br/api/v0/informacoes_boleto/",
-                headers=headers,
+            r = get_siga_client().get(
+                "informacoes_boleto/",
+                token,
                 params={'id_aluno': student_id},
                 timeout=10
             )
@@ -303,6 +403,7 @@ class SchoolDashboardView(APIView):
             if r.status_code == 200:
                 data = r.json()
                 result['invoices'] = data.get('resultados', [])
+                result['fetched'] = True
 
                 # Extrair dados do responsável (vem no primeiro boleto)
                 if result['invoices']:
@@ -34,6 +34,7 @@ NÃO FAZ:
 """
 
 import logging
+from django.http import HttpResponse
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -41,18 +42,24 @@ from rest_framework.pagination import PageNumberPagination
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiResponse
 
 from core.permissions import IsSchoolStaff
+from core.renderers import FastJSONRenderer
 from core.mixins import SigaIntegrationMixin
+from ..integrations.siga_cache_manager import SigaCacheManager
 from ..services.guardian_service import GuardianService
 from ..services.invoice_service import InvoiceService
+from ..services.siga_mirror_service import SigaMirrorService
 from ..selectors.guardian_selectors import GuardianSelector
+from ..selectors.guardian_mirror_selectors import GuardianMirrorSelector
 from ..serializers.guardian_serializers import (
     GuardianListSerializer,
     GuardianDetailSerializer,
+    render_guardian_cards,
 )
 from ..serializers.invoice_serializers import (
     GuardianInvoicesResponseSerializer,
     GuardianStatsSerializer,
 )
+from .conditional import SigaETagMixin
 
 logger = logging.getLogger(__name__)
 
@@ -67,17 +74,34 @@ class GuardianPagination(PageNumberPagination):
     page_size_query_param = 'page_size'
     max_page_size = 50
 
+    def get_paginated_json(self, results) -> HttpResponse:
+        """
+        Mesmo corpo de get_paginated_response, com results já em JSON
+        (bytes de cada card): concatenação, sem passar pelo renderer.
+        """
+        head = FastJSONRenderer().render({
+            'count': self.page.paginator.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+        })
+        body = head[:-1] + b',"results":[' + b','.join(results) + b']}'
+        return HttpResponse(body, content_type='application/json')
+
 
 # =====================================================================
 # VIEWSET
 # =====================================================================
 
-class GuardianViewSet(SigaIntegrationMixin, viewsets.ViewSet):
+class GuardianViewSet(SigaETagMixin, SigaIntegrationMixin, viewsets.ViewSet):
     """
     ViewSet para Guardians (Responsáveis).
 
-    Sistema stateless — dados vêm da API SIGA, não do banco local.
-    Usa cache Redis para performance.
+    Dados vêm da API SIGA, com cache Redis para performance. Com
+    GUARDIANS_READ_MODE='database', a listagem/detalhe leem do espelho
+    local (SigaMirrorService) quando a escola já foi sincronizada.
+
+    GETs respondem com ETag; If-None-Match igual → 304 sem buscar nem
+    serializar (SigaETagMixin).
 
     Permissões: IsSchoolStaff (managers e operators).
     """
@@ -85,6 +109,28 @@ class GuardianViewSet(SigaIntegrationMixin, viewsets.ViewSet):
     permission_classes = [IsSchoolStaff]
     pagination_class = GuardianPagination
 
+    # Header com os datasets servidos da cópia stale (SIGA indisponível)
+    STALE_HEADER = 'X-Siga-Stale'
+
+    # ETag vale no máximo o TTL soft dos boletos (o menor entre lista,
+    # detalhe e boletos)
+    ETAG_MAX_AGE = SigaCacheManager.TTL_INVOICES
+
+    # -----------------------------------------------------------------
+    # CICLO DA REQUISIÇÃO
+    # -----------------------------------------------------------------
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        """Marca respostas montadas com dados stale do SIGA."""
+        response = super().finalize_response(request, response, *args, **kwargs)
+
+        stale = SigaCacheManager.get_stale_datasets()
+        if stale:
+            response[self.STALE_HEADER] = ','.join(stale)
+            response['Warning'] = '110 - "Response is Stale"'
+
+        return response
+
     # -----------------------------------------------------------------
     # HELPERS INTERNOS
     # -----------------------------------------------------------------
@@ -105,16 +151,24 @@ class GuardianViewSet(SigaIntegrationMixin, viewsets.ViewSet):
 
         return school, school.application_token, None
 
-    def _paginate(self, request, data):
+    def _paginate_cards(self, request, school_id, guardians, all_guardians):
         """
-        Aplica paginação a uma lista de dicts.
+        Pagina a lista de dicts ANTES de serializar: só os cards da
+        página entram na resposta, já em JSON (GuardianService
+        .get_guardian_cards). Card ausente é serializado na hora.
 
         Returns:
-            Response paginada
+            Resposta paginada
         """
         paginator = self.pagination_class()
-        page = paginator.paginate_queryset(data, request)
-        return paginator.get_paginated_response(page)
+        page = paginator.paginate_queryset(guardians, request)
+        cards = GuardianService.get_guardian_cards(school_id, all_guardians)
+
+        missing = [g for g in page if g.get('id') not in cards]
+        if missing:
+            cards = {**cards, **render_guardian_cards(missing)}
+
+        return paginator.get_paginated_json([cards[g.get('id')] for g in page])
 
     # -----------------------------------------------------------------
     # LIST — GET /api/v1/contacts/guardians/
@@ -190,6 +244,10 @@ class GuardianViewSet(SigaIntegrationMixin, viewsets.ViewSet):
         if error:
             return error
 
+        not_modified = self.check_not_modified(request, school.id)
+        if not_modified:
+            return not_modified
+
         # 2. Extrair query params
         search = request.query_params.get('search', '').strip()
         cpf = request.query_params.get('cpf', '').strip()
@@ -198,15 +256,25 @@ class GuardianViewSet(SigaIntegrationMixin, viewsets.ViewSet):
         ordering = request.query_params.get('ordering', 'nome').strip()
 
         try:
+            # Espelho local: filtros/ordenação/paginação em SQL
+            if SigaMirrorService.should_read(school.id):
+                return self._list_from_mirror(
+                    request, school.id, search, cpf,
+                    status_financeiro, docs_completos, ordering,
+                )
+
             # 3. Buscar guardians (com cache via service)
-            guardians = GuardianService.get_guardians_list(
+            all_guardians = guardians = GuardianService.get_guardians_list(
                 school_id=school.id,
                 token=token,
             )
 
             # 4. Aplicar filtros
             if search:
-                guardians = GuardianSelector.filter_by_search(guardians, search)
+                guardians = GuardianSelector.filter_by_search(
+                    guardians, search,
+                    index=GuardianService.get_search_index(school.id, guardians),
+                )
 
             if cpf:
                 guardians = GuardianSelector.filter_by_cpf(guardians, cpf)
@@ -225,11 +293,8 @@ class GuardianViewSet(SigaIntegrationMixin, viewsets.ViewSet):
             # 5. Ordenar
             guardians = GuardianSelector.order_by(guardians, ordering)
 
-            # 6. Serializar
-            serializer = GuardianListSerializer(guardians, many=True)
-
-            # 7. Paginar e retornar
-            return self._paginate(request, serializer.data)
+            # 6. Paginar e retornar (cards pré-serializados da página)
+            return self._paginate_cards(request, school.id, guardians, all_guardians)
 
         except Exception as e:
             logger.exception(f"Erro ao listar guardians: {e}")
@@ -238,6 +303,43 @@ class GuardianViewSet(SigaIntegrationMixin, viewsets.ViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+    def _list_from_mirror(
+        self, request, school_id, search, cpf,
+        status_financeiro, docs_completos, ordering,
+    ):
+        """
+        Listagem a partir do espelho local.
+
+        Só a página pedida sai do banco e é serializada.
+        """
+        queryset = GuardianMirrorSelector.for_school(school_id)
+
+        if search:
+            queryset = GuardianMirrorSelector.filter_by_search(queryset, search)
+
+        if cpf:
+            queryset = GuardianMirrorSelector.filter_by_cpf(queryset, cpf)
+
+        if status_financeiro and status_financeiro != 'todos':
+            queryset = GuardianMirrorSelector.filter_by_status_financeiro(
+                queryset, status_financeiro
+            )
+
+        if docs_completos:
+            is_completo = docs_completos.lower() in ('true', '1', 'sim')
+            queryset = GuardianMirrorSelector.filter_by_docs_completos(
+                queryset, is_completo
+            )
+
+        queryset = GuardianMirrorSelector.order_by(queryset, ordering)
+
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(
+            queryset.values_list('siga_payload', flat=True), request
+        )
+        serializer = GuardianListSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
     # -----------------------------------------------------------------
     # RETRIEVE — GET /api/v1/contacts/guardians/{id}/
     # -----------------------------------------------------------------
@@ -286,6 +388,10 @@ class GuardianViewSet(SigaIntegrationMixin, viewsets.ViewSet):
         if error:
             return error
 
+        not_modified = self.check_not_modified(request, school.id)
+        if not_modified:
+            return not_modified
+
         # 2. Validar ID
         try:
             guardian_id = int(pk)
@@ -376,6 +482,10 @@ class GuardianViewSet(SigaIntegrationMixin, viewsets.ViewSet):
         if error:
             return error
 
+        not_modified = self.check_not_modified(request, school.id)
+        if not_modified:
+            return not_modified
+
         # 2. Validar ID
         try:
             guardian_id = int(pk)
@@ -445,6 +555,10 @@ class GuardianViewSet(SigaIntegrationMixin, viewsets.ViewSet):
         if error:
             return error
 
+        not_modified = self.check_not_modified(request, school.id)
+        if not_modified:
+            return not_modified
+
         try:
             # 2. Buscar stats via service
             stats_data = GuardianService.get_stats(
@@ -495,6 +609,10 @@ class GuardianViewSet(SigaIntegrationMixin, viewsets.ViewSet):
 
             logger.info(f"Cache invalidado para escola {school.id}")
 
+            # 3. Re-sincronizar espelho local em background
+            if SigaMirrorService.read_enabled():
+                SigaMirrorService.schedule_sync(school.id, token)
+
             return Response({
                 "message": "Cache invalidado. Os dados serão atualizados na próxima consulta.",
                 "school_id": school.id,
@@ -10,6 +10,7 @@ from django.views.decorators.cache import cache_page
 import requests
 
 from core.permissions import IsSchoolStaff
+from ..integrations.siga_cache_manager import SigaCacheManager
 from ..services.siga_integration_service import SigaIntegrationService
 from ..services.guardian_aggregator_service import GuardianAggregatorService
 from ..serializers.guardian_serializers import GuardianDetailSerializer
@@ -68,10 +69,11 @@ class StudentGuardianView(APIView):
         token = school.application_token
         search_query = request.query_params.get('search', '').strip()
 
-        # Cache key (diferente por escola e search)
+        # Cache key (diferente por escola e search; namespace da geração)
         cache_key = f"guardians:school:{school.id}"
         if search_query:
             cache_key += f":search:{search_query}"
+        cache_key = SigaCacheManager.school_key(school.id, cache_key)
 
         # Tentar buscar do cache
         cached_data = cache.get(cache_key)
@@ -2,63 +2,66 @@
 # VERSÃO CORRIGIDA - Funciona SEM Redis (usa cache local como fallback)
 
 import logging
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from datetime import datetime, timedelta
+from datetime import datetime
 
 import requests
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from django.core.cache import cache
 from django.utils import timezone
 from core.permissions import IsSchoolStaff
+from ..integrations.cache_codec import decode_cache_value, encode_cache_value
+from ..integrations.cache_guard import CacheUnavailable, guarded_cache
+from ..integrations.local_cache import redis_fallback
+from ..integrations.siga_cache_manager import SigaCacheManager
+from ..integrations.siga_client import get_siga_client
+from ..integrations.siga_fanout import SigaFanout
 
 logger = logging.getLogger(__name__)
 
 # ========================================
 # CACHE LOCAL (fallback quando Redis não está disponível)
 # ========================================
-_local_cache = {}
-_local_cache_timeout = {}
+# redis_fallback: LRU do processo limitado em entradas, bytes e TTL,
+# compartilhado com o SigaCacheManager (ver local_cache)
 
 
 def get_from_cache(key):
     """Tenta pegar do Redis, se falhar usa cache local"""
     try:
         # Tentar Redis primeiro
-        data = cache.get(key)
+        data = decode_cache_value(guarded_cache.get(key))
         if data:
             logger.info(f"✓ Dados recuperados do Redis cache")
             return data
+    except CacheUnavailable:
+        pass
     except Exception as e:
         logger.warning(f"Redis indisponível: {str(e)[:100]}")
 
-    # Fallback: cache local
-    if key in _local_cache:
-        if key in _local_cache_timeout:
-            if timezone.now() < _local_cache_timeout[key]:
-                logger.info(f"✓ Dados recuperados do cache local (fallback)")
-                return _local_cache[key]
-            else:
-                # Expirou
-                del _local_cache[key]
-                del _local_cache_timeout[key]
-
-    return None
+    # Fallback: cache local (entradas vencidas já foram descartadas)
+    data = decode_cache_value(redis_fallback.get(key))
+    if data:
+        logger.info(f"✓ Dados recuperados do cache local (fallback)")
+    return data
 
 
 def set_in_cache(key, value, timeout=3600):
     """Tenta salvar no Redis, se falhar usa cache local"""
+    encoded = encode_cache_value(value)
     try:
         # Tentar Redis primeiro
-        cache.set(key, value, timeout=timeout)
+        guarded_cache.set(key, encoded, timeout=timeout)
         logger.info(f"💾 Dados salvos no Redis cache")
     except Exception as e:
         logger.warning(f"Redis indisponível, usando cache local: {str(e)[:100]}")
-        # Fallback: cache local
-        _local_cache[key] = value
-        _local_cache_timeout[key] = timezone.now() + timedelta(seconds=timeout)
-        logger.info(f"💾 Dados salvos no cache local (fallback por {timeout}s)")
+        # Fallback: cache local (valor codificado — tamanho real no orçamento)
+        redis_fallback.set(key, encoded, ttl=timeout)
+        stats = redis_fallback.stats()
+        logger.info(
+            f"💾 Dados salvos no cache local (fallback por {timeout}s) — "
+            f"{stats['entries']} entradas, {stats['bytes'] / 1024 / 1024:.1f}MB"
+        )
 
 
 class StudentInvoiceView(APIView):
@@ -111,7 +114,7 @@ class StudentInvoiceView(APIView):
         # ========================================
         # 2. VERIFICAR CACHE (com fallback local)
         # ========================================
-        cache_key = f"all_invoices_school_{school.id}"
+        cache_key = SigaCacheManager.school_key(school.id, f"all_invoices_school_{school.id}")
         cached_data = get_from_cache(cache_key)
 
         if cached_data:
@@ -219,52 +222,44 @@ class StudentInvoiceView(APIView):
         # ========================================
         # 2. BUSCAR BOLETOS EM PARALELO
         # ========================================
-        logger.info(f"💰 Buscando boletos de {len(students)} alunos (paralelizado em 10 threads)...")
+        logger.info(f"💰 Buscando boletos de {len(students)} alunos (fan-out paralelo)...")
 
         all_invoices = []
         students_with_data = []
         error_count = 0
 
-        headers = {
-            "Authorization": f"Bearer {school.application_token}",
-            "Content-Type": "application/json"
-        }
-
-        # ✅ PARALELIZAÇÃO: 10 requisições simultâneas
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            # Criar futures para cada aluno
-            future_to_student = {
-                executor.submit(
-                    self._fetch_student_invoices,
-                    student,
-                    headers
-                ): student
-                for student in students
-            }
-
-            # Processar resultados conforme completam
-            for idx, future in enumerate(as_completed(future_to_student), 1):
-                student = future_to_student[future]
-
-                # Log de progresso a cada 50 alunos
-                if idx % 50 == 0:
-                    logger.info(f"  Progresso: {idx}/{len(students)} alunos processados...")
-
-                try:
-                    result = future.result()
-
-                    # ✅ CORREÇÃO: Sempre adiciona o aluno (mesmo sem boletos)
-                    if result:
-                        students_with_data.append(result['student_data'])
-                        all_invoices.extend(result['invoices'])
-                    else:
-                        error_count += 1
-
-                except Exception as exc:
-                    error_count += 1
-                    student_id = student.get('id', 'N/A')
-                    student_name = student.get('nome', 'N/A')
-                    logger.error(f"❌ Erro ao buscar boletos do aluno {student_id} ({student_name}): {exc}")
+        token = school.application_token
+
+        # ✅ PARALELIZAÇÃO: fan-out compartilhado (concorrência limitada)
+        fanout = SigaFanout()
+        for idx, item in enumerate(
+            fanout.iter_completed(
+                lambda student: self._fetch_student_invoices(student, token),
+                students,
+            ),
+            1,
+        ):
+            student = item.item
+
+            # Log de progresso a cada 50 alunos
+            if idx % 50 == 0:
+                logger.info(f"  Progresso: {idx}/{len(students)} alunos processados...")
+
+            if not item.ok:
+                error_count += 1
+                student_id = student.get('id', 'N/A')
+                student_name = student.get('nome', 'N/A')
+                logger.error(f"❌ Erro ao buscar boletos do aluno {student_id} ({student_name}): {item.error}")
+                continue
+
+            result = item.value
+
+            # ✅ CORREÇÃO: Sempre adiciona o aluno (mesmo sem boletos)
+            if result:
+                students_with_data.append(result['student_data'])
+                all_invoices.extend(result['invoices'])
+            else:
+                error_count += 1
 
         # Log de erros
         if error_count > 0:
@@ -293,7 +288,7 @@ class StudentInvoiceView(APIView):
             'last_updated': timezone.now().isoformat(),
         }
 
-    def _fetch_student_invoices(self, student, headers):
+    def _fetch_student_invoices(self, student, token):
         """
         Busca boletos de UM aluno (para execução paralela)
 
@@ -308,10 +303,11 @@ class StudentInvoiceView(APIView):
             return None
 
         try:
-            url = "https://siga.activesoft.com.br/api/v0/informacoes_boleto/"
             params = {'id_aluno': student_id}
 
-            response = requests.get(url, headers=headers, params=params, timeout=10)
+            response = get_siga_client().get(
+                "informacoes_boleto/", token, params=params, timeout=10
+            )
             response.raise_for_status()  # Levanta exceção se status != 200
 
             data = response.json()
@@ -409,18 +405,14 @@ class StudentInvoiceView(APIView):
 
         Mantém paginação e tratamento de diferentes formatos de resposta
         """
-        url = "https://siga.activesoft.com.br/api/v0/lista_alunos_dados_sensiveis/"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
+        client = get_siga_client()
 
         all_students = []
-        next_url = url
+        next_url = "lista_alunos_dados_sensiveis/"
 
         try:
             while next_url:
-                response = requests.get(next_url, headers=headers, timeout=30)
+                response = client.get(next_url, token, timeout=30)
                 response.raise_for_status()
                 data = response.json()
 
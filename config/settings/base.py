@@ -4,6 +4,7 @@ VERSÃO CORRIGIDA COM WHITENOISE
 """
 import os
 from pathlib import Path
+from corsheaders.defaults import default_headers
 from decouple import config
 
 # Build paths
@@ -151,8 +152,14 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # JSON via orjson (mesma saída do JSONRenderer; ver core/renderers.py)
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'core.renderers.FastJSONRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
@@ -173,6 +180,12 @@ CORS_ALLOWED_ORIGINS = config(
 
 CORS_ALLOW_CREDENTIALS = True
 
+# Marcador de dados desatualizados (SIGA indisponível) visível no front
+CORS_EXPOSE_HEADERS = ['X-Siga-Stale', 'Warning', 'ETag']
+
+# GET condicional nas views do SIGA (If-None-Match → 304)
+CORS_ALLOW_HEADERS = (*default_headers, 'if-none-match')
+
 # ===================================================================
 # LOGGING CONFIGURATION
 # ===================================================================
@@ -280,3 +293,74 @@ CACHES = {
 CELERY_BROKER_URL = os.getenv('REDIS_URL', REDIS_URL)
 CELERY_RESULT_BACKEND = os.getenv('REDIS_URL', REDIS_URL)
 CELERY_ACCEPT_CONTENT = ['json']
+
+# ===================================================================
+# SIGA (integração ActiveSoft)
+# ===================================================================
+# Pool de conexões keep-alive do cliente HTTP compartilhado.
+# POOL_MAXSIZE deve acompanhar a concorrência do fan-out de boletos.
+SIGA_HTTP_POOL_CONNECTIONS = config('SIGA_HTTP_POOL_CONNECTIONS', default=4, cast=int)
+SIGA_HTTP_POOL_MAXSIZE = config('SIGA_HTTP_POOL_MAXSIZE', default=32, cast=int)
+
+# Fan-out de boletos (uma chamada informacoes_boleto por aluno).
+# CONCURRENCY: chamadas simultâneas por fan-out; MAX_THREADS: threads de
+# I/O compartilhadas pelo processo inteiro (todas as views/commands).
+SIGA_FANOUT_CONCURRENCY = config('SIGA_FANOUT_CONCURRENCY', default=32, cast=int)
+SIGA_FANOUT_MAX_THREADS = config('SIGA_FANOUT_MAX_THREADS', default=32, cast=int)
+SIGA_FANOUT_CALL_TIMEOUT = config('SIGA_FANOUT_CALL_TIMEOUT', default=15, cast=int)
+
+# Rate limit por escola (token bucket no Redis, compartilhado por
+# gunicorn, Celery e Ofelia). BACKGROUND_RESERVE: fração do burst que
+# crawls em background não podem consumir (fica para requisições de usuário).
+SIGA_RATE_LIMIT_ENABLED = config('SIGA_RATE_LIMIT_ENABLED', default=True, cast=bool)
+SIGA_RATE_LIMIT_PER_SECOND = config('SIGA_RATE_LIMIT_PER_SECOND', default=10.0, cast=float)
+SIGA_RATE_LIMIT_BURST = config('SIGA_RATE_LIMIT_BURST', default=20, cast=int)
+SIGA_RATE_LIMIT_BACKGROUND_RESERVE = config(
+    'SIGA_RATE_LIMIT_BACKGROUND_RESERVE', default=0.5, cast=float
+)
+
+# Circuit breaker por endpoint SIGA: após FAILURE_THRESHOLD falhas
+# consecutivas (timeout/conexão/5xx) as chamadas falham na hora e a API
+# serve a cópia stale do cache; uma sonda em background testa o endpoint
+# a cada RECOVERY_TIMEOUT segundos.
+SIGA_BREAKER_FAILURE_THRESHOLD = config('SIGA_BREAKER_FAILURE_THRESHOLD', default=5, cast=int)
+SIGA_BREAKER_RECOVERY_TIMEOUT = config('SIGA_BREAKER_RECOVERY_TIMEOUT', default=30, cast=int)
+
+# Fonte de leitura do GuardianViewSet: 'cache' (lista processada no
+# Redis) ou 'database' (espelho local sincronizado por
+# sync_siga_mirror_task; escolas ainda não sincronizadas usam o cache).
+GUARDIANS_READ_MODE = config('GUARDIANS_READ_MODE', default='cache')
+
+# Armazém local de boletos (SigaInvoice), gravado pelo crawl
+# sync_invoice_stats (a cada 1h). Estatísticas, dashboard e boletos por
+# responsável usam SQL enquanto o último crawl da escola tiver menos de
+# MAX_AGE segundos (0 desativa e volta a consultar o SIGA).
+INVOICE_WAREHOUSE_MAX_AGE = config('INVOICE_WAREHOUSE_MAX_AGE', default=7200, cast=int)
+
+# L1 em memória (por processo) na frente do Redis para a lista processada
+# de guardians. Invalidação entre workers pela versão da escola no Redis;
+# o TTL só limita a idade do valor se o Redis estiver fora.
+SIGA_LOCAL_CACHE_MAX_ENTRIES = config('SIGA_LOCAL_CACHE_MAX_ENTRIES', default=32, cast=int)
+SIGA_LOCAL_CACHE_TTL = config('SIGA_LOCAL_CACHE_TTL', default=300, cast=int)
+
+# Codec dos blobs SIGA no Redis (listas, datasets, boletos): 'pickle-zlib',
+# 'compact' (JSON com campos internados + zlib) ou 'pickle' (sem codec).
+# Ver `manage.py benchmark_cache_codec`.
+SIGA_CACHE_CODEC = config('SIGA_CACHE_CODEC', default='pickle-zlib')
+SIGA_CACHE_COMPRESSION_LEVEL = config('SIGA_CACHE_COMPRESSION_LEVEL', default=3, cast=int)
+
+# Fail fast do Redis: após N falhas seguidas o cache é ignorado (sem
+# esperar o timeout de conexão) por COOLDOWN segundos, com sonda em background
+SIGA_CACHE_FAILURE_THRESHOLD = config('SIGA_CACHE_FAILURE_THRESHOLD', default=3, cast=int)
+SIGA_CACHE_COOLDOWN = config('SIGA_CACHE_COOLDOWN', default=30, cast=int)
+
+# Fallback em memória quando o Redis está fora (por worker): limites de
+# entradas e de memória (MB) — mantém o RSS estável ao longo do --max-requests
+REDIS_FALLBACK_CACHE_MAX_ENTRIES = config('REDIS_FALLBACK_CACHE_MAX_ENTRIES', default=64, cast=int)
+REDIS_FALLBACK_CACHE_MAX_MB = config('REDIS_FALLBACK_CACHE_MAX_MB', default=64, cast=int)
+
+# Rebuild incremental da lista de guardians: remonta só responsáveis cujas
+# linhas SIGA (ou as dos filhos) mudaram desde o rebuild anterior. Um
+# rebuild completo é forçado após N segundos do último (0 desativa o
+# incremental).
+GUARDIANS_FULL_REBUILD_INTERVAL = config('GUARDIANS_FULL_REBUILD_INTERVAL', default=86400, cast=int)
@@ -10,7 +10,7 @@ ALLOWED_HOSTS = ['*']
 
 # Adicionar BrowsableAPIRenderer para desenvolvimento
 REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
-    'rest_framework.renderers.JSONRenderer',
+    'core.renderers.FastJSONRenderer',
     'rest_framework.renderers.BrowsableAPIRenderer',
 ]
 
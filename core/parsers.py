@@ -0,0 +1,34 @@
+# core/parsers.py
+"""
+Parser JSON da API sobre orjson (ver core/renderers.py).
+
+Mesmo contrato do JSONParser do DRF: corpo inválido → ParseError, e
+NaN/Infinity rejeitados (STRICT_JSON). Corpos em outra codificação que
+não UTF-8, ou sem orjson instalado, seguem pelo JSONParser.
+"""
+
+import codecs
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+from .renderers import HAS_ORJSON, FastJSONRenderer
+
+if HAS_ORJSON:
+    import orjson
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser compatível, com orjson quando disponível."""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        if not HAS_ORJSON or not self.strict or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
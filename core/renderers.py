@@ -0,0 +1,83 @@
+# core/renderers.py
+"""
+Renderer JSON da API sobre orjson.
+
+O JSONRenderer do DRF passa tudo pelo json.dumps do Python; nas
+respostas grandes (boletos da escola, responsáveis com filhos, detalhe
+do guardian) é a maior parte do tempo do servidor.
+
+FastJSONRenderer gera os MESMOS bytes do JSONRenderer (compacto, UTF-8,
+datetimes UTC com "Z", \\u2028/\\u2029 escapados); Decimal e demais tipos
+do DRF passam pelo mesmo encoder dele. Cai no JSONRenderer quando:
+- orjson não está instalado
+- a resposta pede indentação (BrowsableAPI, "application/json; indent=4")
+- o orjson não representa o valor (ex: inteiro > 64 bits)
+- há float não finito (NaN/Infinity): o orjson grava null, o DRF
+  (strict) levanta ValueError — a resposta passa pelo DRF e levanta igual.
+  A varredura dos valores só roda se a saída tiver "null".
+
+Diferença conhecida: floats com expoente ("1e16" × "1e+16").
+"""
+
+from decimal import Decimal
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+_encoder = JSONEncoder()
+
+
+def _has_non_finite(data) -> bool:
+    """Algum float/Decimal NaN ou infinito (em valores ou chaves)?"""
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if value - value != 0:  # NaN e ±inf
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.keys())
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif isinstance(value, Decimal) and not value.is_finite():
+            return True
+    return False
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer compatível, com orjson quando disponível."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None or not self._use_orjson(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=_encoder.default,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # orjson grava NaN/Infinity como null; o DRF estrito recusa
+        if b'null' in ret and _has_non_finite(data):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Mesmo escape do JSONRenderer (JSON como subconjunto de JavaScript)
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+    def _use_orjson(self, accepted_media_type, renderer_context) -> bool:
+        """orjson só reproduz a saída compacta, UTF-8 e estrita (padrões do DRF)."""
+        if not HAS_ORJSON or self.ensure_ascii or not self.compact or not self.strict:
+            return False
+        return self.get_indent(accepted_media_type, renderer_context or {}) is None
@@ -0,0 +1,97 @@
+"""core/tests/test_renderers.py"""
+import datetime
+import io
+import uuid
+from collections import OrderedDict
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core import renderers
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+UTC = datetime.timezone.utc
+BRT = datetime.timezone(datetime.timedelta(hours=-3))
+
+DATA = {
+    'nome': 'João Conceição',
+    'valor': Decimal('1250.50'),
+    'valor_str': '1250.50',
+    'float': 0.1,
+    'inteiro': 2 ** 40,
+    'nulo': None,
+    'booleano': True,
+    'data': datetime.date(2025, 3, 10),
+    'criado_em': datetime.datetime(2025, 3, 10, 12, 30, 5, 123456, tzinfo=UTC),
+    'local': datetime.datetime(2025, 3, 10, 9, 30, tzinfo=BRT),
+    'ingenuo': datetime.datetime(2025, 3, 10, 9, 30),
+    'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'ordenado': OrderedDict([('b', 1), ('a', [1, (2, 3)])]),
+    'chaves_int': {1: 'a', 2: 'b'},
+    'lazy': gettext_lazy('Responsável'),
+    'separadores': 'linha\u2028parágrafo\u2029fim',
+}
+
+
+class FastJSONRendererTestCase(SimpleTestCase):
+    """Mesmos bytes do JSONRenderer do DRF."""
+
+    def test_matches_drf_renderer(self):
+        for data in (DATA, [DATA, DATA], {'results': []}, 'texto', 1.5):
+            with self.subTest(data=type(data).__name__):
+                self.assertEqual(
+                    FastJSONRenderer().render(data), JSONRenderer().render(data)
+                )
+
+    def test_indent_and_fallbacks(self):
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+        for media_type in ('application/json; indent=4', 'application/json; indent=2'):
+            with self.subTest(media_type=media_type):
+                self.assertEqual(
+                    FastJSONRenderer().render(DATA, media_type),
+                    JSONRenderer().render(DATA, media_type),
+                )
+
+        big = {'n': 2 ** 70}  # fora do alcance do orjson
+        self.assertEqual(FastJSONRenderer().render(big), b'{"n":1180591620717411303424}')
+
+        with patch.object(renderers, 'HAS_ORJSON', False):
+            self.assertEqual(FastJSONRenderer().render(DATA), JSONRenderer().render(DATA))
+
+
+    def test_non_finite_floats_raise_like_drf(self):
+        for value in (float('nan'), float('inf'), -float('inf'), Decimal('NaN')):
+            data = {'resumo': [{'valor': value, 'nulo': None}]}
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    JSONRenderer().render(data)
+                with self.assertRaises(ValueError):
+                    FastJSONRenderer().render(data)
+
+
+class FastJSONParserTestCase(SimpleTestCase):
+    """Mesmo contrato do JSONParser do DRF."""
+
+    def parse(self, parser, body, encoding='utf-8'):
+        return parser.parse(io.BytesIO(body), parser_context={'encoding': encoding})
+
+    def test_matches_drf_parser(self):
+        body = '{"nome": "João", "valor": 1250.5, "itens": [1, null, true]}'.encode()
+        self.assertEqual(
+            self.parse(FastJSONParser(), body), self.parse(JSONParser(), body)
+        )
+
+        latin1 = '{"nome": "João"}'.encode('latin-1')
+        self.assertEqual(self.parse(FastJSONParser(), latin1, 'latin-1'), {'nome': 'João'})
+
+    def test_invalid_body_raises_parse_error(self):
+        for body in (b'', b'{"a": }', b'{"a": NaN}'):
+            with self.subTest(body=body), self.assertRaises(ParseError):
+                self.parse(FastJSONParser(), body)